@@ -1,14 +1,71 @@
-from supabase import create_client, Client
+import asyncio
+from typing import Any, Callable, List, Optional
+import httpx
+from supabase import create_client, acreate_client, Client, AsyncClient
+
+
+def _com_transporte(client, transporte):
+    criar_postgrest = client._init_postgrest_client
+
+    def criar(*args, **kwargs):
+        postgrest = criar_postgrest(*args, **kwargs)
+        sessao = postgrest.session
+        postgrest.session = type(sessao)(
+            base_url=sessao.base_url,
+            headers=sessao.headers,
+            timeout=sessao.timeout,
+            follow_redirects=sessao.follow_redirects,
+            transport=transporte
+        )
+        return postgrest
+
+    client._init_postgrest_client = criar
+    client._postgrest = None
+    return client
 
 
 class SupabaseSingleton:
     _instance = None
 
-    def __new__(cls, url: str=None, key: str=None):
+    def __new__(cls, url: str=None, key: str=None, transporte: Optional[httpx.BaseTransport]=None):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
+            cls._instance.url = url
+            cls._instance.key = key
+            cls._instance.transporte = transporte
             cls._instance.client = create_client(url, key)
+            if transporte is not None:
+                _com_transporte(cls._instance.client, transporte)
         return cls._instance
 
     def get_client(self) -> Client:
-        return self.client
\ No newline at end of file
+        return self.client
+
+
+class SupabaseAsync:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.client = None
+            cls._instance._trava = asyncio.Lock()
+        return cls._instance
+
+    async def get_client(self) -> AsyncClient:
+        if self.client is None:
+            async with self._trava:
+                if self.client is None:
+                    db = SupabaseSingleton()
+                    client = await acreate_client(db.url, db.key)
+                    if db.transporte is not None:
+                        _com_transporte(client, db.transporte)
+                    self.client = client
+        return self.client
+
+    async def consultar(self, *consultas: Callable[[AsyncClient], Any]) -> List[list]:
+        client = await self.get_client()
+        respostas = await asyncio.gather(
+            *(consulta(client).execute() for consulta in consultas)
+        )
+        return [resposta.data for resposta in respostas]
@@ -0,0 +1,237 @@
+import argparse
+import asyncio
+import gc
+import glob
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import pandas as pd
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from dados_sinteticos import GeradorDados
+
+
+ESCALAS = {
+    "1k": (1_000, 100),
+    "100k": (100_000, 2_000),
+    "1m": (1_000_000, 5_000)
+}
+LIMITE_REGISTROS = 200_000
+
+
+class Benchmark:
+    CASOS = ("_cache", "_painel", "_fontes", "_movimentacoes", "_estoque", "_fichas")
+
+    def __init__(self, escala: str, repeticoes: int) -> None:
+        movimentacoes, produtos = ESCALAS[escala]
+        self.escala = escala
+        self.repeticoes = repeticoes
+        self.gerador = GeradorDados(produtos, movimentacoes)
+        self.loop = asyncio.new_event_loop()
+        self.resultados = {}
+        self.erros = {}
+
+    def medir(self, nome: str, preparar: Callable[[], Callable[[], object]], repeticoes: Optional[int]=None) -> None:
+        tempos = []
+        for _ in range(repeticoes or self.repeticoes):
+            funcao = preparar()
+            gc.collect()
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append(time.perf_counter() - inicio)
+        self.resultados[nome] = {
+            "mediana": statistics.median(tempos),
+            "minimo": min(tempos),
+            "repeticoes": len(tempos)
+        }
+        print(f"  {nome:<65} {self.resultados[nome]['mediana'] * 1000:10.2f} ms")
+
+    def aguardar(self, corrotina) -> object:
+        return self.loop.run_until_complete(corrotina)
+
+    def executar(self) -> Dict[str, dict]:
+        print(f"Escala {self.escala}: {self.gerador.n_movimentacoes} movimentações, {self.gerador.n_produtos} produtos")
+        for caso in self.CASOS:
+            try:
+                getattr(self, caso)()
+            except Exception as e:
+                self.erros[caso] = f"{type(e).__name__}: {e}"
+                print(f"  {caso}: {self.erros[caso]}")
+        self.loop.close()
+        return self.resultados
+
+    def _cache(self) -> None:
+        from cache_movimentacoes import CacheMovimentacoes
+
+        if self.gerador.n_movimentacoes <= LIMITE_REGISTROS:
+            registros = self.gerador.movimentacoes()
+            self.medir("CacheMovimentacoes.montar", lambda: lambda: CacheMovimentacoes.montar(registros))
+
+    def _painel(self) -> None:
+        from pagina_painel import OperadorDados, IndiceTemporal
+
+        base = self.gerador.movimentacoes_df()
+        produtos = pd.DataFrame(self.gerador.produtos())
+        painel = OperadorDados.transformar_dados_movimentacoes(base)
+        ponte = OperadorDados.ponte_categorias(produtos)
+        inicio, _ = IndiceTemporal.limites(30)
+        recente = painel[painel["data_movimentacao"] >= inicio.tz_localize("UTC")]
+
+        self.medir(
+            "OperadorDados.transformar_dados_movimentacoes",
+            lambda: lambda: OperadorDados.transformar_dados_movimentacoes(base)
+        )
+        self.medir("OperadorDados.saldos_produtos", lambda: lambda: OperadorDados.saldos_produtos(base))
+        self.medir("OperadorDados.ponte_categorias", lambda: lambda: OperadorDados.ponte_categorias(produtos))
+        self.medir(
+            "OperadorDados.dados_grafico_estoque",
+            lambda: lambda: OperadorDados.dados_grafico_estoque(produtos, ponte)
+        )
+        self.medir("OperadorDados.volatilidade_preco", lambda: lambda: OperadorDados.volatilidade_preco(recente))
+        self.medir(
+            "OperadorDados.dados_grafico_volatilidade",
+            lambda: lambda: OperadorDados.dados_grafico_volatilidade(painel, "produto 1")
+        )
+
+    def _fontes(self) -> None:
+        from pagina_painel import FonteDiaria, FonteLocal, OperadorDados
+
+        base = self.gerador.movimentacoes_df()
+        produtos = pd.DataFrame(self.gerador.produtos())
+        painel = OperadorDados.transformar_dados_movimentacoes(base)
+        saldos = OperadorDados.saldos_produtos(base)
+        diario = self.gerador.diario()
+        produto = painel["nome"].value_counts().index[0]
+
+        self.medir("FonteLocal.__init__", lambda: lambda: FonteLocal(produtos, painel, saldos))
+        local = FonteLocal(produtos, painel, saldos)
+        for dias in (7, 30, 365):
+            self.medir(f"FonteLocal.cmv({dias})", lambda: lambda: self.aguardar(local.cmv(dias)))
+            self.medir(f"FonteLocal.entradas({dias})", lambda: lambda: self.aguardar(local.entradas(dias)))
+        self.medir("FonteLocal.giro", lambda: lambda: self.aguardar(local.giro(produto, 30)))
+        self.medir("FonteLocal.top_produtos", lambda: lambda: self.aguardar(local.top_produtos()))
+
+        self.medir("FonteDiaria.__init__", lambda: lambda: FonteDiaria(diario, produtos))
+        diaria = FonteDiaria(diario, produtos)
+        for dias in (7, 30, 365):
+            self.medir(f"FonteDiaria.cmv({dias})", lambda: lambda: self.aguardar(diaria.cmv(dias)))
+        self.medir("FonteDiaria.giro", lambda: lambda: self.aguardar(diaria.giro(produto, 30)))
+
+    def _movimentacoes(self) -> None:
+        from modelos import Movimentacao
+        from pagina_movimentacao import PaginaMovimentacao
+
+        base = self.gerador.movimentacoes_df()
+        pagina = PaginaMovimentacao()
+        self.medir("PaginaMovimentacao._criar_df", lambda: lambda: pagina._criar_df(base))
+        self.medir("Movimentacao.from_frame (50 linhas)", lambda: lambda: Movimentacao.from_frame(base.iloc[:50]))
+
+    def _estoque(self) -> None:
+        from componentes import GradeVirtual
+        from indice_catalogo import IndiceCatalogo
+        from pagina_estoque import ControleGradeItem, Estoque
+
+        produtos = self.gerador.produtos()
+        estoque = Estoque(None)
+        estoque.registros = {produto["id"]: produto for produto in produtos}
+        estoque.indice = IndiceCatalogo(produtos)
+        estoque._criar_df(produtos)
+        self.medir("Estoque._obter_estatisticas", lambda: estoque._obter_estatisticas)
+        self.medir("Estoque._criar_grade_itens", lambda: estoque._criar_grade_itens, 1)
+
+        controle = ControleGradeItem(GradeVirtual(estoque._criar_cartao, estoque._obter_produto), estoque.indice)
+        controle.aplicar()
+        for criterio in ("Alfabética (crescente)", "Preço unit. (decrescente)", "Valor do estoque (decrescente)"):
+            self.medir(
+                f"ControleGradeItem.filtrar_grade({criterio})",
+                lambda: lambda: controle.filtrar_grade(criterio)
+            )
+
+        self.medir("IndiceCatalogo.__init__", lambda: lambda: IndiceCatalogo(produtos))
+        for texto in ("p", "prod", "produto 12", "carnes ceasa"):
+            self.medir(f"IndiceCatalogo.buscar({texto})", lambda: lambda: estoque.indice.buscar(texto, limite=30))
+
+    def _fichas(self) -> None:
+        from custo_fichas import MotorCustoFichas
+        from pagina_ficha import PaginaFT
+
+        fichas = self.gerador.fichas()
+        produtos = self.gerador.produtos()
+        motor = MotorCustoFichas()
+        self.medir("MotorCustoFichas.carregar", lambda: lambda: motor.carregar(fichas, produtos))
+        motor.carregar(fichas, produtos)
+        produto_id = fichas[0]["ingredientes"][next(iter(fichas[0]["ingredientes"]))]["id"]
+        self.medir("MotorCustoFichas.atualizar_preco", lambda: lambda: motor.atualizar_preco(produto_id, 12.5))
+
+        pagina = PaginaFT()
+        pagina.fichas, pagina.produtos = fichas, produtos
+
+        def criar_grade():
+            motor.carregar(pagina.fichas, pagina.produtos)
+            pagina._criar_grade_fichas()
+
+        self.medir("PaginaFT.ler_dados (custos e cartões)", lambda: criar_grade)
+
+
+def anterior(diretorio: str) -> Tuple[Optional[str], dict]:
+    arquivos = sorted(glob.glob(os.path.join(diretorio, "benchmark_*.json")))
+    if not arquivos:
+        return None, {}
+    with open(arquivos[-1], encoding="utf-8") as arquivo:
+        return arquivos[-1], json.load(arquivo)
+
+
+def comparar(atual: dict, referencia: dict) -> List[str]:
+    linhas = []
+    for escala, casos in atual["escalas"].items():
+        casos_referencia = referencia.get("escalas", {}).get(escala, {})
+        for nome, resultado in casos.items():
+            antes = casos_referencia.get(nome, {})
+            if "mediana" not in resultado or "mediana" not in antes or not antes["mediana"]:
+                continue
+            razao = resultado["mediana"] / antes["mediana"]
+            linhas.append(f"  {escala:>5} {nome:<65} {razao:6.2f}x")
+    return linhas
+
+
+def main(argumentos: List[str]=None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks do processamento de dados com dados sintéticos")
+    parser.add_argument("--escalas", nargs="+", choices=list(ESCALAS), default=["1k", "100k"])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--saida", default="./benchmarks")
+    args = parser.parse_args(argumentos)
+
+    resultado = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "escalas": {}
+    }
+    erros = {}
+    for escala in args.escalas:
+        benchmark = Benchmark(escala, args.repeticoes)
+        resultado["escalas"][escala] = benchmark.executar()
+        erros.update({f"{escala} {caso}": erro for caso, erro in benchmark.erros.items()})
+
+    os.makedirs(args.saida, exist_ok=True)
+    caminho_anterior, referencia = anterior(args.saida)
+    caminho = os.path.join(args.saida, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+    print(f"Resultados salvos em {caminho}")
+
+    if caminho_anterior:
+        print(f"Comparação com {caminho_anterior} (tempo atual / anterior):")
+        for linha in comparar(resultado, referencia):
+            print(linha)
+
+    if erros:
+        sys.exit(f"{len(erros)} caso(s) com erro: {', '.join(erros)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import asyncio
+import numpy as np
+import pandas as pd
+from typing import Callable, List
+
+from repositorio import Repositorio
+
+
+class CacheMovimentacoes:
+    _instance = None
+
+    COLUNAS = {
+        "id": "int64",
+        "id_produto": "int64",
+        "operacao": "object",
+        "classificacao": "object",
+        "unidade": "object",
+        "quantidade": "float64",
+        "preco_movimentacao": "float64",
+        "data_movimentacao": "datetime64[ns, UTC]",
+        "data_validade": "object",
+        "informacoes": "object",
+        "nome": "object",
+        "preco_unidade": "float64"
+    }
+    PRODUTO = ("nome", "preco_unidade")
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.origem = None
+            cls._instance.df = None
+            cls._instance.versao = 0
+            cls._instance._carga = None
+            cls._instance._visoes = {}
+        return cls._instance
+
+    async def tabela(self) -> pd.DataFrame:
+        origem = self._origem()
+        if self.origem != origem:
+            self.descartar()
+            self.origem = origem
+        if self.df is None:
+            if self._carga is None:
+                self._carga = asyncio.ensure_future(self._carregar())
+            carga, versao = self._carga, self.versao
+            try:
+                df = await asyncio.shield(carga)
+            finally:
+                if self._carga is carga:
+                    self._carga = None
+            if self.versao != versao:
+                return df
+            self.df = df
+            self.versao += 1
+        return self.df
+
+    def _origem(self) -> tuple:
+        repositorio = Repositorio()
+        return (
+            repositorio.empresa_id,
+            repositorio.geracoes.get("movimentacao", 0),
+            repositorio.geracoes.get("produtos", 0)
+        )
+
+    async def visao(self, nome: str, derivar: Callable[[pd.DataFrame], pd.DataFrame]) -> pd.DataFrame:
+        df = await self.tabela()
+        visao = self._visoes.get(nome)
+        if visao is None or visao[0] != self.versao:
+            visao = self.versao, derivar(df) if len(df) else df
+            self._visoes[nome] = visao
+        return visao[1]
+
+    async def _carregar(self) -> pd.DataFrame:
+        return self.montar(await Repositorio().movimentacoes())
+
+    @classmethod
+    def montar(cls, movimentacoes: List[dict]) -> pd.DataFrame:
+        produtos = [mov.get("produtos") or {} for mov in movimentacoes]
+        colunas = {}
+        for coluna, tipo in cls.COLUNAS.items():
+            if coluna in cls.PRODUTO:
+                valores = [produto.get(coluna) for produto in produtos]
+            else:
+                valores = [mov.get(coluna) for mov in movimentacoes]
+            if tipo == "float64":
+                colunas[coluna] = np.array(valores, dtype=np.float64)
+            elif tipo == "int64":
+                colunas[coluna] = np.array(valores, dtype=np.int64)
+            elif tipo.startswith("datetime64"):
+                colunas[coluna] = pd.to_datetime(valores, format="ISO8601", utc=True)
+            else:
+                colunas[coluna] = pd.Series(valores, dtype=object)
+        return pd.DataFrame(colunas)
+
+    def aplicar(self, tabela: str, tipo: str, registro: dict) -> None:
+        if self.df is None:
+            return
+        if tabela == "movimentacao":
+            self._aplicar_movimentacao(tipo, registro)
+        elif tabela == "produtos" and tipo == "UPDATE":
+            linhas = (self.df["id_produto"] == registro["id"]).to_numpy()
+            if not linhas.any():
+                return
+            df = self.df.copy()
+            df.loc[linhas, "nome"] = registro["nome"]
+            df.loc[linhas, "preco_unidade"] = registro["preco_unidade"]
+            self.df = df
+            self.versao += 1
+
+    def _aplicar_movimentacao(self, tipo: str, registro: dict) -> None:
+        df = self.df[self.df["id"] != registro["id"]]
+        if tipo != "DELETE":
+            mov = Repositorio().detalhar_movimentacoes([dict(registro)])[0]
+            df = pd.concat([df, self.montar([mov])], ignore_index=True) if len(df) else self.montar([mov])
+        self.df = df.reset_index(drop=True)
+        self.versao += 1
+
+    async def historico(self, produto_id: int, inicio: int, tamanho: int) -> pd.DataFrame:
+        df = await self.tabela()
+        df = df[df["id_produto"] == produto_id]
+        df = df.sort_values(["data_movimentacao", "id"], ascending=False)
+        return df.iloc[inicio:inicio + tamanho]
+
+    def descartar(self) -> None:
+        self.df = None
+        self._carga = None
+        self._visoes = {}
+        self.versao += 1
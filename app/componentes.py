@@ -1,10 +1,12 @@
+import math
 import flet as ft
-from typing import Optional, Callable, List
+from typing import Awaitable, Optional, Callable, List
 import locale
 import pandas as pd
 from datetime import datetime
 
 from controles import ControleMovimentacao
+from indice_catalogo import IndiceCatalogo
 
 locale.setlocale(locale.LC_ALL, "pt_BR.UTF-8")
 
@@ -14,6 +16,10 @@ class SeletorTemporal(ft.SegmentedButton):
         super().__init__(
             selected={"30"},
             segments=[
+                ft.Segment(
+                    value="0",
+                    label=ft.Text("Tudo"),
+                ),
                 ft.Segment(
                     value="365",
                     label=ft.Text("1 a"),
@@ -97,6 +103,47 @@ class RotuloColuna(ft.Container):
         )
      
 
+class EsqueletoCartao(ft.Card):
+    def __init__(self, altura_grafico: int=0, linhas: int=2) -> None:
+        super().__init__(col=12, elevation=10)
+        blocos = [
+            ft.Container(height=24, width=200, bgcolor=ft.Colors.BLACK12, border_radius=ft.border_radius.all(5)),
+            ft.Divider()
+        ]
+        blocos += [
+            ft.Container(height=18, bgcolor=ft.Colors.BLACK12, border_radius=ft.border_radius.all(5))
+            for _ in range(linhas)
+        ]
+        if altura_grafico:
+            blocos.append(
+                ft.Container(height=altura_grafico, bgcolor=ft.Colors.BLACK12, border_radius=ft.border_radius.all(10))
+            )
+        self.content = ft.Container(
+            content=ft.Column(blocos, spacing=10),
+            padding=ft.padding.all(20),
+            bgcolor=ft.Colors.WHITE,
+            border_radius=ft.border_radius.all(15)
+        )
+
+
+class CarregamentoProgressivo(ft.Container):
+    def __init__(self, carregar: Callable[[], Awaitable[ft.Control]], esqueleto: ft.Control) -> None:
+        super().__init__(content=esqueleto, col=12)
+        self.carregar = carregar
+
+    def did_mount(self) -> None:
+        self.page.run_task(self._carregar)
+
+    async def _carregar(self) -> None:
+        try:
+            conteudo = await self.carregar()
+        except Exception as e:
+            print(e)
+            conteudo = ft.Container()
+        self.content = conteudo
+        self.update()
+
+
 class TextoMonetario(ft.ResponsiveRow):
     def __init__(self, valor: str, tamanho: int, weight: str, col_text: int):
         super().__init__(
@@ -146,6 +193,76 @@ class GradeNotificacao(ft.ResponsiveRow):
         self.update()
 
 
+class GradeVirtual(ft.GridView):
+    TAMANHO_PAGINA = 30
+    JANELA = 90
+    LIMIAR = 400
+
+    def __init__(
+        self,
+        criar_bloco: Callable[[], ft.Control],
+        obter: Callable[[int], object],
+        num_colunas: int=3,
+        proporcao: float=1.3,
+        altura: int=760
+    ):
+        super().__init__(
+            runs_count=num_colunas,
+            child_aspect_ratio=proporcao,
+            spacing=10,
+            run_spacing=10,
+            height=altura,
+            on_scroll_interval=100,
+            on_scroll=self._rolar
+        )
+        self.criar_bloco = criar_bloco
+        self.obter = obter
+        self.ids = []
+        self.reserva = []
+        self.inicio = 0
+
+    def exibir(self, ids: List[int], reiniciar: bool=True) -> None:
+        self.ids = list(ids)
+        if reiniciar:
+            self.inicio = 0
+            carregados = self.TAMANHO_PAGINA
+        else:
+            self.inicio = min(self.inicio, max(0, (len(self.ids) - 1) // self.TAMANHO_PAGINA * self.TAMANHO_PAGINA))
+            carregados = max(len(self.controls), self.TAMANHO_PAGINA)
+        self._preencher(min(len(self.ids) - self.inicio, carregados))
+        if self.page is not None:
+            self.update()
+            if reiniciar:
+                self.scroll_to(offset=0)
+
+    def _preencher(self, quantidade: int, inicio: int=0) -> None:
+        self.reserva += self.controls[quantidade:]
+        del self.controls[quantidade:]
+        while len(self.controls) < quantidade:
+            self.controls.append(self.reserva.pop() if self.reserva else self.criar_bloco())
+        for posicao in range(inicio, quantidade):
+            self.controls[posicao].exibir(self.obter(self.ids[self.inicio + posicao]))
+
+    def _rolar(self, e: ft.OnScrollEvent) -> None:
+        carregados = len(self.controls)
+        if self.inicio + carregados < len(self.ids) and e.pixels >= e.max_scroll_extent - self.LIMIAR:
+            if carregados < self.JANELA:
+                self._preencher(min(len(self.ids) - self.inicio, carregados + self.TAMANHO_PAGINA), carregados)
+                self.update()
+            else:
+                self._deslocar(self.TAMANHO_PAGINA, e)
+        elif self.inicio > 0 and e.pixels <= self.LIMIAR:
+            self._deslocar(-self.TAMANHO_PAGINA, e)
+
+    def _deslocar(self, passo: int, e: ft.OnScrollEvent) -> None:
+        linhas = math.ceil(len(self.controls) / self.runs_count)
+        altura_linha = (e.max_scroll_extent + e.viewport_dimension + self.run_spacing) / linhas
+        self.inicio += passo
+        self._preencher(min(len(self.ids) - self.inicio, self.JANELA))
+        self.update()
+        self.scroll_to(offset=e.pixels - passo // self.runs_count * altura_linha, duration=0)
+
+
 class CartaoNotificacao(ft.Card):
     def __init__(self,
         titulo: str,
@@ -235,12 +352,16 @@ class CartaoIndicadores(ft.Card):
 class CapsulaCategoria(ft.Container):
     def __init__(self, categoria, cor):
         super().__init__()
-        self.content = ft.Text(categoria, weight=ft.FontWeight.W_600, max_lines=1, overflow=ft.TextOverflow.ELLIPSIS)
-        self.bgcolor=eval(f"ft.{cor}")
+        self.content = ft.Text(weight=ft.FontWeight.W_600, max_lines=1, overflow=ft.TextOverflow.ELLIPSIS)
         self.border_radius=30
-        self.col=int(len(categoria) / 2) + 1
         self.padding=ft.padding.only(left=10, top=5, right=10, bottom=5)
         self.alignment=ft.alignment.center
+        self.exibir(categoria, cor)
+
+    def exibir(self, categoria, cor):
+        self.content.value = categoria
+        self.bgcolor=eval(f"ft.{cor}")
+        self.col=int(len(categoria) / 2) + 1
 
 
 class TextField(ft.Column):
@@ -382,14 +503,13 @@ class CapsulaDropdown(ft.Container):
         return {"id": self.id, "nome": self.rotulo}
 
 
-class DropdownV2(ft.PopupMenuButton):
-    def __init__(self, rotulos: dict, ids: List[int] = []) -> None:
-        super().__init__(
-            tooltip="",
-            size_constraints=ft.BoxConstraints(max_height=250, min_width=200),
-            bgcolor=ft.Colors.WHITE
-        )
+class DropdownV2(ft.Column):
+    LIMITE_RESULTADOS = 30
+
+    def __init__(self, rotulos: dict, ids: List[int] = [], largura: int=230) -> None:
+        super().__init__(spacing=5, width=largura)
         self.rotulos = rotulos
+        self.indice = IndiceCatalogo.de_rotulos(rotulos)
         self.area_botao = ft.ResponsiveRow([], spacing=5)
         self._criar_interface()
         self._carregar_itens_menu()
@@ -401,56 +521,63 @@ class DropdownV2(ft.PopupMenuButton):
         return [capsula.value for capsula in self.area_botao.controls] or None
 
     def _criar_interface(self) -> None:
-        self.content = ft.Container(
-            content=ft.ResponsiveRow(
-                [
-                    ft.Container(
-                        self.area_botao,
-                        padding=ft.padding.only(left=5, bottom=5, right=5),
-                        border=ft.border.only(right=ft.border.BorderSide(1, ft.Colors.BLACK54)),
-                        expand=True,
-                        col=10
-                    ),
-                    ft.Column(
-                        [ft.Icon(ft.Icons.ARROW_DROP_DOWN, color=ft.Colors.BLACK54)],
-                        col=2
-                    )
-                ],
-                vertical_alignment=ft.CrossAxisAlignment.CENTER,
-                expand=True,
-                spacing=0
-            ),
-            padding=ft.padding.only(top=10, bottom=10),
-            alignment=ft.alignment.center,
-            width=230,
-            border_radius=15,
-            border=ft.border.all(1, ft.Colors.BLACK54)
+        self.busca = ft.SearchBar(
+            bar_hint_text="Buscar",
+            view_hint_text="Digite para filtrar",
+            view_size_constraints=ft.BoxConstraints(max_height=300),
+            bar_leading=ft.Icon(ft.Icons.SEARCH, color=ft.Colors.BLACK54),
+            on_change=self._buscar,
+            on_tap=lambda e: self.busca.open_view()
         )
+        self.controls = [
+            ft.Container(
+                self.area_botao,
+                padding=ft.padding.all(5),
+                border_radius=15,
+                border=ft.border.all(1, ft.Colors.BLACK54)
+            ),
+            self.busca
+        ]
 
-    def _carregar_itens_menu(self) -> None:
-        self.items = [
-            ft.PopupMenuItem(
-                text=label,
-                on_click=lambda e, id=key: self._adicionar_item(id)
+    def _carregar_itens_menu(self, texto: str="") -> None:
+        selecionados = {capsula.id for capsula in self.area_botao.controls}
+        ids = [id for id in self.indice.buscar(texto) if id not in selecionados]
+        self.busca.controls = [
+            ft.ListTile(
+                title=ft.Text(self.rotulos[id]),
+                on_click=lambda e, id=id: self._selecionar(id)
             )
-            for key, label in self.rotulos.items()
+            for id in ids[:self.LIMITE_RESULTADOS]
         ]
 
+    def _buscar(self, e: ft.ControlEvent) -> None:
+        self._carregar_itens_menu(e.data)
+        self.busca.update()
+
+    def _selecionar(self, id: int) -> None:
+        self.busca.close_view("")
+        self._adicionar_item(id)
+        self._carregar_itens_menu()
+        self.busca.update()
+
     def _carregar_valores_iniciais(self, ids: list) -> None:
         for id in ids:
             self._adicionar_item(id, atualizar=False)
+        self._carregar_itens_menu()
+
+    def _criar_capsula(self, id: int) -> ft.Control:
+        return CapsulaDropdown(self.rotulos[id], id, self.excluir)
 
     def _adicionar_item(self, id: int, atualizar: bool=True) -> None:
-        if any(capsula.value == id for capsula in self.area_botao.controls):
+        if any(capsula.id == id for capsula in self.area_botao.controls):
             return  # evita itens duplicados
-        self.area_botao.controls.append(
-            CapsulaDropdown(self.rotulos[id], id, self.excluir)
-        )
+        self.area_botao.controls.append(self._criar_capsula(id))
         if atualizar:
             self.area_botao.update()
 
     def atualizar_itens(self, id: int, nome: str) -> None:
         self.rotulos[id] = nome
+        self.indice.adicionar({"id": id, "nome": nome})
         self._carregar_itens_menu()
         self.update()
 
@@ -459,6 +586,8 @@ class DropdownV2(ft.PopupMenuButton):
             capsula for capsula in self.area_botao.controls if int(capsula.id) != int(id)
         ]
         self.area_botao.update()
+        self._carregar_itens_menu()
+        self.busca.update()
 
 
 class FiltroEntrada(ft.InputFilter):
@@ -650,10 +779,7 @@ class JanelaEditarMovimentacao(ft.AlertDialog):
             self.movimentacao.id,
             self.entrada_classificar_acao.value,
             self.entrada_qtd.value,
-            self.movimentacao.qtd,
-            self.movimentacao.qtd_estoque,
-            self.entrada_preco.value,
-            self.movimentacao.produto_id
+            self.entrada_preco.value
         )
         self.page.close(self)
 
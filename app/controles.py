@@ -5,6 +5,8 @@ from typing import List, Optional
 
 from modelos import Produto
 from banco_de_dados import SupabaseSingleton
+from repositorio import Repositorio
+from custo_fichas import MotorCustoFichas
 
 
 class InfosGlobal:
@@ -29,6 +31,7 @@ class InfosGlobal:
         self.usuario_nome = usuario_nome
         self.empresa_id = empresa_id
         self.empresa_nome = empresa_nome
+        Repositorio().definir_empresa(empresa_id)
 
 
 class ControleProduto:
@@ -55,42 +58,39 @@ class ControleProduto:
             if fornecedores is not None:
                 fornecedores = [forns["nome"] for forns in fornecedores]
 
-            resposta_produtos = (
-                client.table("produtos")
-                .insert(
+            (
+                client.rpc(
+                    "criar_produto",
                     {
-                        "empresa_id": InfosGlobal().empresa_id,
-                        "nome": nome.lower(),
-                        "unidade": und.lower(),
-                        "quantidade": qtd_estoque,
-                        "estoque_minimo": estoque_min,
-                        "preco_unidade": preco,
-                        "cmv": cmv,
-                        "categorias": categorias,
-                        "fornecedores": {
-                            "nomes": fornecedores
+                        "p_empresa_id": InfosGlobal().empresa_id,
+                        "p_produto": {
+                            "nome": nome.lower(),
+                            "unidade": und.lower(),
+                            "quantidade": qtd_estoque,
+                            "estoque_minimo": estoque_min,
+                            "preco_unidade": preco,
+                            "cmv": cmv,
+                            "categorias": categorias,
+                            "fornecedores": {
+                                "nomes": fornecedores
+                            }
+                        },
+                        "p_movimentacao": {
+                            "unidade": und.lower(),
+                            "data_movimentacao": self.gerar_data(),
+                            "quantidade": qtd_estoque,
+                            "operacao": "entrada",
+                            "informacoes": "Web",
+                            "preco_movimentacao": preco
                         }
                     }
                 )
                 .execute()
             )
-            resposta_movimentacao = (
-                client.table("movimentacao")
-                .insert({
-                    "id_produto": resposta_produtos.data[0]["id"],
-                    "empresa_id": InfosGlobal().empresa_id,
-                    "unidade": und.lower(),
-                    "data_movimentacao": self.gerar_data(),
-                    "quantidade": qtd_estoque,
-                    "operacao": "entrada",
-                    "informacoes": "Web",
-                    "preco_movimentacao": preco
-                })
-                .execute()
-            )
         except Exception as e:
             print(e)
         else:
+            Repositorio().invalidar("produtos", "movimentacao")
             if self.visualizacao is not None:
                 self.visualizacao.atualizar_dados()
 
@@ -113,28 +113,33 @@ class ControleProduto:
             if fornecedores is not None:
                 fornecedores = [forns["nome"] for forns in fornecedores]
 
-            resposta = (
-                client.table("produtos")
-                .update(
+            (
+                client.rpc(
+                    "atualizar_produto",
                     {
-                        "nome": nome.lower(),
-                        "unidade": und.lower(),
-                        "quantidade": qtd_estoque,
-                        "estoque_minimo": estoque_min,
-                        "preco_unidade": preco,
-                        "cmv": cmv,
-                        "categorias": categorias,
-                        "fornecedores": {
-                            "nomes": fornecedores
+                        "p_empresa_id": InfosGlobal().empresa_id,
+                        "p_id": id,
+                        "p_produto": {
+                            "nome": nome.lower(),
+                            "unidade": und.lower(),
+                            "quantidade": qtd_estoque,
+                            "estoque_minimo": estoque_min,
+                            "preco_unidade": preco,
+                            "cmv": cmv,
+                            "categorias": categorias,
+                            "fornecedores": {
+                                "nomes": fornecedores
+                            }
                         }
                     }
                 )
-                .eq("id", id)
                 .execute()
             )
         except Exception as e:
             print(e)
         else:
+            MotorCustoFichas().atualizar_preco(id, preco)
+            Repositorio().invalidar("produtos", "movimentacao")
             if self.visualizacao is not None:
                 self.visualizacao.atualizar_conteudo(
                     id=id,
@@ -160,6 +165,7 @@ class ControleProduto:
         except Exception as e:
             print(e)
         else:
+            Repositorio().invalidar("produtos", "movimentacao")
             self.visualizacao.atualizar_conteudo()
 
     def gerar_data(self):
@@ -194,6 +200,7 @@ class ControleCategoria:
         except Exception as e:
             print(e)
         else:
+            Repositorio().invalidar("categoria")
             if self.visualizacao is not None:
                 self.visualizacao.atualizar_item(resposta.data[0])
                 self.visualizacao.fechar(None)
@@ -223,6 +230,7 @@ class ControleFornecedores:
         except Exception as e:
             print(e)
         else:
+            Repositorio().invalidar("fornecedores")
             if self.visualizacao is not None:
                 self.visualizacao.atualizar_item(resposta.data[0])
                 self.visualizacao.fechar(None)
@@ -238,44 +246,35 @@ class ControleMovimentacao:
         movimentacao_id: int,
         classificacao: str,
         qtd_nova: float,
-        qtd_antiga: float,
-        qtd_estoque: float,
-        valor_unit: float,
-        produto_id: int
+        valor_unit: float
     ) -> None:
-        qtd_nova, qtd_antiga, valor_unit = self.formatar_valores(qtd_nova, qtd_antiga, valor_unit)
+        qtd_nova, valor_unit = self.formatar_valores(qtd_nova, valor_unit)
         try:
             client = self.db.get_client()
             (
-                client.table("movimentacao")
-                .update({
-                    "classificacao": classificacao,
-                    "quantidade": qtd_nova,
-                    "preco_movimentacao": valor_unit
-                })
-                .eq("id", movimentacao_id)
+                client.rpc(
+                    "editar_movimentacao",
+                    {
+                        "p_empresa_id": InfosGlobal().empresa_id,
+                        "p_id": movimentacao_id,
+                        "p_alteracoes": {
+                            "classificacao": classificacao,
+                            "quantidade": qtd_nova,
+                            "preco_movimentacao": valor_unit
+                        }
+                    }
+                )
                 .execute()
             )
-            if qtd_nova != qtd_antiga:
-                nova_qtd = qtd_estoque + (qtd_antiga - qtd_nova)
-                (
-                    client.table("produtos")
-                    .update({
-                        "quantidade": nova_qtd
-                    })
-                    .eq("id", produto_id)
-                    .execute()
-                )
-
         except Exception as e:
             print(e)
         else:
+            Repositorio().invalidar("movimentacao", "produtos")
             self.visualizacao.atualizar_conteudo()
 
     def registrar(
         self,
         id_produto: int,
-        qtd_produto: float,
         acao: str,
         classificacao: str,
         unidade: str,
@@ -284,39 +283,76 @@ class ControleMovimentacao:
         preco: str,
         data_validade: str
     ):
-        qtd, preco = self.formatar_valores(qtd, preco)
-        qtd_produto = self.obter_quantidade(acao, qtd_produto, qtd)
-        data_movimentacao = self.formatar_data_movimentacao(data_movimentacao)
-
         try:
             client = self.db.get_client()
             (
-                client.table("movimentacao")
-                .insert({
-                    "empresa_id": InfosGlobal().empresa_id,
-                    "id_produto": id_produto,
-                    "unidade": unidade,
-                    "operacao": acao,
-                    "data_movimentacao": data_movimentacao,
-                    "preco_movimentacao": preco,
-                    "data_validade": data_validade,
-                    "informacoes": "Web",
-                    "quantidade": qtd,
-                    "classificacao": classificacao
-                })
+                client.rpc(
+                    "registrar_movimentacao",
+                    {
+                        "p_empresa_id": InfosGlobal().empresa_id,
+                        "p_movimentacao": self._criar_movimentacao(
+                            id_produto,
+                            acao,
+                            classificacao,
+                            unidade,
+                            qtd,
+                            data_movimentacao,
+                            preco,
+                            data_validade
+                        )
+                    }
+                )
                 .execute()
             )
+        except Exception as e:
+            print(e)
+        else:
+            Repositorio().invalidar("movimentacao", "produtos")
+            self.visualizacao.atualizar_conteudo()
+
+    def registrar_lote(self, movimentacoes: List[dict]) -> None:
+        try:
+            client = self.db.get_client()
             (
-                client.table("produtos")
-                .update({"quantidade": qtd_produto})
-                .eq("id", id_produto)
+                client.rpc(
+                    "registrar_movimentacoes",
+                    {
+                        "p_empresa_id": InfosGlobal().empresa_id,
+                        "p_movimentacoes": [self._criar_movimentacao(**mov) for mov in movimentacoes]
+                    }
+                )
                 .execute()
             )
         except Exception as e:
             print(e)
         else:
+            Repositorio().invalidar("movimentacao", "produtos")
             self.visualizacao.atualizar_conteudo()
 
+    def _criar_movimentacao(
+        self,
+        id_produto: int,
+        acao: str,
+        classificacao: str,
+        unidade: str,
+        qtd: str,
+        data_movimentacao: str,
+        preco: str,
+        data_validade: Optional[str]=None
+    ) -> dict:
+        qtd, preco = self.formatar_valores(qtd, preco)
+        return {
+            "id_produto": id_produto,
+            "unidade": unidade,
+            "operacao": acao,
+            "data_movimentacao": self.formatar_data_movimentacao(data_movimentacao),
+            "preco_movimentacao": preco,
+            "data_validade": data_validade,
+            "informacoes": "Web",
+            "quantidade": qtd,
+            "classificacao": classificacao
+        }
+
     def formatar_valores(self, *args: str):
         return [float(str(valor).replace(",", ".").removeprefix("R$ ")) for valor in args]
     
@@ -331,12 +367,6 @@ class ControleMovimentacao:
             return dt_timezone
         except Exception:
             return dt
-        
-    def obter_quantidade(self, operacao, qtd_produto, qtd):
-        if operacao.lower() == "saída":
-            return float(qtd_produto) - float(qtd)
-        elif operacao.lower() == "entrada":
-            return float(qtd_produto) + float(qtd)
 
 
 class ControleFichaTecnica:
@@ -364,6 +394,7 @@ class ControleFichaTecnica:
         except Exception as e:
             print(e)
         else:
+            Repositorio().invalidar("fichas_tecnicas")
             self.visualizacao.atualizar_dados()
 
     def apagar_ficha(self, id):
@@ -378,6 +409,7 @@ class ControleFichaTecnica:
         except Exception as e:
             print(e)
         else:
+            Repositorio().invalidar("fichas_tecnicas")
             self.visualizacao.atualizar_pagina()
 
     def _formatar_valores(self, *args):
@@ -421,28 +453,38 @@ class ControleCompras:
         except Exception as e:
             print(e)
         else:
+            Repositorio().invalidar("lista_compras")
             self.visualizacao.pagina_inicial_e_atualizar()
 
     def atualizar_status(self, lista_id, produtos, opcao):
-        print(opcao)
         JSON = self._criar_json_produtos(produtos)
         valor_total = self._obter_valor_total(JSON)
+        entrada_estoque = opcao == 0
         try:
             cliente = SupabaseSingleton().get_client()
             (
-                cliente.table("lista_compras")
-                .update({
-                    "valor_total": valor_total,
-                    "finalizada": True,
-                    "produtos": JSON,
-                    "recebimento": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                })
-                .eq("id", lista_id)
+                cliente.rpc(
+                    "receber_lista_compras",
+                    {
+                        "p_empresa_id": InfosGlobal().empresa_id,
+                        "p_lista_id": lista_id,
+                        "p_alteracoes": {
+                            "valor_total": valor_total,
+                            "produtos": JSON,
+                            "recebimento": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                        },
+                        "p_entrada_estoque": entrada_estoque
+                    }
+                )
                 .execute()
             )
         except Exception as e:
             print(e)
         else:
+            if entrada_estoque:
+                Repositorio().invalidar("lista_compras", "movimentacao", "produtos")
+            else:
+                Repositorio().invalidar("lista_compras")
             self.visualizacao.pagina_inicial_e_atualizar()
 
 
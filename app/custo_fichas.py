@@ -0,0 +1,73 @@
+import numpy as np
+from typing import List, Optional
+
+
+class MotorCustoFichas:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.carregar([], [])
+        return cls._instance
+
+    def carregar(self, fichas: List[dict], produtos: List[dict]) -> None:
+        self.ids_fichas = [int(ficha["id"]) for ficha in fichas]
+        self.fichas = {ficha_id: i for i, ficha_id in enumerate(self.ids_fichas)}
+        self.produtos = {int(produto["id"]): i for i, produto in enumerate(produtos)}
+        self.precos = np.array(
+            [self._preco(produto["preco_unidade"]) for produto in produtos] + [0.0],
+            dtype=np.float64
+        )
+
+        linhas, colunas, quantidades = [], [], []
+        self._entradas = {}
+        for i, ficha in enumerate(fichas):
+            for ingrediente in ficha["ingredientes"].values():
+                produto_id = int(ingrediente["id"])
+                self._entradas[(int(ficha["id"]), produto_id)] = len(linhas)
+                linhas.append(i)
+                colunas.append(self.produtos.get(produto_id, len(produtos)))
+                quantidades.append(float(str(ingrediente["quantidade"]).replace(",", ".")))
+
+        self.linhas = np.array(linhas, dtype=np.int64)
+        self.colunas = np.array(colunas, dtype=np.int64)
+        self.quantidades = np.array(quantidades, dtype=np.float64)
+
+        ordem = np.argsort(self.colunas, kind="stable")
+        self._ordem_colunas = ordem
+        self._inicio_colunas = np.searchsorted(self.colunas[ordem], np.arange(len(self.precos) + 1))
+
+        self.valores = np.round(self.quantidades * self.precos[self.colunas], 2)
+        self.custos = np.bincount(self.linhas, weights=self.valores, minlength=len(fichas))
+
+    def custo(self, ficha_id: int) -> float:
+        indice = self.fichas.get(int(ficha_id))
+        return float(self.custos[indice]) if indice is not None else 0.0
+
+    def valor(self, ficha_id: int, produto_id: int) -> float:
+        entrada = self._entradas.get((int(ficha_id), int(produto_id)))
+        return float(self.valores[entrada]) if entrada is not None else 0.0
+
+    def atualizar_preco(self, produto_id: int, preco: Optional[float]) -> List[int]:
+        coluna = self.produtos.get(int(produto_id))
+        if coluna is None:
+            return []
+        self.precos[coluna] = self._preco(preco)
+
+        entradas = self._ordem_colunas[self._inicio_colunas[coluna]:self._inicio_colunas[coluna + 1]]
+        if not len(entradas):
+            return []
+        novos = np.round(self.quantidades[entradas] * self.precos[coluna], 2)
+        linhas = self.linhas[entradas]
+        np.add.at(self.custos, linhas, novos - self.valores[entradas])
+        self.valores[entradas] = novos
+
+        return [self.ids_fichas[linha] for linha in np.unique(linhas)]
+
+    def _preco(self, preco: Optional[float]) -> float:
+        try:
+            preco = float(preco)
+        except (TypeError, ValueError):
+            return 0.0
+        return 0.0 if np.isnan(preco) else preco
@@ -0,0 +1,288 @@
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+
+from cache_movimentacoes import CacheMovimentacoes
+from modelos import UNIDADES
+
+
+CATEGORIAS = [
+    "carnes",
+    "peixes",
+    "hortifruti",
+    "laticínios",
+    "grãos",
+    "bebidas",
+    "temperos",
+    "congelados",
+    "padaria",
+    "descartáveis",
+    "limpeza",
+    "molhos",
+    "doces",
+    "embalagens",
+    "frutos do mar",
+    "massas"
+]
+CORES = ["Colors.RED_300", "Colors.GREEN_300", "Colors.BLUE_300", "Colors.ORANGE_300", "Colors.GREY_300", "Colors.PURPLE_300"]
+FORNECEDORES = ["atacadão", "ceasa", "distribuidora sul", "frigorífico central", "peixaria do porto", "bebidas norte"]
+
+
+class GeradorDados:
+    def __init__(
+        self,
+        produtos: int,
+        movimentacoes: int,
+        categorias: int=12,
+        fichas: Optional[int]=None,
+        listas: int=5,
+        dias: int=365,
+        semente: int=0
+    ) -> None:
+        self.n_produtos = produtos
+        self.n_movimentacoes = movimentacoes
+        self.categorias = [
+            CATEGORIAS[i] if i < len(CATEGORIAS) else f"categoria {i}"
+            for i in range(max(1, categorias))
+        ]
+        self.n_fichas = max(1, produtos // 10) if fichas is None else fichas
+        self.n_listas = listas
+        self.dias = dias
+        self.rng = np.random.default_rng(semente)
+        self.agora = pd.Timestamp.now(tz="UTC").floor("s")
+
+        self.popularidade = self._zipf(produtos, 1.1)
+        self.precos = np.round(self.rng.lognormal(2.5, 0.9, produtos), 2)
+        self.sem_preco = self.rng.random(produtos) < 0.03
+        self._produtos = None
+        self._movimentacoes = None
+
+    def _zipf(self, n: int, expoente: float) -> np.ndarray:
+        pesos = 1.0 / np.arange(1, n + 1) ** expoente
+        pesos = pesos[self.rng.permutation(n)]
+        return pesos / pesos.sum()
+
+    def produtos(self) -> List[dict]:
+        if self._produtos is not None:
+            return self._produtos
+
+        peso_categorias = self._zipf(len(self.categorias), 0.8)
+        unidades = self.rng.integers(0, len(UNIDADES), self.n_produtos)
+        estoque_minimo = np.round(self.rng.gamma(2.0, 5.0, self.n_produtos), 0)
+        quantidade = np.round(estoque_minimo * self.rng.lognormal(0.3, 0.8, self.n_produtos), 3)
+
+        self._produtos = []
+        for i in range(self.n_produtos):
+            escolhidas = self.rng.choice(
+                len(self.categorias),
+                size=min(len(self.categorias), 1 + int(self.rng.random() < 0.3)),
+                replace=False,
+                p=peso_categorias
+            )
+            fornecedores = self.rng.choice(len(FORNECEDORES), size=1 + int(self.rng.random() < 0.2), replace=False)
+            self._produtos.append({
+                "id": i + 1,
+                "empresa_id": 1,
+                "nome": f"produto {i + 1}",
+                "unidade": UNIDADES[unidades[i]],
+                "quantidade": float(quantidade[i]),
+                "estoque_minimo": float(estoque_minimo[i]),
+                "preco_unidade": None if self.sem_preco[i] else float(self.precos[i]),
+                "cmv": None,
+                "categorias": {
+                    self.categorias[c]: CORES[c % len(CORES)]
+                    for c in escolhidas
+                },
+                "fornecedores": {"nomes": [FORNECEDORES[f] for f in fornecedores]}
+            })
+        return self._produtos
+
+    def movimentacoes_df(self) -> pd.DataFrame:
+        if self._movimentacoes is not None:
+            return self._movimentacoes
+
+        n = self.n_movimentacoes
+        produtos = self.produtos()
+        indices = self.rng.choice(self.n_produtos, size=n, p=self.popularidade)
+
+        sorteio = self.rng.random(n)
+        operacao = np.where(sorteio < 0.70, "Saída", np.where(sorteio < 0.95, "Entrada", "inventário")).astype(object)
+        classificacao = np.full(n, None, dtype=object)
+        saidas = operacao == "Saída"
+        entradas = operacao == "Entrada"
+        classificacao[saidas] = self.rng.choice(
+            np.array(["Vendas", "Desperdício", None], dtype=object),
+            size=int(saidas.sum()),
+            p=[0.85, 0.10, 0.05]
+        )
+        classificacao[entradas] = self.rng.choice(
+            np.array(["Compras", "Transferência", None], dtype=object),
+            size=int(entradas.sum()),
+            p=[0.90, 0.08, 0.02]
+        )
+
+        segundos = (self.rng.power(3.0, n) * self.dias * 86400).astype(np.int64)
+        datas = self.agora - pd.Timedelta(days=self.dias) + pd.to_timedelta(segundos, unit="s")
+
+        quantidade = np.round(self.rng.gamma(1.5, 2.0, n), 3)
+        quantidade[operacao == "inventário"] = np.round(self.rng.gamma(3.0, 5.0, int((operacao == "inventário").sum())), 3)
+
+        precos_base = self.precos[indices]
+        preco_movimentacao = np.round(precos_base * self.rng.normal(1.0, 0.08, n), 2)
+        preco_movimentacao[~entradas | (self.rng.random(n) < 0.25)] = np.nan
+
+        nomes = np.array([produto["nome"] for produto in produtos], dtype=object)
+        unidades = np.array([produto["unidade"] for produto in produtos], dtype=object)
+        preco_unidade = np.where(self.sem_preco, np.nan, self.precos)
+
+        colunas = {
+            "id": np.arange(1, n + 1, dtype=np.int64),
+            "id_produto": (indices + 1).astype(np.int64),
+            "operacao": pd.Series(operacao, dtype=object),
+            "classificacao": pd.Series(classificacao, dtype=object),
+            "unidade": pd.Series(unidades[indices], dtype=object),
+            "quantidade": quantidade.astype(np.float64),
+            "preco_movimentacao": preco_movimentacao.astype(np.float64),
+            "data_movimentacao": datas,
+            "data_validade": pd.Series([None] * n, dtype=object),
+            "informacoes": pd.Series([""] * n, dtype=object),
+            "nome": pd.Series(nomes[indices], dtype=object),
+            "preco_unidade": preco_unidade[indices].astype(np.float64)
+        }
+        self._movimentacoes = pd.DataFrame({
+            coluna: colunas[coluna] for coluna in CacheMovimentacoes.COLUNAS
+        }).sort_values("data_movimentacao", kind="stable").reset_index(drop=True)
+        self._movimentacoes["id"] = np.arange(1, n + 1, dtype=np.int64)
+        return self._movimentacoes
+
+    def movimentacoes(self) -> List[dict]:
+        df = self.movimentacoes_df()
+        produtos = {produto["id"]: produto for produto in self.produtos()}
+        datas = df["data_movimentacao"].dt.strftime("%Y-%m-%dT%H:%M:%S+00:00").tolist()
+        precos = df["preco_movimentacao"].astype(object).where(df["preco_movimentacao"].notna(), None).tolist()
+        return [
+            {
+                "id": id,
+                "id_produto": id_produto,
+                "operacao": operacao,
+                "classificacao": classificacao,
+                "unidade": unidade,
+                "quantidade": quantidade,
+                "preco_movimentacao": preco,
+                "data_movimentacao": data,
+                "data_validade": None,
+                "informacoes": "",
+                "produtos": {
+                    "nome": produtos[id_produto]["nome"],
+                    "preco_unidade": produtos[id_produto]["preco_unidade"],
+                    "categorias": produtos[id_produto]["categorias"]
+                }
+            }
+            for id, id_produto, operacao, classificacao, unidade, quantidade, preco, data in zip(
+                df["id"].tolist(),
+                df["id_produto"].tolist(),
+                df["operacao"].tolist(),
+                df["classificacao"].tolist(),
+                df["unidade"].tolist(),
+                df["quantidade"].tolist(),
+                precos,
+                datas
+            )
+        ]
+
+    def diario(self) -> List[dict]:
+        df = self.movimentacoes_df()
+        categorias = pd.Series(
+            [list(produto["categorias"]) or [""] for produto in self.produtos()],
+            index=[produto["id"] for produto in self.produtos()]
+        ).explode()
+        diario = pd.DataFrame({
+            "dia": df["data_movimentacao"].dt.tz_convert("America/Sao_Paulo").dt.tz_localize(None).dt.normalize(),
+            "id_produto": df["id_produto"],
+            "operacao": df["operacao"].str.lower(),
+            "classificacao": df["classificacao"].str.lower().fillna("sem class."),
+            "quantidade": df["quantidade"],
+            "valor": df["quantidade"] * df["preco_movimentacao"].fillna(df["preco_unidade"]).fillna(0)
+        })
+        inventario = diario["operacao"] == "inventário"
+        ordem = pd.Series(np.arange(len(diario)), index=diario.index)
+        ultimo = ordem.where(inventario, -1).groupby([diario["id_produto"], diario["dia"]]).transform("max")
+        sinal = diario["quantidade"].where(diario["operacao"] != "saída", -diario["quantidade"])
+        diario["variacao_saldo"] = np.select(
+            [ultimo < 0, ordem == ultimo, ordem > ultimo],
+            [sinal, diario["quantidade"], sinal],
+            0.0
+        )
+        diario = (
+            diario.groupby(["dia", "id_produto", "operacao", "classificacao"], as_index=False)
+            [["quantidade", "valor", "variacao_saldo"]]
+            .sum()
+            .merge(categorias.rename("categoria").rename_axis("id_produto").reset_index(), on="id_produto")
+        )
+        diario["dia"] = diario["dia"].dt.strftime("%Y-%m-%d")
+        return diario[[
+            "dia", "id_produto", "categoria", "operacao", "classificacao", "quantidade", "valor", "variacao_saldo"
+        ]].to_dict("records")
+
+    def fichas(self) -> List[dict]:
+        produtos = self.produtos()
+        tamanhos = np.clip(self.rng.poisson(6, self.n_fichas), 2, 20)
+        fichas = []
+        for i, tamanho in enumerate(tamanhos):
+            escolhidos = self.rng.choice(
+                self.n_produtos,
+                size=min(int(tamanho), self.n_produtos),
+                replace=False,
+                p=self.popularidade
+            )
+            fichas.append({
+                "id": i + 1,
+                "empresa_id": 1,
+                "nome": f"ficha {i + 1}",
+                "unidade": "unidades (und)",
+                "qtd_porcao": int(self.rng.integers(1, 10)),
+                "estoque": None,
+                "ingredientes": {
+                    produtos[p]["nome"]: {
+                        "id": produtos[p]["id"],
+                        "quantidade": f"{self.rng.gamma(1.2, 0.2):.3f}".replace(".", ","),
+                        "unidade": produtos[p]["unidade"]
+                    }
+                    for p in escolhidos
+                }
+            })
+        return fichas
+
+    def listas_compras(self) -> List[dict]:
+        produtos = self.produtos()
+        listas = []
+        for i in range(self.n_listas):
+            escolhidos = self.rng.choice(
+                self.n_produtos,
+                size=min(int(self.rng.integers(5, 60)), self.n_produtos),
+                replace=False,
+                p=self.popularidade
+            )
+            itens = {
+                produtos[p]["nome"]: {
+                    "id": produtos[p]["id"],
+                    "unidade": produtos[p]["unidade"],
+                    "quantidade": produtos[p]["quantidade"],
+                    "qtd_comprar": float(self.rng.integers(1, 20)),
+                    "estoque_minimo": produtos[p]["estoque_minimo"],
+                    "preco": produtos[p]["preco_unidade"] or 0.0,
+                    "categorias": " | ".join(produtos[p]["categorias"])
+                }
+                for p in escolhidos
+            }
+            finalizada = bool(self.rng.random() < 0.6)
+            listas.append({
+                "id": i + 1,
+                "empresa_id": 1,
+                "nome": f"lista {i + 1}",
+                "valor_total": sum(item["preco"] * item["qtd_comprar"] for item in itens.values()),
+                "produtos": itens,
+                "recebimento": (self.agora - pd.Timedelta(days=i)).strftime("%Y-%m-%d %H:%M:%S") if finalizada else None,
+                "finalizada": finalizada
+            })
+        return listas
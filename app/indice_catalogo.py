@@ -0,0 +1,185 @@
+import bisect
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+def normalizar(texto) -> str:
+    texto = str(texto or "")
+    if not texto.isascii():
+        texto = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    return " ".join(texto.lower().split())
+
+
+def _lista(valor) -> List[str]:
+    if isinstance(valor, dict):
+        nomes = valor.get("nomes")
+        valor = nomes if isinstance(nomes, list) else list(valor)
+    elif isinstance(valor, str):
+        valor = valor.split("|")
+    elif not isinstance(valor, (list, tuple, set)):
+        return []
+    return [str(item).strip() for item in valor if item and str(item).strip()]
+
+
+def _numero(valor) -> Optional[float]:
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        return None
+    return numero if numero == numero else None
+
+
+class IndiceCatalogo:
+    TAMANHO_GRAMA = 3
+    SIMILARIDADE = 0.5
+
+    def __init__(self, produtos: Iterable[dict]=()) -> None:
+        self.registros = {}
+        self.gramas = {}
+        self.palavras = []
+        self.categorias = {}
+        self.fornecedores = {}
+        self._ordens = {}
+        for produto in produtos:
+            self.palavras += self._indexar(produto)
+        self.palavras.sort()
+
+    @classmethod
+    def de_rotulos(cls, rotulos: Dict[int, str]) -> "IndiceCatalogo":
+        return cls({"id": id, "nome": nome} for id, nome in rotulos.items())
+
+    def __len__(self) -> int:
+        return len(self.registros)
+
+    def __contains__(self, id: int) -> bool:
+        return id in self.registros
+
+    def adicionar(self, produto: dict) -> None:
+        self.remover(produto["id"])
+        for palavra in self._indexar(produto):
+            bisect.insort(self.palavras, palavra)
+
+    def remover(self, id: int) -> None:
+        registro = self.registros.pop(id, None)
+        if registro is None:
+            return
+        for grama in self._gramas(registro["texto"]):
+            self.gramas[grama].discard(id)
+        for nome in registro["categorias"]:
+            self.categorias[nome].discard(id)
+        for nome in registro["fornecedores"]:
+            self.fornecedores[nome].discard(id)
+        self.palavras = [palavra for palavra in self.palavras if palavra[1] != id]
+        self._ordens = {}
+
+    def _indexar(self, produto: dict) -> List[Tuple[str, int]]:
+        id = produto["id"]
+        categorias = _lista(produto.get("categorias"))
+        fornecedores = _lista(produto.get("fornecedores"))
+        nome = normalizar(produto.get("nome"))
+        texto = " ".join([nome, normalizar(" ".join(categorias + fornecedores))]).strip()
+        preco = _numero(produto.get("preco_unidade"))
+        quantidade = _numero(produto.get("quantidade"))
+
+        self.registros[id] = {
+            "nome": nome,
+            "texto": texto,
+            "categorias": categorias,
+            "fornecedores": fornecedores,
+            "preco": preco,
+            "valor_estoque": None if preco is None or quantidade is None else preco * quantidade
+        }
+        for grama in self._gramas(texto):
+            self.gramas.setdefault(grama, set()).add(id)
+        for categoria in categorias:
+            self.categorias.setdefault(categoria, set()).add(id)
+        for fornecedor in fornecedores:
+            self.fornecedores.setdefault(fornecedor, set()).add(id)
+        self._ordens = {}
+
+        return [(palavra, id) for palavra in set(texto.split())]
+
+    @classmethod
+    def _gramas(cls, texto: str) -> Set[str]:
+        return {
+            palavra[i:i + cls.TAMANHO_GRAMA]
+            for palavra in texto.split()
+            for i in range(len(palavra) - cls.TAMANHO_GRAMA + 1)
+        }
+
+    def opcoes_categorias(self) -> List[str]:
+        return sorted((nome for nome, ids in self.categorias.items() if ids), key=normalizar)
+
+    def opcoes_fornecedores(self) -> List[str]:
+        return sorted((nome for nome, ids in self.fornecedores.items() if ids), key=normalizar)
+
+    def ordenar(self, chave: str="nome", reverso: bool=False) -> List[int]:
+        ordem = self._ordens.get((chave, reverso))
+        if ordem is None:
+            if chave == "nome":
+                ids = sorted(self.registros, key=lambda id: (self.registros[id]["nome"], id), reverse=reverso)
+            else:
+                sinal = -1 if reverso else 1
+                com_valor = [id for id, registro in self.registros.items() if registro[chave] is not None]
+                sem_valor = [id for id, registro in self.registros.items() if registro[chave] is None]
+                ids = sorted(com_valor, key=lambda id: (sinal * self.registros[id][chave], self.registros[id]["nome"]))
+                ids += sorted(sem_valor, key=lambda id: self.registros[id]["nome"])
+            ordem = ids, {id: posicao for posicao, id in enumerate(ids)}
+            self._ordens[(chave, reverso)] = ordem
+        return ordem[0]
+
+    def buscar(
+        self,
+        texto: str="",
+        categorias: Optional[Iterable[str]]=None,
+        fornecedores: Optional[Iterable[str]]=None,
+        ordem: Optional[Tuple[str, bool]]=None,
+        limite: Optional[int]=None
+    ) -> List[int]:
+        termos = normalizar(texto).split()
+        candidatos = None
+        for termo in termos:
+            encontrados = self._termo(termo)
+            candidatos = encontrados if candidatos is None else candidatos & encontrados
+            if not candidatos:
+                return []
+        for filtro, facetas in ((categorias, self.categorias), (fornecedores, self.fornecedores)):
+            if filtro:
+                selecionados = set().union(*(facetas.get(nome, set()) for nome in filtro))
+                candidatos = selecionados if candidatos is None else candidatos & selecionados
+
+        ids = self.ordenar(*(ordem or ("nome", False)))
+        if candidatos is None:
+            return ids[:limite]
+        posicoes = self._ordens[ordem or ("nome", False)][1]
+        if ordem is None and termos:
+            chave = lambda id: (not self.registros[id]["nome"].startswith(termos[0]), posicoes[id])
+        else:
+            chave = posicoes.__getitem__
+        return sorted(candidatos, key=chave)[:limite]
+
+    def _termo(self, termo: str) -> Set[int]:
+        indice = bisect.bisect_left(self.palavras, (termo,))
+        encontrados = set()
+        while indice < len(self.palavras) and self.palavras[indice][0].startswith(termo):
+            encontrados.add(self.palavras[indice][1])
+            indice += 1
+        if len(termo) < self.TAMANHO_GRAMA:
+            return encontrados
+
+        gramas = self._gramas(termo)
+        postagens = sorted((self.gramas.get(grama, set()) for grama in gramas), key=len)
+        if postagens[0]:
+            encontrados |= {
+                id for id in set.intersection(*postagens)
+                if termo in self.registros[id]["texto"]
+            }
+        if encontrados:
+            return encontrados
+
+        contagem = {}
+        for postagem in postagens:
+            for id in postagem:
+                contagem[id] = contagem.get(id, 0) + 1
+        minimo = self.SIMILARIDADE * len(gramas)
+        return {id for id, total in contagem.items() if total >= minimo}
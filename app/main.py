@@ -14,6 +14,10 @@ from modelos import (
     Empresa,
 )
 from controles import InfosGlobal
+from tempo_real import TempoReal
+from renderizador_graficos import RenderizadorGraficos
+from monitor_consultas import MonitorConsultas, PainelConsultas, TransporteInstrumentado
+from perfil_interface import PerfilInterface
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -329,6 +333,11 @@ class App(ft.Container):
             alignment=ft.alignment.top_left
         )
         # self.content = Login(ControleConteudo(self))
+        self.painel_consultas = PainelConsultas()
+
+    def atalho(self, e: ft.KeyboardEvent) -> None:
+        if e.ctrl and e.shift and e.key == "D":
+            self.painel_consultas.alternar()
 
     def alterar_pagina(self, label):
         paginas = {
@@ -341,6 +350,8 @@ class App(ft.Container):
 
         criar_pagina = paginas.get(label)
         if criar_pagina:
+            MonitorConsultas().definir_pagina(label)
+            PerfilInterface().navegar(label, self.area.conteudo)
             self.area.atualizar_conteudo(criar_pagina())
 
     def iniciar_app(self, usuario):
@@ -353,9 +364,15 @@ class App(ft.Container):
 
         self.content = ft.ResponsiveRow([self.menu_lateral, self.area], expand=True, spacing=0)
         self.update()
+        MonitorConsultas().definir_pagina("Painel")
+        PerfilInterface().navegar("Painel", self.area.conteudo)
         self.area.atualizar_conteudo(Painel())
+        self.page.run_task(TempoReal().conectar, empresa.id)
     
     def logoff(self):
+        self.page.run_task(TempoReal().desconectar)
+        MonitorConsultas().definir_pagina("Login")
+        PerfilInterface().navegar("Login", self)
         self.content = Login(ControleConteudo(self))
         self.update()
 
@@ -368,10 +385,18 @@ class App(ft.Container):
 def main(page):
     config = configparser.ConfigParser()
     config.read("./app/credenciais.ini")
-    _ = SupabaseSingleton(config["supabase"]["Url"], config["supabase"]["Key"])
+    _ = SupabaseSingleton(config["supabase"]["Url"], config["supabase"]["Key"], transporte=TransporteInstrumentado())
+    MonitorConsultas().instalar(page.loop)
+    _ = TempoReal(config.get("realtime", "Url", fallback=None), config.get("realtime", "Key", fallback=None))
+    RenderizadorGraficos().aquecer()
+    if config.getboolean("perfil", "Ativo", fallback=False):
+        PerfilInterface().instalar()
 
     page.padding = ft.padding.all(0)
     app = App()
+    page.overlay.append(app.painel_consultas)
+    page.on_keyboard_event = app.atalho
     page.add(app)
 
-ft.app(target=main, assets_dir="assets")
+if __name__ == "__main__":
+    ft.app(target=main, assets_dir="assets")
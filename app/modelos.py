@@ -1,6 +1,7 @@
 from datetime import datetime
-from typing import Optional
-from banco_de_dados import SupabaseSingleton
+import pandas as pd
+from typing import Iterable, List, Optional
+from repositorio import Repositorio
 
 
 UNIDADES = [
@@ -24,6 +25,29 @@ UNIDADES = [
 
 
 class Produto:
+    __slots__ = (
+        "id",
+        "nome",
+        "unidade",
+        "qtd_estoque",
+        "estoque_min",
+        "preco",
+        "categorias",
+        "fornecedores",
+        "cmv"
+    )
+    COLUNAS = (
+        "id",
+        "nome",
+        "unidade",
+        "quantidade",
+        "estoque_minimo",
+        "preco_unidade",
+        "categorias",
+        "fornecedores",
+        "cmv"
+    )
+
     def __init__(
         self,
         id=None,
@@ -46,28 +70,41 @@ class Produto:
         self.fornecedores = fornecedores
         self.cmv = cmv
 
-    def atualizar_qtd(self):
+    @classmethod
+    def from_records(cls, registros: Iterable[dict]) -> List["Produto"]:
+        registros = list(registros)
+        return [
+            cls(*valores)
+            for valores in zip(*([registro.get(coluna) for registro in registros] for coluna in cls.COLUNAS))
+        ]
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> List["Produto"]:
+        return [
+            cls(*valores)
+            for valores in zip(*(valores_coluna(df, coluna) for coluna in cls.COLUNAS))
+        ]
+
+    async def atualizar_qtd(self):
         try:
-            cliente = SupabaseSingleton().get_client()
-            resposta = (
-                cliente.table("produtos")
-                .select("quantidade")
-                .eq("id", self.id)
-                .execute()
-            ).data
+            resposta = await Repositorio().produto(self.id)
         except Exception as e:
             print(e)
         else:
-            self.qtd_estoque = resposta[0]["quantidade"]
+            self.qtd_estoque = resposta["quantidade"]
 
 
 class Empresa:
+    __slots__ = ("id", "nome")
+
     def __init__(self, id, nome):
         self.id = id
         self.nome = nome
 
 
 class Usuario:
+    __slots__ = ("id", "nome", "telefone", "empresas")
+
     def __init__(self, id, nome, telefone):
         self.id = id
         self.nome = nome
@@ -76,12 +113,16 @@ class Usuario:
 
 
 class Categoria:
+    __slots__ = ("nome", "cor")
+
     def __init__(self, nome: str, cor: str):
         self.nome = nome
         self.cor = cor
 
 
 class Fornecedor:
+    __slots__ = ("nome", "vendedor", "telefone")
+
     def __init__(self, nome, vendedor, telefone):
         self.nome = nome
         self.vendedor = vendedor
@@ -89,6 +130,20 @@ class Fornecedor:
 
 
 class Movimentacao:
+    __slots__ = (
+        "id",
+        "operacao",
+        "classificacao",
+        "data",
+        "nome",
+        "qtd",
+        "unidade",
+        "valor_unit",
+        "mensagem",
+        "produto_id",
+        "qtd_estoque"
+    )
+
     def __init__(
         self,
         id: int,
@@ -114,3 +169,152 @@ class Movimentacao:
         self.mensagem = mensagem
         self.produto_id = produto_id
         self.qtd_estoque = qtd_estoque
+
+    @classmethod
+    def from_records(cls, movimentacoes: Iterable[dict]) -> List["Movimentacao"]:
+        resultado = []
+        for mov in movimentacoes:
+            produto = mov.get("produtos") or {}
+            preco = mov["preco_movimentacao"]
+            resultado.append(cls(
+                mov["id"],
+                mov["operacao"],
+                mov["classificacao"],
+                datetime.fromisoformat(mov["data_movimentacao"]),
+                produto.get("nome"),
+                mov["quantidade"],
+                mov["unidade"],
+                preco if preco is not None else produto.get("preco_unidade"),
+                mov["informacoes"],
+                mov["id_produto"]
+            ))
+        return resultado
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> List["Movimentacao"]:
+        return [
+            cls(*valores)
+            for valores in zip(
+                valores_coluna(df, "id"),
+                valores_coluna(df, "operacao"),
+                valores_coluna(df, "classificacao"),
+                df["data_movimentacao"].array.to_pydatetime().tolist(),
+                valores_coluna(df, "nome"),
+                valores_coluna(df, "quantidade"),
+                valores_coluna(df, "unidade"),
+                df["preco_movimentacao"].fillna(df["preco_unidade"]).tolist(),
+                valores_coluna(df, "informacoes"),
+                valores_coluna(df, "id_produto")
+            )
+        ]
+
+
+class ItemLista:
+    __slots__ = (
+        "id",
+        "nome",
+        "_unidade",
+        "_quantidade",
+        "estoque_minimo",
+        "preco",
+        "_categorias",
+        "_qtd_comprar"
+    )
+
+    def __init__(
+        self,
+        id: int,
+        nome: str,
+        unidade: str,
+        quantidade: float,
+        estoque_minimo: float,
+        preco: float,
+        categorias: dict,
+        qtd_comprar: float = 0
+    ) -> None:
+        self.id = id
+        self.nome = nome
+        self._unidade = unidade
+        self._quantidade = quantidade
+        self.estoque_minimo = estoque_minimo
+        self.preco = preco
+        self._categorias = categorias
+        self._qtd_comprar = qtd_comprar
+
+    @classmethod
+    def from_records(cls, produtos: Iterable[dict]) -> List["ItemLista"]:
+        return [
+            cls(
+                produto["id"],
+                produto["nome"],
+                produto["unidade"],
+                produto["quantidade"],
+                produto["estoque_minimo"],
+                produto["preco_unidade"],
+                produto["categorias"]
+            )
+            for produto in produtos
+        ]
+
+    @classmethod
+    def from_lista(cls, produtos: dict) -> List["ItemLista"]:
+        return [
+            cls(
+                infos["id"],
+                nome,
+                infos["unidade"],
+                infos["quantidade"],
+                infos["estoque_minimo"],
+                infos["preco"],
+                infos["categorias"],
+                infos["qtd_comprar"]
+            )
+            for nome, infos in produtos.items()
+        ]
+
+    @property
+    def categorias(self) -> str:
+        if isinstance(self._categorias, dict):
+            return " | ".join(self._categorias.keys())
+        return self._categorias
+
+    @property
+    def unidade(self) -> str:
+        partes = self._unidade.split(" ", 1)
+        return partes[1].strip("()") if len(partes) > 1 else self._unidade
+
+    @property
+    def quantidade(self) -> str:
+        if isinstance(self._quantidade, float):
+            return str(int(self._quantidade)) if self._quantidade.is_integer() else f"{self._quantidade:.2f}".replace(".", ",")
+        return str(self._quantidade)
+
+    @property
+    def quantidade_num(self) -> float:
+        return self._quantidade
+
+    @property
+    def qtd_comprar(self) -> float:
+        return self._qtd_comprar
+
+    @property
+    def qtd_comprar_num(self) -> float:
+        return float(str(self._qtd_comprar).replace(",", "."))
+
+    @qtd_comprar.setter
+    def qtd_comprar(self, valor: str) -> None:
+        self._qtd_comprar = valor
+
+    def __eq__(self, id: int) -> bool:
+        if isinstance(id, int):
+            return self.id == id
+        return False
+
+
+def valores_coluna(df: pd.DataFrame, coluna: str) -> list:
+    if coluna not in df:
+        return [None] * len(df)
+    serie = df[coluna]
+    if serie.dtype == object:
+        serie = serie.where(serie.notna(), None)
+    return serie.tolist()
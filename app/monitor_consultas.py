@@ -0,0 +1,275 @@
+import asyncio
+import contextvars
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import unquote
+import flet as ft
+import httpx
+
+
+class MonitorConsultas:
+    _instance = None
+
+    LIMITE = 200
+    INFRAESTRUTURA = ("banco_de_dados", "repositorio", "replica", "monitor_consultas", "cache_movimentacoes")
+
+    origem = contextvars.ContextVar("origem_consulta", default=None)
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.pagina = "Login"
+            cls._instance.consultas = deque(maxlen=cls.LIMITE)
+            cls._instance.totais = {}
+            cls._instance._trava = threading.Lock()
+        return cls._instance
+
+    def definir_pagina(self, pagina: str) -> None:
+        self.pagina = pagina
+
+    def definir_origem(self, componente: ft.Control) -> contextvars.Token:
+        return self.origem.set((self.pagina, type(componente).__name__))
+
+    def instalar(self, loop: asyncio.AbstractEventLoop) -> None:
+        fabrica = loop.get_task_factory()
+
+        def criar_tarefa(loop, coro, **opcoes):
+            contexto = (opcoes.pop("context", None) or contextvars.copy_context()).copy()
+            if contexto.get(self.origem) is None:
+                instancia = getattr(getattr(coro, "cr_frame", None), "f_locals", {}).get("self")
+                if isinstance(instancia, ft.Control):
+                    contexto.run(self.definir_origem, instancia)
+            if fabrica is not None:
+                return fabrica(loop, coro, context=contexto, **opcoes)
+            return asyncio.Task(coro, loop=loop, context=contexto, **opcoes)
+
+        loop.set_task_factory(criar_tarefa)
+
+    def registrar(self, consulta: dict) -> None:
+        with self._trava:
+            self.consultas.append(consulta)
+            total = self.totais.setdefault(consulta["pagina"], {
+                "consultas": 0,
+                "linhas": 0,
+                "bytes": 0,
+                "latencia": 0.0,
+                "erros": 0
+            })
+            total["consultas"] += 1
+            total["linhas"] += consulta["linhas"] or 0
+            total["bytes"] += consulta["bytes"]
+            total["latencia"] += consulta["latencia"]
+            total["erros"] += int(consulta["erro"] is not None)
+
+    def ultimas(self, quantidade: int) -> List[dict]:
+        with self._trava:
+            return list(self.consultas)[-quantidade:][::-1]
+
+    def resumo(self) -> Dict[str, dict]:
+        with self._trava:
+            return {pagina: dict(total) for pagina, total in self.totais.items()}
+
+    def limpar(self) -> None:
+        with self._trava:
+            self.consultas.clear()
+            self.totais = {}
+
+    @classmethod
+    def componente(cls) -> Optional[str]:
+        quadro = sys._getframe(2)
+        reserva = None
+        while quadro is not None:
+            instancia = quadro.f_locals.get("self")
+            modulo = quadro.f_globals.get("__name__", "")
+            if isinstance(instancia, ft.Control):
+                return type(instancia).__name__
+            if reserva is None and instancia is not None and "." not in modulo and modulo not in cls.INFRAESTRUTURA:
+                reserva = type(instancia).__name__
+            quadro = quadro.f_back
+        return reserva
+
+
+class TransporteInstrumentado(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    def __init__(self, transporte=None, transporte_async=None) -> None:
+        self.transporte = transporte or httpx.HTTPTransport(http2=True)
+        self.transporte_async = transporte_async or transporte or httpx.AsyncHTTPTransport(http2=True)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        consulta = self._iniciar(request)
+        try:
+            resposta = self.transporte.handle_request(request)
+            resposta.read()
+        except Exception as e:
+            self._finalizar(consulta, erro=str(e))
+            raise
+        self._finalizar(consulta, resposta)
+        return resposta
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        consulta = self._iniciar(request)
+        try:
+            resposta = await self.transporte_async.handle_async_request(request)
+            await resposta.aread()
+        except Exception as e:
+            self._finalizar(consulta, erro=str(e))
+            raise
+        self._finalizar(consulta, resposta)
+        return resposta
+
+    def close(self) -> None:
+        self.transporte.close()
+
+    async def aclose(self) -> None:
+        await self.transporte_async.aclose()
+
+    def _iniciar(self, request: httpx.Request) -> dict:
+        recurso = request.url.path.split("/rest/v1/", 1)[-1].strip("/")
+        pagina, componente = MonitorConsultas.origem.get() or (MonitorConsultas().pagina, MonitorConsultas.componente())
+        return {
+            "hora": datetime.now(),
+            "pagina": pagina,
+            "componente": componente or "-",
+            "metodo": request.method,
+            "tabela": recurso,
+            "filtros": " & ".join(
+                f"{chave}={unquote(valor)}"
+                for chave, valor in request.url.params.multi_items()
+                if chave != "select"
+            ),
+            "inicio": time.perf_counter()
+        }
+
+    def _finalizar(self, consulta: dict, resposta: Optional[httpx.Response]=None, erro: Optional[str]=None) -> None:
+        consulta["latencia"] = time.perf_counter() - consulta.pop("inicio")
+        consulta["status"] = None if resposta is None else resposta.status_code
+        consulta["bytes"] = 0 if resposta is None else resposta.num_bytes_downloaded or len(resposta.content)
+        consulta["linhas"] = None if resposta is None else self._linhas(resposta)
+        if erro is None and resposta is not None and resposta.status_code >= 400:
+            erro = resposta.text[:200]
+        consulta["erro"] = erro
+        MonitorConsultas().registrar(consulta)
+
+    @staticmethod
+    def _linhas(resposta: httpx.Response) -> Optional[int]:
+        intervalo = resposta.headers.get("Content-Range", "").split("/")[0]
+        if "-" in intervalo:
+            inicio, fim = intervalo.split("-")
+            return int(fim) - int(inicio) + 1
+        if intervalo == "*":
+            return 0
+        if resposta.status_code >= 400 or not resposta.content:
+            return None
+        try:
+            dados = resposta.json()
+        except ValueError:
+            return None
+        return len(dados) if isinstance(dados, list) else 1
+
+
+class PainelConsultas(ft.Container):
+    QUANTIDADE = 30
+    INTERVALO = 1
+
+    def __init__(self) -> None:
+        super().__init__(
+            right=10,
+            bottom=10,
+            width=760,
+            height=460,
+            padding=ft.padding.all(10),
+            bgcolor=ft.Colors.with_opacity(0.95, ft.Colors.BLUE_GREY_900),
+            border_radius=ft.border_radius.all(8),
+            visible=False
+        )
+        self.totais = ft.Column(spacing=2)
+        self.consultas = ft.ListView(spacing=2, expand=True)
+        self.content = ft.Column([
+            ft.Row([
+                ft.Text("Consultas ao Supabase", weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE),
+                ft.Row([
+                    ft.TextButton("Limpar", on_click=self._limpar),
+                    ft.IconButton(ft.Icons.CLOSE, icon_color=ft.Colors.WHITE, on_click=lambda e: self.alternar())
+                ])
+            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+            self.totais,
+            ft.Divider(color=ft.Colors.WHITE24),
+            self.consultas
+        ], spacing=5)
+
+    def alternar(self) -> None:
+        self.visible = not self.visible
+        if self.visible:
+            self._preencher()
+            self.page.run_task(self._acompanhar)
+        self.update()
+
+    async def _acompanhar(self) -> None:
+        while self.visible and self.page is not None:
+            await asyncio.sleep(self.INTERVALO)
+            if self.visible and self.page is not None:
+                self._preencher()
+                self.update()
+
+    def _limpar(self, e: ft.ControlEvent) -> None:
+        MonitorConsultas().limpar()
+        self._preencher()
+        self.update()
+
+    def _preencher(self) -> None:
+        monitor = MonitorConsultas()
+        self.totais.controls = [
+            self._linha(["Página", "Consultas", "Linhas", "Recebido", "Tempo", "Erros"], negrito=True)
+        ] + [
+            self._linha([
+                pagina,
+                str(total["consultas"]),
+                str(total["linhas"]),
+                self._tamanho(total["bytes"]),
+                f"{total['latencia']:.2f} s",
+                str(total["erros"])
+            ])
+            for pagina, total in sorted(monitor.resumo().items(), key=lambda item: -item[1]["bytes"])
+        ]
+        self.consultas.controls = [
+            ft.Text(
+                f"{consulta['hora']:%H:%M:%S} {consulta['pagina']}/{consulta['componente']} "
+                f"{consulta['metodo']} {consulta['tabela']} {consulta['filtros']} | "
+                f"{consulta['latencia'] * 1000:.0f} ms, "
+                f"{'-' if consulta['linhas'] is None else consulta['linhas']} linhas, "
+                f"{self._tamanho(consulta['bytes'])}"
+                + (f" | {consulta['erro']}" if consulta["erro"] else ""),
+                size=11,
+                color=ft.Colors.RED_200 if consulta["erro"] else ft.Colors.WHITE70,
+                max_lines=2,
+                overflow=ft.TextOverflow.ELLIPSIS,
+                selectable=True
+            )
+            for consulta in monitor.ultimas(self.QUANTIDADE)
+        ]
+
+    @staticmethod
+    def _linha(valores: List[str], negrito: bool=False) -> ft.Row:
+        return ft.Row([
+            ft.Text(
+                valor,
+                size=12,
+                color=ft.Colors.WHITE,
+                weight=ft.FontWeight.BOLD if negrito else None,
+                width=180 if i == 0 else 90
+            )
+            for i, valor in enumerate(valores)
+        ], spacing=5)
+
+    @staticmethod
+    def _tamanho(tamanho: int) -> str:
+        if tamanho < 1024:
+            return f"{tamanho} B"
+        for unidade in ("KB", "MB", "GB"):
+            tamanho /= 1024
+            if tamanho < 1024:
+                break
+        return f"{tamanho:.1f} {unidade}"
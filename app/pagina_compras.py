@@ -1,11 +1,15 @@
+import asyncio
 import flet as ft
 import pandas as pd
 from typing import Callable, List
 import locale
 from datetime import datetime
 
-from banco_de_dados import SupabaseSingleton
-from controles import InfosGlobal, ControleCompras
+from repositorio import Repositorio
+from tempo_real import TempoReal
+from modelos import ItemLista
+from controles import ControleCompras
+from indice_catalogo import IndiceCatalogo
 from componentes import (
     BotaoTonal,
     RotuloColuna,
@@ -16,66 +20,6 @@ from componentes import (
 locale.setlocale(locale.LC_ALL, "pt_BR.UTF-8")
 
 
-class ItemLista:
-    def __init__(
-        self,
-        id: int,
-        nome: str,
-        unidade: str,
-        quantidade: float,
-        estoque_minimo: float,
-        preco: float,
-        categorias: dict,
-        qtd_comprar: float = 0
-    ) -> None:
-        self.id = id
-        self.nome = nome
-        self._unidade = unidade
-        self._quantidade = quantidade
-        self.estoque_minimo = estoque_minimo
-        self.preco = preco
-        self._categorias = categorias
-        self._qtd_comprar = qtd_comprar
-
-    @property
-    def categorias(self) -> str:
-        if isinstance(self._categorias, dict):
-            return " | ".join(self._categorias.keys())
-        return self._categorias
-    
-    @property
-    def unidade(self) -> str:
-        partes = self._unidade.split(" ", 1)
-        return partes[1].strip("()") if len(partes) > 1 else self._unidade
-    
-    @property
-    def quantidade(self) -> str:
-        if isinstance(self._quantidade, float):
-            return str(int(self._quantidade)) if self._quantidade.is_integer() else f"{self._quantidade:.2f}".replace(".", ",")
-        return str(self._quantidade)
-
-    @property
-    def quantidade_num(self) -> float:
-        return self._quantidade
-    
-    @property
-    def qtd_comprar(self) -> float:
-        return self._qtd_comprar
-    
-    @property
-    def qtd_comprar_num(self) -> float:
-        return float(str(self._qtd_comprar).replace(",", "."))
-    
-    @qtd_comprar.setter
-    def qtd_comprar(self, valor: str) -> None:
-        self._qtd_comprar = valor
-    
-    def __eq__(self, id: int) -> bool:
-        if isinstance(id, int):
-            return self.id == id
-        return False
-
-
 class ControlePagina:
     def __init__(self, pagina) -> None:
         self.pagina = pagina
@@ -329,24 +273,104 @@ class LinhaTabelaProdutos(ft.DataRow):
             elemento.update()
         
 
+class ControleFiltroProdutos:
+    def __init__(self, tabela: ft.DataTable, indice: IndiceCatalogo) -> None:
+        self.tabela = tabela
+        self.indice = indice
+        self.texto = ""
+        self.categoria = None
+        self.fornecedor = None
+        self.abaixo_estoque = False
+
+    def buscar(self, texto: str) -> None:
+        self.texto = texto or ""
+        self.aplicar()
+
+    def filtrar_categoria(self, valor: str) -> None:
+        self.categoria = valor
+        self.aplicar()
+
+    def filtrar_fornecedor(self, valor: str) -> None:
+        self.fornecedor = valor
+        self.aplicar()
+
+    def filtrar_abaixo_estoque(self, filtrar: bool) -> None:
+        self.abaixo_estoque = filtrar
+        self.aplicar()
+
+    def limpar(self) -> None:
+        self.texto = ""
+        self.categoria = None
+        self.fornecedor = None
+        self.aplicar()
+
+    def aplicar(self) -> None:
+        ids = set(self.indice.buscar(
+            self.texto,
+            [self.categoria] if self.categoria else None,
+            [self.fornecedor] if self.fornecedor else None
+        ))
+        for linha in self.tabela.rows:
+            linha.visible = linha.produto.id in ids and (
+                not self.abaixo_estoque or linha.quantidade < linha.estoque_minimo
+            )
+        self.tabela.update()
+
+
 class FiltrosEstoque(ft.ResponsiveRow):
-    def __init__(self) -> None:
-        super().__init__(
-            controls=[
-                Filtro(
-                    "Filtrar categoria(s)",
-                    []
-                ),
-                Filtro(
-                    "Filtrar fornecedor(es)",
-                    []
-                ),
-                Filtro(
-                    "Filtrar por produtos(s)",
-                    []
-                ),
-            ]
+    def __init__(self, controle_filtros: ControleFiltroProdutos) -> None:
+        self.controle_filtros = controle_filtros
+        self.busca = ft.TextField(
+            hint_text="Buscar produto",
+            prefix_icon=ft.Icons.SEARCH,
+            border_radius=5,
+            border_color=ft.Colors.BLACK54,
+            cursor_color=ft.Colors.BLACK54,
+            col=3,
+            on_change=self.buscar
+        )
+        self.filtros = [
+            Filtro(
+                "Filtrar categoria(s)",
+                controle_filtros.indice.opcoes_categorias(),
+                mostrar_botao=self.mostrar_botao,
+                acao=controle_filtros.filtrar_categoria
+            ),
+            Filtro(
+                "Filtrar fornecedor(es)",
+                controle_filtros.indice.opcoes_fornecedores(),
+                mostrar_botao=self.mostrar_botao,
+                acao=controle_filtros.filtrar_fornecedor
+            )
+        ]
+        self.botao_limpar = ft.FilledTonalButton(
+            content=ft.ResponsiveRow([
+                ft.Image("./icons_clone/clear-alt.png", width=16, height=16, col=3),
+                ft.Text("Limpar filtros", col=9)
+            ]),
+            col=3,
+            style=ft.ButtonStyle(shape=ft.RoundedRectangleBorder(5), padding=ft.padding.all(15)),
+            visible=False,
+            on_click=self.limpar_filtros
         )
+        super().__init__(controls=[*self.filtros, self.busca, self.botao_limpar])
+
+    def buscar(self, e: ft.ControlEvent) -> None:
+        if self.busca.value:
+            self.mostrar_botao()
+        self.controle_filtros.buscar(self.busca.value)
+
+    def mostrar_botao(self) -> None:
+        self.botao_limpar.visible = True
+        self.botao_limpar.update()
+
+    def limpar_filtros(self, e: ft.ControlEvent) -> None:
+        for filtro in self.filtros:
+            filtro.limpar()
+        self.busca.value = ""
+        self.botao_limpar.visible = False
+        self.update()
+        self.controle_filtros.limpar()
 
 
 class CartaoListaCompras(ft.Card):
@@ -602,10 +626,10 @@ class PainelListaCompras(ft.Stack):
         self.controle_sombra = controle_sombra
         self.lista_compras = []
 
-    def _criar_conteudo(self) -> None:
+    def _criar_conteudo(self, produtos: List[dict]) -> None:
         self.expand = False
         self._criar_barra_lista_compras()
-        self._criar_tabela_produtos()
+        self._criar_tabela_produtos(produtos)
         self.controls = [
             ft.Column([
                 ft.Container(
@@ -644,7 +668,7 @@ class PainelListaCompras(ft.Stack):
                                 ], spacing=5) 
                             ),
                             ft.Divider(),
-                            FiltrosEstoque(),
+                            FiltrosEstoque(self.controle_filtros),
                             ft.ResponsiveRow([
                                 ft.Card(
                                     ft.Container(
@@ -682,38 +706,24 @@ class PainelListaCompras(ft.Stack):
         ]
         self.update()
 
-    def _criar_tabela_produtos(self) -> None:
-        produtos = self.ler_produtos()
+    def _criar_tabela_produtos(self, produtos: List[dict]) -> None:
         self.tabela_produtos = ft.DataTable(
             columns=[
                 ft.DataColumn(ft.Text()),
             ],
             rows=[
-                LinhaTabelaProdutos(
-                    ItemLista(
-                        produto["id"],
-                        produto["nome"],
-                        produto["unidade"],
-                        produto["quantidade"],
-                        produto["estoque_minimo"],
-                        produto["preco_unidade"],
-                        produto["categorias"]
-                    ),
-                    ControleListaCompras(self.lista_compras)
-                )
-                for produto in produtos
+                LinhaTabelaProdutos(item, ControleListaCompras(self.lista_compras))
+                for item in ItemLista.from_records(produtos)
             ],
             heading_row_height=0,
             column_spacing=10,
             data_row_max_height=float("inf"),
             horizontal_margin=0
         )
+        self.controle_filtros = ControleFiltroProdutos(self.tabela_produtos, IndiceCatalogo(produtos))
 
     def produtos_abaixo_estoque(self, e: ft.ControlEvent) -> None:
-        filtrar = e.data == "true"
-        for row in self.tabela_produtos.rows:
-            row.visible = (row.quantidade < row.estoque_minimo) if filtrar else True
-            row.update()
+        self.controle_filtros.filtrar_abaixo_estoque(e.data == "true")
 
     def _criar_barra_lista_compras(self) -> None:
         self.barra_lista_compras = BarraListaCompras(self.controle_sombra, self.controle_pagina)
@@ -724,22 +734,17 @@ class PainelListaCompras(ft.Stack):
     def ir_pagina_inicial(self, e: ft.ControlEvent) -> None:
         self.controle_pagina.pagina_inicial()
 
-    def ler_produtos(self) -> None:
+    async def ler_produtos(self) -> None:
         try:
-            cliente = SupabaseSingleton().get_client()
-            produtos = (
-                cliente.table("produtos")
-                .select("id, nome, unidade, quantidade, estoque_minimo, categorias, preco_unidade")
-                .execute()
-            ).data
+            produtos = await Repositorio().produtos()
         except Exception as e:
-            return []
-        else:
-            return produtos
+            print(e)
+            produtos = []
+        self._criar_conteudo(produtos)
 
     def did_mount(self) -> None:
         self.placeholder()
-        self._criar_conteudo()
+        self.page.run_task(self.ler_produtos)
 
 
 class JanelaConfimarRecebimento(ft.AlertDialog):
@@ -860,19 +865,7 @@ class BarraNavegacaoLA(ft.Container):
 
     def criar_conteudo(self, lista: dict) -> None:
         self.lista_id = lista["id"]
-        self.lista_produtos = [
-            ItemLista(
-                infos["id"],
-                nome,
-                infos["unidade"],
-                infos["quantidade"],
-                infos["estoque_minimo"],
-                infos["preco"],
-                infos["categorias"],
-                infos["qtd_comprar"]
-            )
-            for nome, infos in lista["produtos"].items()
-        ]
+        self.lista_produtos = ItemLista.from_lista(lista["produtos"])
         self.texto_valor = ft.Text(locale.currency(lista["valor_total"], grouping=True), weight=ft.FontWeight.BOLD)
         self.content = ft.ResponsiveRow([
             ft.Container(
@@ -993,19 +986,7 @@ class BarraNavegacaoLF(ft.Container):
         self.lista_produtos = None
 
     def criar_conteudo(self, lista: dict) -> None:
-        self.lista_produtos = [
-            ItemLista(
-                infos["id"],
-                nome,
-                infos["unidade"],
-                infos["quantidade"],
-                infos["estoque_minimo"],
-                infos["preco"],
-                infos["categorias"],
-                infos["qtd_comprar"]
-            )
-            for nome, infos in lista["produtos"].items()
-        ]
+        self.lista_produtos = ItemLista.from_lista(lista["produtos"])
         self.content = ft.ResponsiveRow([
             ft.Container(
                 ft.Column([
@@ -1116,13 +1097,15 @@ class PaginaCompras(ft.Stack):
     def __init__(self, controle_sombra) -> None:
         super().__init__()
         self.controle_sombra = controle_sombra
+        self.listas_compras = None
 
-    def _criar_conteudo(self) -> None:
+    def _criar_conteudo(self, dados_produtos: pd.DataFrame) -> None:
         self.expand = False
         self._criar_barra_navegacao_lf()
         self._criar_barra_navegacao_la()
 
-        cartoes_indicadores = self._criar_cartoes_indicadores()
+        cartoes_indicadores = self._criar_cartoes_indicadores(dados_produtos)
+        self.area_listas = ft.Column(self._criar_cartoes_listas(), spacing=20)
 
         self.area = ft.Column([
             ft.Container(
@@ -1139,8 +1122,7 @@ class PaginaCompras(ft.Stack):
                             ),
                             BotaoTonal("Gerenciar Fornecedores", "./icons_clone/shop.png", 3)
                         ]),
-                        CartaoListas("Listas em andamento", self.controle_bn_la, self.listas_compras),
-                        CartaoListas("Listas finalizadas", self.controle_bn_lf, self.listas_compras)
+                        self.area_listas
                     ], col=12, spacing=20)
                 ]),
                 padding=ft.padding.all(20)
@@ -1156,6 +1138,23 @@ class PaginaCompras(ft.Stack):
         self.controls = self.pagina_inicial
         self.update()
 
+    def _criar_cartoes_listas(self) -> List[CartaoListas]:
+        return [
+            CartaoListas("Listas em andamento", self.controle_bn_la, self.listas_compras),
+            CartaoListas("Listas finalizadas", self.controle_bn_lf, self.listas_compras)
+        ]
+
+    def receber_alteracao(self, tipo: str, registro: dict) -> None:
+        if self.listas_compras is None:
+            return
+        self.listas_compras = [lista for lista in self.listas_compras if lista["id"] != registro["id"]]
+        if tipo != "DELETE":
+            self.listas_compras.append(registro)
+            self.listas_compras.sort(key=lambda lista: lista["id"])
+        self.area_listas.controls = self._criar_cartoes_listas()
+        if self.area_listas.page is not None:
+            self.area_listas.update()
+
     def _criar_barra_navegacao_lf(self) -> None:
         self.barra_navegacao_lf = BarraNavegacaoLF(self.controle_sombra, ControlePagina(self))
         self.controle_bn_lf = ControleBarraNavegacao(self.barra_navegacao_lf, self.controle_sombra)
@@ -1171,8 +1170,7 @@ class PaginaCompras(ft.Stack):
         ]
         self.update()
 
-    def _criar_cartoes_indicadores(self) -> List[CartaoIndicadores]:
-        dados = self.ler_dados_produtos()
+    def _criar_cartoes_indicadores(self, dados: pd.DataFrame) -> List[CartaoIndicadores]:
         if len(dados) > 0:
             estoque_baixo = len(dados[dados['quantidade'] < dados['estoque_minimo']])
             estoque_critico = len(dados[dados['quantidade'] < (dados["estoque_minimo"] * 0.2)])
@@ -1207,41 +1205,32 @@ class PaginaCompras(ft.Stack):
         self.update()
 
     def exibir_pagina_inicial_e_atualizar(self) -> None:
+        if TempoReal().ativo:
+            self.exibir_pagina_inicial()
+            return
         self.controls = self.pagina_inicial
-        self.ler_dados_listas()
+        self.page.run_task(self.ler_dados_listas)
 
     def visualizacao_barra_lf(self, e: ft.ControlEvent) -> None:
         self.controle_bn_lf.ocultar_barra()
 
-    def ler_dados_produtos(self) -> pd.DataFrame:
+    async def ler_dados_listas(self) -> None:
+        repositorio = Repositorio()
         try:
-            cliente = SupabaseSingleton().get_client()
-            resposta = (
-                cliente.table("produtos")
-                .select("quantidade, estoque_minimo")
-                .eq("empresa_id", InfosGlobal().empresa_id)
-                .execute()
-            ).data
-        except Exception as e:
-            return pd.DataFrame([])
-        else:
-            return pd.DataFrame(resposta)
-        
-    def ler_dados_listas(self) -> None:
-        try:
-            cliente = SupabaseSingleton().get_client()
-            listas = (
-                cliente.table("lista_compras")
-                .select("*")
-                .eq("empresa_id", InfosGlobal().empresa_id)
-                .execute()
-            ).data
+            listas, produtos = await asyncio.gather(
+                repositorio.listas_compras(),
+                repositorio.produtos()
+            )
         except Exception as e:
             print(e)
         else:
             self.listas_compras = listas
-            self._criar_conteudo()
+            self._criar_conteudo(pd.DataFrame(produtos))
 
     def did_mount(self) -> None:
         self.placeholder()
-        self.ler_dados_listas()
+        TempoReal().ouvir("lista_compras", self.receber_alteracao)
+        self.page.run_task(self.ler_dados_listas)
+
+    def will_unmount(self) -> None:
+        TempoReal().parar("lista_compras", self.receber_alteracao)
@@ -1,28 +1,31 @@
+import asyncio
 from datetime import datetime
-from dateutil import parser
 import flet as ft
 import locale
 import pandas as pd
 from typing import Callable, List, Optional, Union
 
-from banco_de_dados import SupabaseSingleton
 from modelos import (
     Produto,
     Movimentacao,
     UNIDADES
 )
+from repositorio import Repositorio
+from tempo_real import TempoReal
+from cache_movimentacoes import CacheMovimentacoes
+from indice_catalogo import IndiceCatalogo
 from controles import (
     ControleProduto,
     ControleCategoria,
     ControleFornecedores,
     ControleMovimentacao,
-    InfosGlobal,
     ControleDropdownV2
 )
 from componentes import (
     RotuloColuna,
     TextoMonetario,
     GradeNotificacao,
+    GradeVirtual,
     CartaoNotificacao,
     BotaoTonal,
     CartaoIndicadores,
@@ -36,28 +39,58 @@ from componentes import (
 
 locale.setlocale(locale.LC_ALL, "pt_BR.UTF-8")
 
+TAMANHO_HISTORICO = 50
+
 
 class FiltrosEstoque(ft.ResponsiveRow):
     def __init__(self, controle_grade) -> None:
+        self.controle_grade = controle_grade
+        self.busca = ft.TextField(
+            hint_text="Buscar por nome, categoria ou fornecedor",
+            prefix_icon=ft.Icons.SEARCH,
+            border_radius=5,
+            border_color=ft.Colors.BLACK54,
+            cursor_color=ft.Colors.BLACK54,
+            col=12,
+            on_change=self.buscar
+        )
+        self.filtros = [
+            Filtro(
+                "Filtrar categoria(s)",
+                controle_grade.indice.opcoes_categorias(),
+                mostrar_botao=self.mostrar_botao,
+                acao=controle_grade.filtrar_categoria
+            ),
+            Filtro(
+                "Filtrar fornecedor(es)",
+                controle_grade.indice.opcoes_fornecedores(),
+                mostrar_botao=self.mostrar_botao,
+                acao=controle_grade.filtrar_fornecedor
+            ),
+            Filtro(
+                "Filtrar por alerta(s)",
+                []
+            ),
+            Filtro(
+                "Compõe CMV?",
+                ["Sim", "Não"],
+                mostrar_botao=self.mostrar_botao
+            )
+        ]
+        self.botao_limpar = ft.FilledTonalButton(
+            content=ft.ResponsiveRow([
+                ft.Image("./icons_clone/clear-alt.png", width=16, height=16, col=3),
+                ft.Text("Limpar filtros", col=9)
+            ]),
+            col=3,
+            style=ft.ButtonStyle(shape=ft.RoundedRectangleBorder(5), padding=ft.padding.all(15)),
+            visible=False,
+            on_click=self.limpar_filtros
+        )
         super().__init__(
             controls=[
-                Filtro(
-                    "Filtrar categoria(s)",
-                    []
-                ),
-                Filtro(
-                    "Filtrar fornecedor(es)",
-                    []
-                ),
-                Filtro(
-                    "Filtrar por alerta(s)",
-                    []
-                ),
-                Filtro(
-                    "Compõe CMV?",
-                    ["Sim", "Não"],
-                    mostrar_botao=self.mostrar_botao
-                ),
+                self.busca,
+                *self.filtros,
                 Filtro(
                     "Ordenar por:",
                     [
@@ -71,29 +104,26 @@ class FiltrosEstoque(ft.ResponsiveRow):
                     checked=0,
                     acao=self.acao_ordenar_por
                 ),
-                ft.FilledTonalButton(
-                    content=ft.ResponsiveRow([
-                        ft.Image("./icons_clone/clear-alt.png", width=16, height=16, col=3),
-                        ft.Text("Limpar filtros", col=9)
-                    ]),
-                    col=3,
-                    style=ft.ButtonStyle(shape=ft.RoundedRectangleBorder(5), padding=ft.padding.all(15)),
-                    visible=False,
-                    on_click=self.limpar_filtros
-                )
+                self.botao_limpar
             ]
         )
-        self.controle_grade = controle_grade
 
     def limpar_filtros(self, e: ft.ControlEvent) -> None:
-        for filtro in self.controls[:-2]:
+        for filtro in self.filtros:
             filtro.limpar()
-        self.controls[-1].visible = False
-        self.controls[-1].update()
+        self.busca.value = ""
+        self.botao_limpar.visible = False
+        self.update()
+        self.controle_grade.limpar()
 
     def mostrar_botao(self) -> None:
-        self.controls[-1].visible = True
-        self.controls[-1].update()
+        self.botao_limpar.visible = True
+        self.botao_limpar.update()
+
+    def buscar(self, e: ft.ControlEvent) -> None:
+        if self.busca.value:
+            self.mostrar_botao()
+        self.controle_grade.buscar(self.busca.value)
 
     def acao_ordenar_por(self, valor) -> None:
         self.controle_grade.filtrar_grade(valor)
@@ -128,12 +158,17 @@ class OperadorProduto:
         return ft.Row([])
         
     def obter_fornecedores(self) -> None:
+        texto = self.texto_fornecedores()
+        if texto:
+            return ft.ResponsiveRow([ft.Text(texto, col=12, size=13)])
+        return ft.ResponsiveRow([])
+
+    def texto_fornecedores(self) -> str:
         fornecedores = getattr(self.produto, "fornecedores", None)
         nomes = fornecedores.get("nomes") if isinstance(fornecedores, dict) else None
         if isinstance(nomes, list) and nomes:
-            texto = " | ".join(f.upper() for f in nomes)
-            return ft.ResponsiveRow([ft.Text(texto, col=12, size=13)])
-        return ft.ResponsiveRow([])
+            return " | ".join(f.upper() for f in nomes)
+        return ""
 
 
 class JanelaRegistrarMovimentacao(ft.AlertDialog):
@@ -318,7 +353,6 @@ class JanelaRegistrarMovimentacao(ft.AlertDialog):
     def registrar_movimentacao(self, e: ft.ControlEvent) -> None:
         self.controle.registrar(
             self.produto.id,
-            self.produto.qtd_estoque,
             self.entrada_acao.value,
             self.entrada_classificar_acao.value,
             self.entrada_unidade.value,
@@ -341,7 +375,6 @@ class JanelaEditarProduto(ft.AlertDialog):
         self.controle_produto = controle
         self.categorias = None
         self.fornecedores = None
-        self.ler_dados()
 
     def _criar_conteudo(self, categorias: List, fornecedores: List) -> None:
         self.mensagem = ft.Text(color=ft.Colors.RED, visible=False)
@@ -563,22 +596,13 @@ class JanelaEditarProduto(ft.AlertDialog):
             for cat in self.entrada_categoria.value
         }
 
-    def ler_dados(self) -> None:
+    async def ler_dados(self) -> None:
+        repositorio = Repositorio()
         try:
-            bd = SupabaseSingleton()
-            client = bd.get_client()
-            categorias = (
-                client.table("categoria")
-                .select("*")
-                .eq("empresa_id", InfosGlobal().empresa_id)
-                .execute()
-            ).data
-            fornecedores = (
-                client.table("fornecedores")
-                .select("*")
-                .eq("empresa_id", InfosGlobal().empresa_id)
-                .execute()
-            ).data
+            categorias, fornecedores = await asyncio.gather(
+                repositorio.categorias(),
+                repositorio.fornecedores()
+            )
         except Exception as e:
             print(e)
         else:
@@ -780,7 +804,6 @@ class JanelaCadProduto(ft.AlertDialog):
         self.nome_unidade = nome_unidade
         self.controle_produto = None
         self.unidades = UNIDADES
-        self.ler_dados()
 
     def _criar_conteudo(self, categorias: List, fornecedores: List) -> None:
         self.mensagem = ft.Text(color=ft.Colors.RED, visible=False)
@@ -1006,22 +1029,13 @@ class JanelaCadProduto(ft.AlertDialog):
     def definir_controle(self, controle) -> None:
         self.controle_produto = controle
 
-    def ler_dados(self) -> None:
+    async def ler_dados(self) -> None:
+        repositorio = Repositorio()
         try:
-            bd = SupabaseSingleton()
-            client = bd.get_client()
-            categorias = (
-                client.table("categoria")
-                .select("*")
-                .eq("empresa_id", InfosGlobal().empresa_id)
-                .execute()
-            ).data
-            fornecedores = (
-                client.table("fornecedores")
-                .select("*")
-                .eq("empresa_id", InfosGlobal().empresa_id)
-                .execute()
-            ).data
+            categorias, fornecedores = await asyncio.gather(
+                repositorio.categorias(),
+                repositorio.fornecedores()
+            )
         except Exception as e:
             print(e)
         else:
@@ -1105,6 +1119,8 @@ class JanelaExcluirProduto(ft.AlertDialog):
 
 
 class PainelInfos(ft.Container):
+    AGRUPAMENTO = 0.1
+
     def __init__(self, controle_sombra) -> None:
         super().__init__(
             expand=True,
@@ -1114,8 +1130,11 @@ class PainelInfos(ft.Container):
         self.controle_sombra = controle_sombra
         self.controle_acao = None
         self.produto = None
+        self._reconstrucao = None
+        self._recarregar_qtd = False
 
-    def criar_conteudo(self) -> None:
+    async def criar_conteudo(self) -> None:
+        movimentacoes = await self._movimentacoes()
         op = OperadorProduto(self.produto)
         preco, valor_estoque, qtd_estoque, estoque_min = op.formatar_valores()
         self.content = ft.Column([
@@ -1136,7 +1155,7 @@ class PainelInfos(ft.Container):
                             ft.Divider(),
                             self._criar_botoes(),
                             ft.ResponsiveRow([ft.Text("Movimentações e Históricos", col=12, color=ft.Colors.BLACK54)]),
-                            self._movimentacoes()
+                            movimentacoes
                         ]), bgcolor=ft.Colors.GREY_100, expand=True, padding=ft.padding.all(20),
                     )
                 ], scroll=ft.ScrollMode.ALWAYS),
@@ -1174,9 +1193,10 @@ class PainelInfos(ft.Container):
         janela = JanelaRegistrarMovimentacao(self.produto, controle)
         self.page.open(janela)
 
-    def _editar_produto(self, e: ft.ControlEvent) -> None:
+    async def _editar_produto(self, e: ft.ControlEvent) -> None:
         controle = ControleProduto(visualizacao=self)
         janela = JanelaEditarProduto(self.produto, controle)
+        await janela.ler_dados()
         self.page.open(janela)
 
     def _excluir(self, e: ft.ControlEvent) -> None:
@@ -1258,65 +1278,112 @@ class PainelInfos(ft.Container):
             )
         ])
 
-    def _movimentacoes(self) -> None:
+    async def _movimentacoes(self) -> ft.ResponsiveRow:
+        self.inicio_movimentacoes = 0
+        self.historico = ft.Column([])
+        self.botao_carregar_mais = ft.TextButton(
+            "Carregar mais",
+            visible=False,
+            on_click=self.carregar_mais_movimentacoes
+        )
+        await self._ler_pagina_movimentacoes()
+
+        return ft.ResponsiveRow([
+            ft.Card(
+                ft.Container(
+                    ft.Column([
+                        self.historico,
+                        ft.Row([self.botao_carregar_mais], alignment=ft.MainAxisAlignment.CENTER)
+                    ]),
+                    padding=ft.padding.symmetric(vertical=10, horizontal=0),
+                    bgcolor=ft.Colors.WHITE,
+                    border_radius=ft.border_radius.all(15),
+                ), col=12
+            )
+        ])
+
+    async def _ler_pagina_movimentacoes(self) -> None:
         try:
-            client = SupabaseSingleton().get_client()
-            respostas = (
-                client.table("movimentacao")
-                .select("*")
-                .eq("id_produto", self.produto.id)
-                .order("data_movimentacao", desc=True)
-                .execute()
-            ).data
+            pagina = await CacheMovimentacoes().historico(
+                self.produto.id,
+                self.inicio_movimentacoes,
+                TAMANHO_HISTORICO
+            )
         except Exception as e:
             print(e)
-            return ft.ResponsiveRow([])
         else:
-            respostas_form = [
-                [
-                    mov["id"],
-                    mov["operacao"],
-                    mov["classificacao"],
-                    parser.isoparse(mov["data_movimentacao"]),
-                    self.produto.nome,
-                    mov["quantidade"],
-                    self.produto.unidade,
-                    self.obter_preco(mov["preco_movimentacao"]),
-                    mov["informacoes"],
-                    self.produto.id,
-                    self.produto.qtd_estoque
-                ]
-                for mov in respostas
-            ]
-
-            return ft.ResponsiveRow([
-                ft.Card(
-                    ft.Container(
-                        ft.Column([
-                            LinhaHistorico(Movimentacao(*dado), ControleAcoesPainel(self))
-                            for dado in respostas_form
-                        ]),
-                        padding=ft.padding.symmetric(vertical=10, horizontal=0),
-                        bgcolor=ft.Colors.WHITE,
-                        border_radius=ft.border_radius.all(15),
-                    ), col=12
-                )
-            ])
+            self.historico.controls.extend(
+                LinhaHistorico(movimentacao, ControleAcoesPainel(self))
+                for movimentacao in Movimentacao.from_frame(pagina)
+            )
+            self.inicio_movimentacoes += len(pagina)
+            self.botao_carregar_mais.visible = len(pagina) == TAMANHO_HISTORICO
+
+    async def carregar_mais_movimentacoes(self, e: ft.ControlEvent) -> None:
+        self.botao_carregar_mais.disabled = True
+        self.botao_carregar_mais.update()
+        await self._ler_pagina_movimentacoes()
+        self.botao_carregar_mais.disabled = False
+        self.historico.update()
+        self.botao_carregar_mais.update()
     
-    def obter_preco(self, preco_mov: Optional[float]) -> float:
-        return preco_mov if pd.notna(preco_mov) else self.produto.preco
-
     def atualizar_conteudo(self, **kwars) -> None:
+        if TempoReal().ativo:
+            return
         self.placeholder()
-        self.produto.atualizar_qtd()
-        self.criar_conteudo()
-        self.update()
+        self.page.run_task(self._recarregar)
+
+    def receber_produto(self, tipo: str, registro: dict) -> None:
+        if self.produto is None or self.produto.id != registro["id"]:
+            return
+        if tipo == "DELETE":
+            self.fechar_janela(None)
+            return
+        self.produto.nome = registro["nome"]
+        self.produto.unidade = registro["unidade"]
+        self.produto.qtd_estoque = registro["quantidade"]
+        self.produto.estoque_min = registro["estoque_minimo"]
+        self.produto.preco = registro["preco_unidade"]
+        self.produto.categorias = registro["categorias"]
+        self.produto.fornecedores = registro["fornecedores"]
+        self.produto.cmv = registro["cmv"]
+        self._agendar(False)
+
+    def receber_movimentacao(self, tipo: str, registro: dict) -> None:
+        if self.produto is None:
+            return
+        if tipo == "DELETE":
+            afetado = any(linha.movimentacao.id == registro["id"] for linha in self.historico.controls)
+        else:
+            afetado = registro["id_produto"] == self.produto.id
+        if afetado:
+            self._agendar(True)
+
+    def _agendar(self, recarregar_qtd: bool) -> None:
+        self._recarregar_qtd = self._recarregar_qtd or recarregar_qtd
+        if self._reconstrucao is None:
+            self._reconstrucao = self.page.run_task(self._reconstruir)
+
+    async def _reconstruir(self) -> None:
+        await asyncio.sleep(self.AGRUPAMENTO)
+        recarregar_qtd = self._recarregar_qtd
+        self._reconstrucao = None
+        self._recarregar_qtd = False
+        if self.produto is None:
+            return
+        if recarregar_qtd:
+            await self._recarregar()
+        else:
+            await self.criar_conteudo()
+
+    async def _recarregar(self) -> None:
+        await self.produto.atualizar_qtd()
+        await self.criar_conteudo()
 
     def abrir_janela(self, produto: Produto) -> None:
         self.produto = produto
         self.placeholder()
-        self.criar_conteudo()
-        self.update()
+        self.page.run_task(self.criar_conteudo)
 
     def fechar_janela(self, e: ft.ControlEvent) -> None:
         self.produto = None
@@ -1334,6 +1401,14 @@ class PainelInfos(ft.Container):
     def definir_controle_acao(self, controle):
         self.controle_acao = controle 
 
+    def did_mount(self) -> None:
+        TempoReal().ouvir("produtos", self.receber_produto)
+        TempoReal().ouvir("movimentacao", self.receber_movimentacao)
+
+    def will_unmount(self) -> None:
+        TempoReal().parar("produtos", self.receber_produto)
+        TempoReal().parar("movimentacao", self.receber_movimentacao)
+
 
 class ControlePainelInfos:
     def __init__(self, painel_infos, controle_sombra) -> None:
@@ -1346,168 +1421,170 @@ class ControlePainelInfos:
 
 
 class CartaoItem(ft.Card):
-    def __init__(self, produto: Produto, controle_painel_infos: ControlePainelInfos) -> None:
-        super().__init__(col=4, elevation=10)
-        self.produto = produto
+    def __init__(self, controle_painel_infos: ControlePainelInfos) -> None:
+        super().__init__(elevation=10)
+        self.produto = None
         self.controle_painel_infos = controle_painel_infos
-        self._valor_estoque = 0
         self._criar_conteudo()
 
-    @property
-    def nome(self) -> str:
-        return self.produto.nome
-
-    @property
-    def preco(self) -> float:
-        return float(self.produto.preco)
-    
-    @property
-    def valor_estoque(self) -> float:
-        return float(self._valor_estoque)
-
     def _criar_conteudo(self) -> None:
+        self.texto_nome = ft.Text(
+            color=ft.Colors.BLACK87,
+            weight=ft.FontWeight.W_600,
+            col=9.5,
+            size=20,
+            max_lines=1,
+            overflow=ft.TextOverflow.ELLIPSIS
+        )
+        self.texto_fornecedores = ft.Text(size=13, max_lines=1, overflow=ft.TextOverflow.ELLIPSIS)
+        self.linha_categorias = ft.Row(scroll=ft.ScrollMode.HIDDEN)
+        self.texto_quantidade = self._criar_valor()
+        self.texto_estoque_min = self._criar_valor()
+        self.texto_preco = self._criar_valor()
+        self.texto_valor_estoque = self._criar_valor()
         self.content = ft.Container(
             ft.Column([
-                self._criar_cabecalho(),
+                ft.ResponsiveRow([
+                    self.texto_nome,
+                    ft.IconButton(
+                        ft.Icons.MENU_ROUNDED,
+                        col=2.5,
+                        icon_color=ft.Colors.BLACK54,
+                        on_click=self.abrir_configuracoes
+                    )
+                ], alignment=ft.MainAxisAlignment.CENTER),
                 ft.Divider(height=8),
-                self._criar_corpo()
+                self.texto_fornecedores,
+                self.linha_categorias,
+                ft.ResponsiveRow([
+                    self._criar_campo("Quantidade", self.texto_quantidade),
+                    self._criar_campo("Estoque mínimo", self.texto_estoque_min),
+                    self._criar_campo("Preço unitário", self.texto_preco),
+                    self._criar_campo("Valor do estoque", self.texto_valor_estoque)
+                ], spacing=0)
             ], spacing=5),
             padding=ft.padding.all(20),
             bgcolor=ft.Colors.WHITE,
             border_radius=ft.border_radius.all(15),
         )
-    
-    def _criar_cabecalho(self) -> ft.ResponsiveRow:
-        return ft.ResponsiveRow([
+
+    @staticmethod
+    def _criar_valor() -> ft.Text:
+        return ft.Text(size=17, color=ft.Colors.BLACK87, weight=ft.FontWeight.W_600)
+
+    @staticmethod
+    def _criar_campo(titulo: str, valor: ft.Text) -> ft.Column:
+        return ft.Column([
             ft.Text(
-                self.produto.nome.title(),
-                color=ft.Colors.BLACK87,
+                titulo,
+                size=15,
+                color=ft.Colors.BLACK54,
                 weight=ft.FontWeight.W_600,
-                col=9.5,
-                size=20
+                max_lines=1,
+                overflow=ft.TextOverflow.ELLIPSIS
             ),
-            ft.IconButton(
-                ft.Icons.MENU_ROUNDED,
-                col=2.5,
-                icon_color=ft.Colors.BLACK54,
-                on_click=self.abrir_configuracoes
-            )
-        ], alignment=ft.MainAxisAlignment.CENTER)
+            valor
+        ], col=6, spacing=0)
 
-    def _criar_corpo(self) -> ft.Column:
-        op = OperadorProduto(self.produto)
-        preco, self._valor_estoque, qtd_estoque, estoque_min = op.formatar_valores()
-        return ft.Column([
-            op.obter_fornecedores(),
-            op.obter_categorias(),
-            ft.ResponsiveRow([
-                ft.Column([
-                    ft.Text(
-                        "Quantidade",
-                        size=15,
-                        color=ft.Colors.BLACK54,
-                        weight=ft.FontWeight.W_600
-                    ),
-                    ft.Text(
-                        qtd_estoque,
-                        size=17,
-                        color=ft.Colors.BLACK87,
-                        weight=ft.FontWeight.W_600
-                    )
-                ], col=6, spacing=0),
-                ft.Column([
-                    ft.Text(
-                        "Estoque mínimo",
-                        size=15,
-                        color=ft.Colors.BLACK54,
-                        weight=ft.FontWeight.W_600,
-                        max_lines=1,
-                        overflow=ft.TextOverflow.ELLIPSIS
-                    ),
-                    ft.Text(
-                        estoque_min,
-                        size=17,
-                        color=ft.Colors.BLACK87,
-                        weight=ft.FontWeight.W_600
-                    )
-                ], col=6, spacing=0),
-                ft.Column([
-                    ft.Text(
-                        "Preço unitário",
-                        size=15,
-                        color=ft.Colors.BLACK54,
-                        weight=ft.FontWeight.W_600,
-                        max_lines=1,
-                        overflow=ft.TextOverflow.ELLIPSIS
-                    ),
-                    ft.Text(
-                        locale.currency(preco, grouping=True),
-                        size=17,
-                        color=ft.Colors.BLACK87,
-                        weight=ft.FontWeight.W_600
-                    )
-                ], col=6, spacing=0),
-                ft.Column([
-                    ft.Text(
-                        "Valor do estoque",
-                        size=15,
-                        color=ft.Colors.BLACK54,
-                        weight=ft.FontWeight.W_600,
-                        max_lines=1,
-                        overflow=ft.TextOverflow.ELLIPSIS
-                    ),
-                    ft.Text(
-                        locale.currency(self._valor_estoque, grouping=True),
-                        size=17,
-                        color=ft.Colors.BLACK87,
-                        weight=ft.FontWeight.W_600
-                    )
-                ], col=6, spacing=0)
-            ], spacing=0)
-        ])
+    def exibir(self, produto: Produto) -> None:
+        self.produto = produto
+        op = OperadorProduto(produto)
+        preco, valor_estoque, qtd_estoque, estoque_min = op.formatar_valores()
+        self.texto_nome.value = produto.nome.title()
+        self.texto_fornecedores.value = op.texto_fornecedores()
+        self._exibir_categorias(produto.categorias)
+        self.texto_quantidade.value = qtd_estoque
+        self.texto_estoque_min.value = estoque_min
+        self.texto_preco.value = locale.currency(preco, grouping=True)
+        self.texto_valor_estoque.value = locale.currency(valor_estoque, grouping=True)
+
+    def _exibir_categorias(self, categorias: Optional[dict]) -> None:
+        itens = list(categorias.items()) if isinstance(categorias, dict) else []
+        capsulas = self.linha_categorias.controls
+        del capsulas[len(itens):]
+        for posicao, (categoria, cor) in enumerate(itens):
+            if posicao < len(capsulas):
+                capsulas[posicao].exibir(categoria, cor)
+            else:
+                capsulas.append(CapsulaCategoria(categoria, cor))
 
     def abrir_configuracoes(self, e: ft.ControlEvent) -> None:
         self.controle_painel_infos.abrir_janela(self.produto)
 
-    def alterar_visibilidade(self, visibilidade: bool) -> None:
-        self.visible = visibilidade
-        self.update()
-
 
 class ControleGradeItem:
-    def __init__(self, grade):
+    CRITERIOS = {
+        "Alfabética (decrescente)":    ("nome", True),
+        "Alfabética (crescente)":      ("nome", False),
+        "Preço unit. (decrescente)":   ("preco", True),
+        "Preço unit. (crescente)":     ("preco", False),
+        "Valor do estoque (decrescente)": ("valor_estoque", True),
+        "Valor do estoque (crescente)":   ("valor_estoque", False),
+    }
+
+    def __init__(self, grade: GradeVirtual, indice: IndiceCatalogo):
         self.grade = grade
+        self.indice = indice
+        self.texto = ""
+        self.categoria = None
+        self.fornecedor = None
+        self.ordem = ("nome", False)
 
     def filtrar_grade(self, valor):
-        criterios = {
-            "Alfabética (decrescente)":    ("nome", True),
-            "Alfabética (crescente)":      ("nome", False),
-            "Preço unit. (decrescente)":   ("preco", True),
-            "Preço unit. (crescente)":     ("preco", False),
-            "Valor do estoque (decrescente)": ("valor_estoque", True),
-            "Valor do estoque (crescente)":   ("valor_estoque", False),
-        }
-
-        criterio = criterios.get(valor)
+        criterio = self.CRITERIOS.get(valor)
         if criterio:
-            chave, reverso = criterio
-            self.grade.itens = sorted(self.grade.itens, key=lambda item: getattr(item, chave), reverse=reverso)
-            self.grade.reiniciar_grade()
+            self.ordem = criterio
+            self.aplicar()
+
+    def buscar(self, texto: str) -> None:
+        self.texto = texto or ""
+        self.aplicar()
+
+    def filtrar_categoria(self, valor: str) -> None:
+        self.categoria = valor
+        self.aplicar()
+
+    def filtrar_fornecedor(self, valor: str) -> None:
+        self.fornecedor = valor
+        self.aplicar()
+
+    def limpar(self) -> None:
+        self.texto = ""
+        self.categoria = None
+        self.fornecedor = None
+        self.aplicar()
+
+    def aplicar(self, reiniciar: bool=True) -> None:
+        self.grade.exibir(self.indice.buscar(
+            self.texto,
+            [self.categoria] if self.categoria else None,
+            [self.fornecedor] if self.fornecedor else None,
+            self.ordem
+        ), reiniciar)
 
 
 class Estoque(ft.Stack):
+    ESPERA_PREVIA = 0.3
+
     def __init__(self, controle_sombra) -> None:
         super().__init__()
         self.controle_sombra = controle_sombra
         self.painel_infos = PainelInfos(controle_sombra)
         self.area_produtos = ft.Container(expand=True)
         self.produtos = None
+        self.registros = {}
         self.painel_infos.definir_controle_acao(ControleAcaoExcluir(self, self.painel_infos))
 
     def _criar_conteudo(self) -> None:
         self.expand = False
         valor_total, total_produtos, total_categoria = self._obter_estatisticas()
         self._criar_grade_itens()
+        self.texto_valor_total = TextoMonetario(
+            locale.currency(valor_total, grouping=True, symbol=False), 30, ft.FontWeight.BOLD, 11
+        )
+        self.texto_total_produtos = ft.Text(total_produtos, size=30, weight=ft.FontWeight.BOLD, col=12)
+        self.texto_total_categoria = ft.Text(total_categoria, size=30, weight=ft.FontWeight.BOLD, col=12)
+        self.grade_alertas = GradeNotificacao(self._cartoes_notificacoes(), 3)
 
         self.coluna_area = ft.Column([
             ft.Container(
@@ -1515,35 +1592,21 @@ class Estoque(ft.Stack):
                     ft.Column([
                         RotuloColuna("Estoque", "./icons_clone/boxes.png"),
                         ft.ResponsiveRow([
-                            CartaoIndicadores(
-                                "Valor total em estoque",
-                                TextoMonetario(
-                                    locale.currency(
-                                        valor_total,
-                                        grouping=True,
-                                        symbol=False
-                                    ), 30, ft.FontWeight.BOLD, 11
-                                ),
-                                4
-                            ),
+                            CartaoIndicadores("Valor total em estoque", self.texto_valor_total, 4),
                             CartaoIndicadores(
                                 "produtos cadastrados",
-                                ft.ResponsiveRow([
-                                    ft.Text(total_produtos,  size=30, weight=ft.FontWeight.BOLD, col=12)
-                                ]),
+                                ft.ResponsiveRow([self.texto_total_produtos]),
                                 4
                             ),
                             CartaoIndicadores(
                                 "categorias",
-                                ft.ResponsiveRow([
-                                    ft.Text(total_categoria,  size=30, weight=ft.FontWeight.BOLD, col=12)
-                                ]),
+                                ft.ResponsiveRow([self.texto_total_categoria]),
                                 4
                             )
                         ]),
-                        GradeNotificacao(self._cartoes_notificacoes(), 3),
+                        self.grade_alertas,
                         ft.Divider(),
-                        FiltrosEstoque(ControleGradeItem(self.grade_itens)),
+                        FiltrosEstoque(self.controle_grade),
                         ft.Divider(),
                         ft.ResponsiveRow([
                             ft.Container(
@@ -1581,24 +1644,39 @@ class Estoque(ft.Stack):
         self.update()
 
     def _criar_grade_itens(self) -> None:
-        self.grade_itens = GradeNotificacao([
-                CartaoItem(
-                    Produto(
-                        row["id"],
-                        row["nome"],
-                        row["unidade"],
-                        row["quantidade"],
-                        row["estoque_minimo"],
-                        row["preco_unidade"],
-                        row["categorias"],
-                        row["fornecedores"],
-                        row["cmv"]
-                    ),
-                    ControlePainelInfos(self.painel_infos, self.controle_sombra)
-                )
-                for _, row in self.df.iterrows()
-            ], 3
-        )
+        self.grade_itens = GradeVirtual(self._criar_cartao, self._obter_produto)
+        self.controle_grade = ControleGradeItem(self.grade_itens, self.indice)
+        self.controle_grade.aplicar()
+
+    def _criar_cartao(self) -> CartaoItem:
+        return CartaoItem(ControlePainelInfos(self.painel_infos, self.controle_sombra))
+
+    def _obter_produto(self, id: int) -> Produto:
+        return Produto.from_records([self.registros[id]])[0]
+
+    def receber_alteracao(self, tipo: str, registro: dict) -> None:
+        if self.produtos is None:
+            return
+        self.registros.pop(registro["id"], None)
+        if tipo == "DELETE":
+            self.indice.remover(registro["id"])
+        else:
+            self.registros[registro["id"]] = registro
+            self.indice.adicionar(registro)
+        self.produtos = sorted(self.registros.values(), key=lambda produto: produto["nome"])
+        self._criar_df(self.produtos)
+        self.controle_grade.aplicar(reiniciar=False)
+        self._atualizar_estatisticas()
+
+    def _atualizar_estatisticas(self) -> None:
+        valor_total, total_produtos, total_categoria = self._obter_estatisticas()
+        self.texto_valor_total.atualizar_valor(locale.currency(valor_total, grouping=True, symbol=False))
+        self.texto_total_produtos.value = total_produtos
+        self.texto_total_categoria.value = total_categoria
+        self.grade_alertas.itens = self._cartoes_notificacoes()
+        self.texto_total_produtos.update()
+        self.texto_total_categoria.update()
+        self.grade_alertas.reiniciar_grade()
 
     def _cartoes_notificacoes(self) -> List[CartaoNotificacao]:
         estoque_baixo, estoque_critico, sem_preco = self._calcular_alertas()
@@ -1668,7 +1746,7 @@ class Estoque(ft.Stack):
         if len(self.df) > 0:
             valor_total = (self.df['quantidade'] * self.df['preco_unidade']).dropna().sum()
             total_produtos = len(self.df)
-            total_categoria = len(set([cat for i, row in self.df.iterrows() for cat in row["categorias"].keys()]))
+            total_categoria = len(set([cat for categorias in self.df["categorias"] for cat in categorias.keys()]))
         else:
             valor_total = total_produtos = total_categoria = 0
         return valor_total, total_produtos, total_categoria
@@ -1676,36 +1754,64 @@ class Estoque(ft.Stack):
     def rolar(self, e: ft.ControlEvent) -> None:
         self.coluna_area.scroll_to(delta=400, duration=1000)
 
-    def janela_cad_produtos(self, e: ft.ControlEvent) -> None:
-        nome_unidade = [(row["nome"], row["unidade"]) for i, row in self.df.iterrows()]
+    async def janela_cad_produtos(self, e: ft.ControlEvent) -> None:
+        nome_unidade = list(zip(self.df["nome"], self.df["unidade"])) if len(self.df) else []
         janela = JanelaCadProduto(nome_unidade)
         controle = ControleProduto(visualizacao=self)
         janela.definir_controle(controle)
+        await janela.ler_dados()
         self.page.open(janela)
 
     def atualizar_dados(self) -> None:
-        self.ler_dados()
-        self.update()
-
-    def ler_dados(self) -> None:
+        if not TempoReal().ativo:
+            self.page.run_task(self.ler_dados)
+
+    async def ler_dados(self) -> None:
+        produtos = asyncio.ensure_future(Repositorio().produtos())
+        await asyncio.wait([produtos], timeout=self.ESPERA_PREVIA)
+        if not produtos.done():
+            await self._exibir_previa(produtos)
         try:
-            client = SupabaseSingleton().get_client()
-            resposta = (
-                client.table("produtos")
-                .select("*")
-                .eq("empresa_id", InfosGlobal().empresa_id)
-                .order("nome")
-                .execute()
-            )
+            resposta = await produtos
         except Exception as e:
             print(e)
-        else:   
-            self._criar_df(resposta.data)
+        else:
+            self.produtos = list(resposta)
+            self.registros = {produto["id"]: produto for produto in self.produtos}
+            self.indice = IndiceCatalogo(self.produtos)
+            self._criar_df(resposta)
             self._criar_conteudo()
 
+    async def _exibir_previa(self, produtos: asyncio.Future) -> None:
+        try:
+            pagina = await Repositorio().pagina_produtos(0, GradeVirtual.TAMANHO_PAGINA)
+        except Exception as e:
+            print(e)
+        else:
+            if produtos.done() or not pagina:
+                return
+            self.registros = {produto["id"]: produto for produto in pagina}
+            grade = GradeVirtual(self._criar_cartao, self._obter_produto)
+            grade.exibir(list(self.registros))
+            self.controls = [
+                ft.Container(
+                    ft.Column([
+                        RotuloColuna("Estoque", "./icons_clone/boxes.png"),
+                        ft.ProgressBar(),
+                        grade
+                    ]),
+                    padding=ft.padding.all(20)
+                )
+            ]
+            self.update()
+
     def _criar_df(self, dados: List) -> None:
         self.df = pd.DataFrame(dados)
 
     def did_mount(self) -> None:
         self.placeholder()
-        self.ler_dados()
+        TempoReal().ouvir("produtos", self.receber_alteracao)
+        self.page.run_task(self.ler_dados)
+
+    def will_unmount(self) -> None:
+        TempoReal().parar("produtos", self.receber_alteracao)
@@ -1,19 +1,20 @@
+import asyncio
 import flet as ft
 import locale
 from typing import Callable, Optional, List
 
 from modelos import UNIDADES
-from controles import (
-    InfosGlobal,
-    SupabaseSingleton,
-    ControleFichaTecnica
-)
+from repositorio import Repositorio
+from tempo_real import TempoReal
+from custo_fichas import MotorCustoFichas
+from controles import ControleFichaTecnica
 from componentes import (
     BotaoTonal,
     GradeNotificacao,
     RotuloColuna,
     TextField,
-    FiltroEntrada
+    FiltroEntrada,
+    DropdownV2
 )
 
 
@@ -82,7 +83,7 @@ class JanelaExcluir(ft.AlertDialog):
 
 
 class LinhaFicha(ft.Column):
-    def __init__(self, nome: str, infos: dict) -> None:
+    def __init__(self, nome: str, infos: dict, valor: float) -> None:
         super().__init__(
             controls=[
                 ft.ResponsiveRow([
@@ -101,7 +102,7 @@ class LinhaFicha(ft.Column):
                         overflow=ft.TextOverflow.ELLIPSIS
                     ),
                     ft.Text(
-                        f"custo: {locale.currency(infos["valor"], grouping=True)}",
+                        f"custo: {locale.currency(valor, grouping=True)}",
                         col=3.5,
                         size=15,
                         color=ft.Colors.BLACK54,
@@ -209,7 +210,7 @@ class CartaoFT(ft.Card):
             ft.Column([
                 ft.Text("Produtos", weight=ft.FontWeight.W_400, color=ft.Colors.BLACK54, size=17),
                 ft.Column([
-                    LinhaFicha(nome, infos)
+                    LinhaFicha(nome, infos, MotorCustoFichas().valor(self.ficha["id"], infos["id"]))
                     for nome, infos in self.ficha["ingredientes"].items()
                 ]),
                 ft.ResponsiveRow([
@@ -227,7 +228,11 @@ class CartaoFT(ft.Card):
         self.page.open(janela)
 
     def _calcular_custo(self) -> float:
-        return sum([infos["valor"] for infos in self.ficha["ingredientes"].values()])
+        return MotorCustoFichas().custo(self.ficha["id"])
+
+    def atualizar_custo(self) -> None:
+        self._criar_conteudo()
+        self.update()
 
     def visibilidade_painel(self, e: ft.ControlEvent) -> None:
         self.painel.visible = not self.painel.visible
@@ -325,75 +330,21 @@ class CapsulaDropdownFT(ft.Container):
         return {"id": self.id, "nome": self.rotulo}
 
 
-class DropdownFT(ft.PopupMenuButton):
+class DropdownFT(DropdownV2):
     def __init__(self, rotulos: dict, lista_produtos: ft.Column, ids: List=[]) -> None:
-        super().__init__(
-            tooltip="",
-            size_constraints=ft.BoxConstraints(
-                max_height=250,
-                min_width=200
-            ),
-            bgcolor=ft.Colors.WHITE
-        )
-        self.rotulos = rotulos
-        self.area_botao = ft.ResponsiveRow([], spacing=5)
         self.lista_produtos = lista_produtos
-        self._criar_interface()
-        self._carregar_itens_menu()
-        if len(ids) > 0:
-            self._carregar_valores_iniciais(ids)
+        super().__init__(rotulos, ids, largura=500)
 
-    @property
-    def value(self) -> Optional[list]:
-        if self.area_botao.controls:
-            return [capsula.value for capsula in self.area_botao.controls]
-        else:
-            return None
-
-    def _criar_interface(self) -> None:
-        self.content = ft.Container(
-            content=ft.ResponsiveRow([
-                ft.Container(
-                    self.area_botao,
-                    padding=ft.padding.only(left=5, bottom=5, right=5),
-                    border=ft.border.only(right=ft.border.BorderSide(1, ft.Colors.BLACK54)),
-                    expand=True,
-                    col=11
-                ),
-                ft.Column([
-                    ft.Icon(ft.Icons.ARROW_DROP_DOWN,color=ft.Colors.BLACK54)
-                ], col=1)
-            ], vertical_alignment=ft.CrossAxisAlignment.CENTER, expand=True, spacing=0),
-            padding=ft.padding.only(top=10, bottom=10),
-            alignment=ft.alignment.center,
-            width=500,
-            border_radius=15,
-            border=ft.border.all(1, ft.Colors.BLACK54)
-        )
+    def _criar_capsula(self, id: int) -> ft.Control:
+        return CapsulaDropdownFT(self.rotulos[id], id, self.excluir)
 
-    def _carregar_itens_menu(self) -> None:
-        self.items = [
-            ft.PopupMenuItem(
-                text=label,
-                on_click=lambda e, id=key: self._adicionar_item(id)
-            )
-            for key, label in self.rotulos.items()
-        ]
-
-    def _carregar_valores_iniciais(self, ids: List) -> None:
-        for id in ids:
-            self._adicionar_item(id)
-
-    def _adicionar_item(self, id: int) -> None:
-        self._adicionar_item_lista(id)
-        self.area_botao.controls.append(
-            CapsulaDropdownFT(self.rotulos[id], id, self.excluir)
-        )
-        self.area_botao.update()
-
-    def _adicionar_item_lista(self, id: int) -> None:
+    def _adicionar_item(self, id: int, atualizar: bool=True) -> None:
+        if any(capsula.id == id for capsula in self.area_botao.controls):
+            return
         self.lista_produtos.controls.append(LinhaProduto(id, self.rotulos[id]))
-        self.lista_produtos.update()
+        if atualizar:
+            self.lista_produtos.update()
+        super()._adicionar_item(id, atualizar)
 
     def _excluir_produto_lista(self, id: int) -> None:
         self.lista_produtos.controls = [
@@ -401,16 +352,8 @@ class DropdownFT(ft.PopupMenuButton):
         ]
         self.lista_produtos.update()
 
-    def atualizar_itens(self, id: int, nome: str) -> None:
-        self.rotulos[id] = nome
-        self._carregar_itens_menu()
-        self.update()
-
     def excluir(self, id: int) -> None:
-        self.area_botao.controls = [
-            capsula for capsula in self.area_botao.controls if int(capsula.id) != int(id)
-        ]
-        self.area_botao.update()
+        super().excluir(id)
         self._excluir_produto_lista(id)
 
 
@@ -424,7 +367,6 @@ class JanelaCadFicha(ft.AlertDialog):
         self.controle = controle
         self.unidades = UNIDADES
         self.lista_produtos = ft.Column([])
-        self.ler_produtos()
 
     def _criar_conteudo(self, produtos: List) -> None:
         self.criar_entradas()
@@ -539,16 +481,9 @@ class JanelaCadFicha(ft.AlertDialog):
         )
         self.page.close(self)
 
-    def ler_produtos(self) -> None:
+    async def ler_produtos(self) -> None:
         try:
-            client = SupabaseSingleton().get_client()
-            resposta = (
-                client.table("produtos")
-                .select("id, nome, unidade, preco_unidade")
-                .eq("empresa_id", InfosGlobal().empresa_id)
-                .order("nome")
-                .execute()
-            ).data
+            resposta = await Repositorio().produtos()
         except Exception as e:
             print(e)
         else:
@@ -558,6 +493,7 @@ class JanelaCadFicha(ft.AlertDialog):
 class PaginaFT(ft.Column):
     def __init__(self) -> None:
         super().__init__()
+        self.cartoes = {}
 
     def _criar_conteudo(self) -> None:
         self.expand = False
@@ -605,54 +541,46 @@ class PaginaFT(ft.Column):
         self.update()
 
     def _criar_grade_fichas(self) -> ft.ResponsiveRow:
+        self.cartoes = {
+            ficha["id"]: CartaoFT(ficha, ControlePaginaFicha(self))
+            for ficha in self.fichas
+        }
         if len(self.fichas) > 0:
-            return GradeNotificacao([
-                CartaoFT(ficha, ControlePaginaFicha(self))
-                for ficha in self.fichas
-            ], 2)
+            return GradeNotificacao(list(self.cartoes.values()), 2)
         return ft.ResponsiveRow([])
 
-    def janela_cad_ficha(self, e: ft.ControlEvent) -> None:
+    async def janela_cad_ficha(self, e: ft.ControlEvent) -> None:
         janela = JanelaCadFicha(ControleFichaTecnica(self))
+        await janela.ler_produtos()
         self.page.open(janela)
 
-    def calcular_valores_fichas(self) -> None:
-        produtos_dict = {produto["id"]: produto for produto in self.produtos}
-        
-        for ficha in self.fichas:
-            for produto_ficha in ficha["ingredientes"].values():
-                produto_id = produto_ficha["id"]
-                
-                if produto_id in produtos_dict:
-                    produto = produtos_dict[produto_id]
-                    valor = round(produto["preco_unidade"] * float(produto_ficha["quantidade"]), 2)
-                    produto_ficha.update({"valor": valor})
+    def receber_produto(self, tipo: str, registro: dict) -> None:
+        if tipo != "UPDATE":
+            return
+        for ficha_id in MotorCustoFichas().atualizar_preco(registro["id"], registro["preco_unidade"]):
+            if ficha_id in self.cartoes:
+                self.cartoes[ficha_id].atualizar_custo()
 
     def atualizar_dados(self) -> None:
-        self.ler_dados()
-        self.update()
+        self.page.run_task(self.ler_dados)
 
-    def ler_dados(self) -> None:
+    async def ler_dados(self) -> None:
+        repositorio = Repositorio()
         try:
-            client = SupabaseSingleton().get_client()
-            self.fichas = (
-                client.table("fichas_tecnicas")
-                .select("*")
-                .eq("empresa_id", InfosGlobal().empresa_id)
-                .execute()
-            ).data
-            self.produtos = (
-                client.table("produtos")
-                .select("id, preco_unidade")
-                .eq("empresa_id", InfosGlobal().empresa_id)
-                .execute()
-            ).data
+            self.fichas, self.produtos = await asyncio.gather(
+                repositorio.fichas_tecnicas(),
+                repositorio.produtos()
+            )
         except Exception as e:
             print(e)
         else:
-            self.calcular_valores_fichas()
+            MotorCustoFichas().carregar(self.fichas, self.produtos)
             self._criar_conteudo()
 
     def did_mount(self) -> None:
         self.placeholder()
-        self.ler_dados()
+        TempoReal().ouvir("produtos", self.receber_produto)
+        self.page.run_task(self.ler_dados)
+
+    def will_unmount(self) -> None:
+        TempoReal().parar("produtos", self.receber_produto)
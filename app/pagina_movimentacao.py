@@ -1,23 +1,35 @@
-from dateutil import parser
+from datetime import datetime
 import flet as ft
 import locale
 import pandas as pd
-from typing import Optional
+from typing import Callable, Dict, List, Optional
 
-from banco_de_dados import SupabaseSingleton
+from repositorio import Repositorio
+from tempo_real import TempoReal
+from cache_movimentacoes import CacheMovimentacoes
 from modelos import Movimentacao
-from controles import InfosGlobal
+from controles import ControleMovimentacao
 from componentes import (
     RotuloColuna,
     CartaoIndicadores,
     TextoMonetario,
     BotaoTonal,
     Filtro,
-    LinhaHistorico
+    LinhaHistorico,
+    TextField
 )
 
 locale.setlocale(locale.LC_ALL, "pt_BR.UTF-8")
 
+TAMANHO_PAGINA_LISTA = 50
+DISTANCIA_CARREGAMENTO = 600
+
+CLASSIFICACOES = {
+    "Entrada": ["Compras", "Produção", "Transferência"],
+    "Saída": ["Vendas", "Consumo interno", "Transferência", "Desperdício"],
+    "Inventário": []
+}
+
 
 class FiltrosMovimentacoes(ft.ResponsiveRow):
     def __init__(self) -> None:
@@ -71,65 +83,316 @@ class FiltrosMovimentacoes(ft.ResponsiveRow):
         self.controls[-1].update()
 
 
+class LinhaLote(ft.ResponsiveRow):
+    def __init__(
+        self,
+        produtos: Dict[str, dict],
+        ao_alterar: Callable[[], None],
+        ao_remover: Callable[["LinhaLote"], None],
+        valores: Optional[List[str]]=None
+    ) -> None:
+        super().__init__(vertical_alignment=ft.CrossAxisAlignment.CENTER)
+        self.produtos = produtos
+        self.ao_alterar = ao_alterar
+        self.ao_remover = ao_remover
+        self._criar_conteudo()
+        if valores:
+            self._preencher(valores)
+
+    def _criar_conteudo(self) -> None:
+        self.entrada_produto = self._criar_entrada(3.5, on_change=self._alterar_produto)
+        self.entrada_operacao = self._criar_dropdown(2, list(CLASSIFICACOES), self._alterar_operacao)
+        self.entrada_classificacao = self._criar_dropdown(2.5, [])
+        self.entrada_qtd = self._criar_entrada(
+            1.5,
+            input_filter=ft.InputFilter(regex_string=r"^(\d+(,\d*)?)?$", replacement_string="", allow=True)
+        )
+        self.entrada_preco = self._criar_entrada(
+            1.5,
+            input_filter=ft.InputFilter(regex_string=r"^(\d+(,\d*)?)?$", replacement_string="", allow=True)
+        )
+        self.controls = [
+            self.entrada_produto,
+            self.entrada_operacao,
+            self.entrada_classificacao,
+            self.entrada_qtd,
+            self.entrada_preco,
+            ft.IconButton(
+                content=ft.Image("./icons_clone/trash.png", width=16, height=16),
+                on_click=lambda e: self.ao_remover(self),
+                col=1
+            )
+        ]
+
+    def _criar_entrada(self, col: float, **kwargs) -> ft.TextField:
+        return ft.TextField(
+            col=col,
+            dense=True,
+            border_radius=10,
+            border_color=ft.Colors.BLACK54,
+            cursor_color=ft.Colors.BLACK54,
+            on_change=kwargs.pop("on_change", lambda e: self.ao_alterar()),
+            **kwargs
+        )
+
+    def _criar_dropdown(self, col: float, opcoes: List[str], on_change: Optional[Callable]=None) -> ft.Dropdown:
+        return ft.Dropdown(
+            options=[ft.dropdown.Option(opcao) for opcao in opcoes],
+            col=col,
+            dense=True,
+            border_radius=10,
+            border_color=ft.Colors.BLACK54,
+            bgcolor=ft.Colors.WHITE,
+            on_change=on_change
+        )
+
+    def _preencher(self, valores: List[str]) -> None:
+        valores = [valor.strip() for valor in valores] + [""] * (5 - len(valores))
+        produto, operacao, classificacao, qtd, preco = valores[:5]
+        self.entrada_produto.value = produto
+        self.entrada_operacao.value = self._opcao(list(CLASSIFICACOES), operacao)
+        self._definir_classificacoes()
+        self.entrada_classificacao.value = self._opcao(CLASSIFICACOES.get(self.entrada_operacao.value, []), classificacao)
+        self.entrada_qtd.value = qtd
+        self.entrada_preco.value = preco
+        self._validar_produto()
+
+    def _opcao(self, opcoes: List[str], valor: str) -> Optional[str]:
+        return next((opcao for opcao in opcoes if opcao.lower() == valor.lower()), None)
+
+    @property
+    def produto(self) -> Optional[dict]:
+        return self.produtos.get((self.entrada_produto.value or "").strip().lower())
+
+    @property
+    def valida(self) -> bool:
+        return all([self.produto, self.entrada_operacao.value, self.entrada_qtd.value])
+
+    def movimentacao(self, data_movimentacao: str) -> dict:
+        produto = self.produto
+        return {
+            "id_produto": produto["id"],
+            "acao": self.entrada_operacao.value,
+            "classificacao": self.entrada_classificacao.value,
+            "unidade": produto["unidade"],
+            "qtd": self.entrada_qtd.value,
+            "data_movimentacao": data_movimentacao,
+            "preco": self.entrada_preco.value or produto["preco_unidade"] or 0
+        }
+
+    def _validar_produto(self) -> None:
+        valor = self.entrada_produto.value
+        self.entrada_produto.error_text = "Produto não encontrado" if valor and self.produto is None else None
+
+    def _alterar_produto(self, e: ft.ControlEvent) -> None:
+        self._validar_produto()
+        self.entrada_produto.update()
+        self.ao_alterar()
+
+    def _definir_classificacoes(self) -> None:
+        self.entrada_classificacao.options = [
+            ft.dropdown.Option(opcao) for opcao in CLASSIFICACOES.get(self.entrada_operacao.value, [])
+        ]
+        self.entrada_classificacao.value = None
+
+    def _alterar_operacao(self, e: ft.ControlEvent) -> None:
+        self._definir_classificacoes()
+        self.entrada_classificacao.update()
+        self.ao_alterar()
+
+
+class JanelaRegistrarMovimentacoes(ft.AlertDialog):
+    def __init__(self, controle: ControleMovimentacao) -> None:
+        super().__init__(
+            modal=True,
+            bgcolor=ft.Colors.WHITE,
+            actions_padding=ft.padding.all(0)
+        )
+        self.controle = controle
+        self.produtos = {}
+
+    def _criar_conteudo(self) -> None:
+        self._criar_entradas()
+        self._criar_botoes()
+        self.content = ft.Container(
+            ft.Column([
+                ft.Text("Registrar movimentações", size=20, weight=ft.FontWeight.BOLD),
+                ft.Divider(),
+                ft.ResponsiveRow([
+                    self.entrada_dt_movimentacao,
+                    ft.Column([
+                        ft.Text("COLAR PLANILHA", weight=ft.FontWeight.W_500),
+                        ft.Text(
+                            "uma linha por movimentação: produto; ação; classificação; quantidade; preço",
+                            size=13,
+                            color=ft.Colors.BLACK54
+                        ),
+                        ft.Row([self.entrada_planilha, self.botao_importar])
+                    ], col=8, spacing=5)
+                ]),
+                ft.ResponsiveRow([
+                    ft.Text(rotulo, weight=ft.FontWeight.W_500, col=col)
+                    for rotulo, col in [
+                        ("PRODUTO", 3.5), ("AÇÃO", 2), ("CLASSIFICAÇÃO", 2.5), ("QUANTIDADE", 1.5), ("PREÇO", 1.5)
+                    ]
+                ]),
+                ft.Container(self.grade, expand=True),
+                ft.Row([self.botao_adicionar, self.texto_total], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+                ft.Column([
+                    ft.Divider(),
+                    ft.ResponsiveRow([
+                        self.botao_cancelar,
+                        self.botao_confirmar
+                    ], alignment=ft.MainAxisAlignment.END)
+                ], spacing=10)
+            ], spacing=10), height=600, width=1000
+        )
+
+    def _criar_entradas(self) -> None:
+        self.entrada_dt_movimentacao = TextField(
+            "DATA MOVIMENTAÇÃO",
+            4,
+            "aplicada a todas as linhas",
+            value=datetime.now().strftime("%d/%m/%Y"),
+            on_change=lambda e: self._atualizar_estado()
+        )
+        self.entrada_planilha = ft.TextField(
+            multiline=True,
+            min_lines=1,
+            max_lines=4,
+            expand=True,
+            border_radius=15,
+            border_color=ft.Colors.BLACK54,
+            cursor_color=ft.Colors.BLACK54
+        )
+        self.grade = ft.ListView([self._criar_linha()], spacing=5)
+        self.texto_total = ft.Text(color=ft.Colors.BLACK54, weight=ft.FontWeight.W_500)
+
+    def _criar_botoes(self) -> None:
+        self.botao_importar = ft.OutlinedButton("IMPORTAR", on_click=self.importar_planilha)
+        self.botao_adicionar = ft.TextButton("Adicionar linha", on_click=self.adicionar_linha)
+        self.botao_cancelar = ft.OutlinedButton(
+            "CANCELAR",
+            on_click=lambda e: self.page.close(self),
+            col=4,
+            style=ft.ButtonStyle(text_style=ft.TextStyle(foreground=ft.Paint(color=ft.Colors.BLACK54)))
+        )
+        self.botao_confirmar = ft.OutlinedButton(
+            "CONFIRMAR",
+            col=5,
+            style=ft.ButtonStyle(
+                bgcolor={
+                    ft.ControlState.DEFAULT: ft.Colors.BLUE_100,
+                    ft.ControlState.DISABLED: ft.Colors.GREY
+                },
+                text_style=ft.TextStyle(foreground=ft.Paint(color=ft.Colors.BLACK54))
+            ),
+            disabled=True,
+            on_click=self.registrar_movimentacoes
+        )
+
+    def _criar_linha(self, valores: Optional[List[str]]=None) -> LinhaLote:
+        return LinhaLote(self.produtos, self._atualizar_estado, self.remover_linha, valores)
+
+    @property
+    def linhas(self) -> List[LinhaLote]:
+        return self.grade.controls
+
+    def adicionar_linha(self, e: ft.ControlEvent) -> None:
+        self.linhas.append(self._criar_linha())
+        self.grade.update()
+        self._atualizar_estado()
+
+    def remover_linha(self, linha: LinhaLote) -> None:
+        self.linhas.remove(linha)
+        self.grade.update()
+        self._atualizar_estado()
+
+    def importar_planilha(self, e: ft.ControlEvent) -> None:
+        linhas = [
+            linha.split("\t" if "\t" in linha else ";")
+            for linha in (self.entrada_planilha.value or "").splitlines()
+            if linha.strip()
+        ]
+        self.grade.controls = [
+            linha for linha in self.linhas if linha.entrada_produto.value
+        ] + [self._criar_linha(valores) for valores in linhas]
+        self.entrada_planilha.value = ""
+        self.entrada_planilha.update()
+        self.grade.update()
+        self._atualizar_estado()
+
+    def _atualizar_estado(self) -> None:
+        validas = sum(linha.valida for linha in self.linhas)
+        self.texto_total.value = f"{validas} de {len(self.linhas)} movimentação(ões) prontas"
+        self.botao_confirmar.disabled = not (
+            self.linhas and validas == len(self.linhas) and self.entrada_dt_movimentacao.value
+        )
+        self.texto_total.update()
+        self.botao_confirmar.update()
+
+    def registrar_movimentacoes(self, e: ft.ControlEvent) -> None:
+        data_movimentacao = self.entrada_dt_movimentacao.value
+        self.controle.registrar_lote([linha.movimentacao(data_movimentacao) for linha in self.linhas])
+        self.page.close(self)
+
+    async def ler_dados(self) -> None:
+        try:
+            produtos = await Repositorio().produtos()
+        except Exception as e:
+            print(e)
+        else:
+            self.produtos.update({produto["nome"].lower(): produto for produto in produtos})
+            self._criar_conteudo()
+
+
 class PaginaMovimentacao(ft.Column):
     def __init__(self) -> None:
         super().__init__()
+        self.lista = None
 
-    def _criar_conteudo(self) -> None:
-        self.expand = False
-        self.scroll = ft.ScrollMode.ALWAYS
+    def _criar_conteudo(self, primeira_pagina: list) -> None:
+        self.expand = True
+        self.scroll = None
         
-        total_movimentacoes, total_entradas, total_saidas = self._estatisticas()
+        self._criar_lista(primeira_pagina)
+        self.texto_total_movimentacoes = ft.Text("-", size=30, weight=ft.FontWeight.BOLD)
+        self.texto_total_entradas = TextoMonetario("-", 30, ft.FontWeight.BOLD, 11)
+        self.texto_total_saidas = TextoMonetario("-", 30, ft.FontWeight.BOLD, 11)
         self.controls = [
             ft.Container(
-                ft.ResponsiveRow([
-                    ft.Column([
-                        RotuloColuna("Movimentações", "./icons_clone/exchange.png"),
-                        ft.ResponsiveRow([
-                            CartaoIndicadores(
-                                "Total de movimentações *",
-                                ft.Text(total_movimentacoes, size=30, weight=ft.FontWeight.BOLD),
-                                4
-                            ),
-                            CartaoIndicadores(
-                                "R$ total de entradas *",
-                                TextoMonetario(
-                                    locale.currency(total_entradas, grouping=True, symbol=False),
-                                    30,
-                                    ft.FontWeight.BOLD,
-                                    11
-                                ),
-                                4
-                            ),
-                            CartaoIndicadores(
-                                "R$ total de saídas *",
-                                TextoMonetario(
-                                    locale.currency(total_saidas, grouping=True, symbol=False),
-                                    30,
-                                    ft.FontWeight.BOLD,
-                                    11
-                                ),
-                                4
-                            )
-                        ]),
-                        ft.ResponsiveRow([
-                            ft.Text(
-                                "* os números acima consideram os filtros aplicados abaixo",
-                                col=10,
-                                color=ft.Colors.BLACK54,
-                                weight=ft.FontWeight.W_500
-                            )
-                        ]),
-                        ft.Divider(),
-                        FiltrosMovimentacoes(),
-                        ft.Divider(),
-                        ft.ResponsiveRow([
-                            BotaoTonal("Registrar Movimentações", "./icons_clone/exchange.png", 3, ft.Colors.BLUE_100),
-                            BotaoTonal("Exportar", "./icons_clone/file.png", 3, ft.Colors.BLUE_100)
-                        ]),
-                        self._movimentacoes()
-                    ])
-                ]), padding=ft.padding.all(20)
+                ft.Column([
+                    RotuloColuna("Movimentações", "./icons_clone/exchange.png"),
+                    ft.ResponsiveRow([
+                        CartaoIndicadores("Total de movimentações *", self.texto_total_movimentacoes, 4),
+                        CartaoIndicadores("R$ total de entradas *", self.texto_total_entradas, 4),
+                        CartaoIndicadores("R$ total de saídas *", self.texto_total_saidas, 4)
+                    ]),
+                    ft.ResponsiveRow([
+                        ft.Text(
+                            "* os números acima consideram os filtros aplicados abaixo",
+                            col=10,
+                            color=ft.Colors.BLACK54,
+                            weight=ft.FontWeight.W_500
+                        )
+                    ]),
+                    ft.Divider(),
+                    FiltrosMovimentacoes(),
+                    ft.Divider(),
+                    ft.ResponsiveRow([
+                        BotaoTonal(
+                            "Registrar Movimentações",
+                            "./icons_clone/exchange.png",
+                            3,
+                            ft.Colors.BLUE_100,
+                            on_click=self.janela_registrar_movimentacoes
+                        ),
+                        BotaoTonal("Exportar", "./icons_clone/file.png", 3, ft.Colors.BLUE_100)
+                    ]),
+                    self._movimentacoes()
+                ], expand=True),
+                padding=ft.padding.all(20),
+                expand=True
             )
         ]
         self.update()
@@ -141,37 +404,97 @@ class PaginaMovimentacao(ft.Column):
         ]
         self.update()
 
-    def _movimentacoes(self) -> None:
-        if len(self.df) > 0:
-            respostas_form = [
-                [
-                    row["id"],
-                    row["operacao"],
-                    row["classificacao"],
-                    parser.isoparse(row["data_movimentacao"]),
-                    row["nome"],
-                    row["quantidade"],
-                    row["unidade"],
-                    self.obter_preco(row["preco_movimentacao"], row["preco_unidade"]),
-                    row["informacoes"]
-                ]
-                for _, row in self.df.iterrows()
-            ]
-            return ft.ResponsiveRow([
-                ft.Card(
-                    ft.Container(
-                        ft.Column([
-                            LinhaHistorico(Movimentacao(*dado))
-                            for dado in respostas_form
-                        ]),
-                        padding=ft.padding.symmetric(vertical=10, horizontal=0),
-                        bgcolor=ft.Colors.WHITE,
-                        border_radius=ft.border_radius.all(15),
-                    ), col=12
-                )
-            ])
-        return ft.ResponsiveRow([])
+    def _movimentacoes(self) -> ft.Card:
+        return ft.Card(
+            ft.Container(
+                self.lista,
+                padding=ft.padding.symmetric(vertical=10, horizontal=0),
+                bgcolor=ft.Colors.WHITE,
+                border_radius=ft.border_radius.all(15),
+            ),
+            expand=True
+        )
+
+    def _criar_lista(self, pagina: list) -> None:
+        self.cursor_lista = Repositorio.cursor(pagina)
+        self.lista_completa = not pagina
+        self.carregando_lista = False
+        self.lista = ft.ListView(
+            self._criar_linhas(pagina),
+            build_controls_on_demand=True,
+            on_scroll_interval=100,
+            on_scroll=self.rolar_lista,
+            expand=True
+        )
+
+    def _criar_linhas(self, pagina: list) -> List[LinhaHistorico]:
+        return [LinhaHistorico(movimentacao) for movimentacao in Movimentacao.from_records(pagina)]
+
+    async def rolar_lista(self, e: ft.OnScrollEvent) -> None:
+        if e.pixels >= e.max_scroll_extent - DISTANCIA_CARREGAMENTO:
+            await self.carregar_mais()
+
+    async def carregar_mais(self) -> None:
+        if self.lista_completa or self.carregando_lista:
+            return
+        self.carregando_lista = True
+        try:
+            pagina = await Repositorio().pagina_movimentacoes(
+                tamanho=TAMANHO_PAGINA_LISTA,
+                cursor=self.cursor_lista
+            )
+        except Exception as e:
+            print(e)
+        else:
+            self.lista.controls.extend(self._criar_linhas(pagina))
+            self.cursor_lista = Repositorio.cursor(pagina) or self.cursor_lista
+            self.lista_completa = not pagina
+            self.lista.update()
+        finally:
+            self.carregando_lista = False
         
+    def receber_alteracao(self, tipo: str, registro: dict) -> None:
+        if self.lista is None:
+            return
+        indice = next(
+            (i for i, linha in enumerate(self.lista.controls) if linha.movimentacao.id == registro["id"]),
+            None
+        )
+        if indice is not None:
+            self.lista.controls.pop(indice)
+
+        if tipo != "DELETE":
+            self._inserir_linha(Repositorio().detalhar_movimentacoes([dict(registro)])[0])
+
+        self.lista.update()
+        self.page.run_task(self._atualizar_estatisticas)
+
+    def _inserir_linha(self, mov: dict) -> None:
+        linha = self._criar_linhas([mov])[0]
+        indice = next(
+            (
+                i for i, atual in enumerate(self.lista.controls)
+                if (atual.movimentacao.data, atual.movimentacao.id) < (linha.movimentacao.data, linha.movimentacao.id)
+            ),
+            None
+        )
+        if indice is not None:
+            self.lista.controls.insert(indice, linha)
+        elif self.lista_completa:
+            self.lista.controls.append(linha)
+
+    async def _atualizar_estatisticas(self) -> None:
+        try:
+            self.df = await CacheMovimentacoes().visao("movimentacoes", self._criar_df)
+        except Exception as e:
+            print(e)
+        else:
+            total_movimentacoes, total_entradas, total_saidas = self._estatisticas()
+            self.texto_total_movimentacoes.value = total_movimentacoes
+            self.texto_total_movimentacoes.update()
+            self.texto_total_entradas.atualizar_valor(locale.currency(total_entradas, grouping=True, symbol=False))
+            self.texto_total_saidas.atualizar_valor(locale.currency(total_saidas, grouping=True, symbol=False))
+
     def _estatisticas(self) -> None:
         if len(self.df):
             total_movimentacoes = len(self.df)
@@ -181,36 +504,38 @@ class PaginaMovimentacao(ft.Column):
             total_movimentacoes = total_entradas = total_saidas = 0
         return total_movimentacoes, total_entradas, total_saidas
 
-    def obter_preco(self, preco_mov: Optional[float], preco_uni: float) -> float:
-        return preco_mov if pd.notna(preco_mov) else preco_uni
-    
-    def ler_dados(self) -> None:
+    async def janela_registrar_movimentacoes(self, e: ft.ControlEvent) -> None:
+        janela = JanelaRegistrarMovimentacoes(ControleMovimentacao(self))
+        await janela.ler_dados()
+        self.page.open(janela)
+
+    def atualizar_conteudo(self) -> None:
+        if not TempoReal().ativo:
+            self.page.run_task(self.ler_dados)
+
+    async def ler_dados(self) -> None:
         try:
-            client = SupabaseSingleton().get_client()
-            respostas = (
-                client.table("movimentacao")
-                .select("id, operacao, data_movimentacao, quantidade, classificacao, preco_movimentacao, informacoes, produtos(nome, unidade, preco_unidade)")
-                .eq("empresa_id", InfosGlobal().empresa_id)
-                .order("data_movimentacao", desc=True)
-                .execute()
-            ).data
+            primeira_pagina = await Repositorio().pagina_movimentacoes(tamanho=TAMANHO_PAGINA_LISTA)
         except Exception as e:
             print(e)
         else:
-            self._criar_df(respostas)
-            self._criar_conteudo()
+            self._criar_conteudo(primeira_pagina)
+            await self._atualizar_estatisticas()
 
-    def _criar_df(self, dados: list) -> None:
-        df_base = pd.DataFrame(dados)
-        produtos_df = pd.json_normalize(df_base['produtos'])
-        df = pd.concat([df_base.drop(columns=['produtos']), produtos_df], axis=1)
-        df["classificacao"] = df["classificacao"].fillna("Sem class.")
-        df["preco_movimentacao"] = df["preco_movimentacao"].fillna(df["preco_unidade"])
+    def _criar_df(self, df: pd.DataFrame) -> pd.DataFrame:
+        df = df.assign(
+            classificacao=df["classificacao"].fillna("Sem class."),
+            preco_movimentacao=df["preco_movimentacao"].fillna(df["preco_unidade"]),
+            operacao=df["operacao"].str.lower()
+        )
         df["total_movimentado"] = df["quantidade"] * df["preco_movimentacao"]
-        df["operacao"] = df["operacao"].str.lower()
 
-        self.df = df
+        return df
 
     def did_mount(self) -> None:
         self.placeholder()
-        self.ler_dados()
+        TempoReal().ouvir("movimentacao", self.receber_alteracao)
+        self.page.run_task(self.ler_dados)
+
+    def will_unmount(self) -> None:
+        TempoReal().parar("movimentacao", self.receber_alteracao)
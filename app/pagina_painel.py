@@ -1,14 +1,15 @@
+import asyncio
 from datetime import datetime, timedelta
-from flet.plotly_chart import PlotlyChart
 import flet as ft
 import locale
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-from typing import List, Union
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
-from banco_de_dados import SupabaseSingleton
-from controles import InfosGlobal
+from repositorio import Repositorio
+from cache_movimentacoes import CacheMovimentacoes
+from renderizador_graficos import AreaGrafico
 from componentes import (
     SeletorTemporal,
     CabecalhoCartao,
@@ -16,13 +17,18 @@ from componentes import (
     RotuloColuna,
     TextoMonetario,
     CartaoNotificacao,
-    GradeNotificacao
+    GradeNotificacao,
+    EsqueletoCartao,
+    CarregamentoProgressivo
 )
 
 locale.setlocale(locale.LC_ALL, "pt_BR.UTF-8")
 
 pd.set_option('display.max_columns', None)
 
+CLASSIFICACOES_CMV = ["vendas", "desperdício", "sem class."]
+CLASSIFICACOES_ENTRADAS = ["compras", "transferência", "sem class."]
+
 class Graficos:
     def __init__(self) -> None:
         self.bg_config = dict(
@@ -46,8 +52,7 @@ class Graficos:
         }
         return paleta.get(tipo, {}).get(classificacao, "blue")
 
-    def grafico_estoque(self, df: pd.DataFrame) -> go.Figure:
-        dados = OperadorDados.dados_grafico_estoque(df)
+    def grafico_estoque(self, dados: pd.DataFrame) -> go.Figure:
         dados["categorias"] = dados["categorias"].str.title()
 
         fig = go.Figure(
@@ -73,8 +78,7 @@ class Graficos:
 
         return fig
     
-    def grafico_cmv(self, df: pd.DataFrame) -> go.Figure:
-        dados = OperadorDados.dados_grafico_cmv(df)
+    def grafico_cmv(self, dados: pd.DataFrame) -> go.Figure:
         dados["categorias"] = dados["categorias"].str.title()
         categorias_top5 = dados.groupby("categorias")["total_movimentado"].sum().nlargest(5).index
         dados = dados[dados["categorias"].isin(categorias_top5)]
@@ -115,8 +119,7 @@ class Graficos:
 
         return fig
 
-    def grafico_entradas(self, df: pd.DataFrame) -> go.Figure:
-        dados = OperadorDados.dados_grafico_entradas(df)
+    def grafico_entradas(self, dados: pd.DataFrame) -> go.Figure:
         dados["cores"] = dados["classificacao"].apply(lambda c: self._definir_cor(c, "entradas"))
 
         fig = go.Figure()
@@ -163,8 +166,7 @@ class Graficos:
         )
         return fig
 
-    def grafico_volatilidade(self, df: pd.DataFrame, produto: str) -> go.Figure:
-        dados = OperadorDados.dados_grafico_volatilidade(df, produto)
+    def grafico_volatilidade(self, dados: pd.DataFrame) -> go.Figure:
         fig = go.Figure(
             data=go.Scatter(
                 x=dados["data_movimentacao"],
@@ -184,88 +186,116 @@ class Graficos:
 
 class OperadorDados:
     @staticmethod
-    def dados_grafico_estoque(df: pd.DataFrame) -> pd.DataFrame:
-        df['valor_estoque'] = df['quantidade'] * df['preco_unidade']
-        valor_categoria = df.groupby('categorias')['valor_estoque'].sum()
-        valor_categoria = valor_categoria[valor_categoria > 0]
+    def dados_grafico_estoque(df: pd.DataFrame, ponte: pd.DataFrame) -> pd.DataFrame:
+        valor_produto = (df['quantidade'] * df['preco_unidade']).groupby(df['id']).sum().rename('valor_estoque')
+        valor_categoria = OperadorDados.somar_por_categoria(valor_produto, ponte, ['categorias'], 'valor_estoque')
+        valor_categoria = valor_categoria[valor_categoria['valor_estoque'] > 0]
         
-        return valor_categoria.nlargest(n=5).reset_index()
+        return valor_categoria.nlargest(n=5, columns='valor_estoque').reset_index(drop=True)
     
     @staticmethod
-    def calcular_cmv_real(df: pd.DataFrame) -> float:
-        saidas = df[df["operacao"] == "saída"]
-        filtro_class = saidas["classificacao"].isin(["vendas", "desperdício", "sem class."])
-        return saidas[filtro_class]["total_movimentado"].sum()
-    
+    def mascara_cmv(df: pd.DataFrame) -> pd.Series:
+        return (df["operacao"] == "saída") & df["classificacao"].isin(CLASSIFICACOES_CMV)
+
     @staticmethod
-    def dados_grafico_cmv(df: pd.DataFrame) -> pd.DataFrame:
-        saidas = df[df["operacao"] == "saída"]
-        filtro_class = saidas["classificacao"].isin(["vendas", "desperdício", "sem class."])
+    def mascara_entradas(df: pd.DataFrame) -> pd.Series:
+        return (df["operacao"] == "entrada") & df["classificacao"].isin(CLASSIFICACOES_ENTRADAS)
+
+    @staticmethod
+    def dados_grafico_cmv(por_produto: pd.Series, ponte: pd.DataFrame) -> pd.DataFrame:
+        por_produto = por_produto[por_produto != 0].rename("total_movimentado")
+        por_produto.index.names = ["id_produto", "classificacao"]
         agrupado = (
-            saidas[filtro_class]
-            .groupby(["categorias", "classificacao"])["total_movimentado"]
-            .sum()
-            .reset_index()
+            OperadorDados.somar_por_categoria(
+                por_produto.reset_index("classificacao"),
+                ponte,
+                ["categorias", "classificacao"],
+                "total_movimentado"
+            )
             .sort_values("total_movimentado", ascending=False)
         )
         return agrupado
 
     @staticmethod
-    def valor_total_entradas(df: pd.DataFrame) -> pd.DataFrame:
-        entradas = df[df["operacao"] == "entrada"]
-        filtro_class = entradas["classificacao"].isin(["compras", "transferência", "sem class."])
-        return entradas[filtro_class]["total_movimentado"].sum()
-    
-    @staticmethod
-    def dados_grafico_entradas(df: pd.DataFrame) -> pd.DataFrame:
-        entradas = df[df["operacao"] == "entrada"]
-        filtro_class = entradas["classificacao"].isin(["compras", "transferência", "sem class."])
-        return (
-            entradas[filtro_class]
-            .groupby("classificacao")["total_movimentado"]
+    def somar_por_categoria(valores, ponte: pd.DataFrame, chaves: List[str], coluna: str) -> pd.DataFrame:
+        somado = (
+            ponte.join(valores, on="id_produto", how="inner")
+            .groupby(chaves, observed=True)[coluna]
             .sum()
             .reset_index()
+        )
+        return somado.astype({chave: str for chave in chaves})
+
+    @staticmethod
+    def dados_grafico_entradas(por_classificacao: pd.Series) -> pd.DataFrame:
+        por_classificacao = por_classificacao[por_classificacao != 0]
+        return (
+            pd.DataFrame({
+                "classificacao": por_classificacao.index.astype(str),
+                "total_movimentado": por_classificacao.to_numpy()
+            })
             .sort_values("total_movimentado", ascending=False)
+            .reset_index(drop=True)
         )
 
     @staticmethod
     def transformar_dados_movimentacoes(df: pd.DataFrame) -> pd.DataFrame:
-        produtos_expandidos = pd.json_normalize(df['produtos'], max_level=0)
-        df = pd.concat([df.drop(columns=['produtos']), produtos_expandidos], axis=1)
-
-        categorias = df["categorias"].explode()
-        df = df.loc[categorias.index]
-        df["categorias"] = categorias
-
-        df["operacao"] = df["operacao"].str.lower()
-        df["classificacao"] = df["classificacao"].str.lower()
-        df["data_movimentacao"] = pd.to_datetime(df["data_movimentacao"], format='ISO8601')
-        df = df.fillna({"classificacao": "sem class.", "preco_movimentacao": df["preco_unidade"]})
-        df["total_movimentado"] = df["quantidade"] * df["preco_movimentacao"]
-        
-        return df
-    
+        preco = df["preco_movimentacao"].fillna(df["preco_unidade"])
+        return pd.DataFrame({
+            "id": pd.to_numeric(df["id"], downcast="integer"),
+            "id_produto": pd.to_numeric(df["id_produto"], downcast="integer"),
+            "nome": df["nome"].astype("category"),
+            "operacao": df["operacao"].str.lower().astype("category"),
+            "classificacao": df["classificacao"].str.lower().fillna("sem class.").astype("category"),
+            "data_movimentacao": df["data_movimentacao"],
+            "quantidade": df["quantidade"],
+            "preco_movimentacao": preco,
+            "total_movimentado": df["quantidade"] * preco
+        })
+
     @staticmethod
-    def transformar_dados_produtos(df: pd.DataFrame) -> pd.DataFrame:
-        categorias = df["categorias"].explode()
-        df = df.loc[categorias.index]
-        df["categorias"] = categorias
-        return df
+    def ponte_categorias(produtos: pd.DataFrame) -> pd.DataFrame:
+        if produtos.empty:
+            return pd.DataFrame({
+                "id_produto": pd.Series(dtype="int32"),
+                "categorias": pd.Series(dtype="category")
+            })
+        categorias = produtos.set_index("id")["categorias"].explode().dropna()
+        return pd.DataFrame({
+            "id_produto": pd.to_numeric(categorias.index.to_series(), downcast="integer").to_numpy(),
+            "categorias": pd.Categorical(categorias.to_numpy())
+        })
 
     @staticmethod
-    def dados_grafico_giro_estoque(df: pd.DataFrame, produto: str) -> pd.DataFrame:
-        df_fil = df[df["nome"] == produto].sort_values("data_movimentacao")
-        df_fil["em_estoque"] = df_fil["quantidade"].where(df_fil["operacao"].str.lower() == "entrada", -df_fil["quantidade"]).cumsum()
-        return df_fil
+    def saldo_acumulado(produtos: np.ndarray, variacoes: np.ndarray, reinicios: np.ndarray) -> np.ndarray:
+        if not len(produtos):
+            return np.zeros(0, dtype=np.float64)
+        inicio = reinicios.copy()
+        inicio[0] = True
+        inicio[1:] |= produtos[1:] != produtos[:-1]
+        acumulado = np.cumsum(variacoes)
+        base = (acumulado - variacoes)[np.flatnonzero(inicio)]
+        return acumulado - base[np.cumsum(inicio) - 1]
 
     @staticmethod
-    def volatilidade_preco(df: pd.DataFrame) -> pd.DataFrame:
-        data_limite = datetime.now() - timedelta(days=30)
-        df_recente = df[df["data_movimentacao"] > data_limite.strftime("%Y-%m-%d %H:%M:%S")]
+    def saldos_produtos(df: pd.DataFrame) -> pd.DataFrame:
+        df = df.sort_values(["id_produto", "data_movimentacao", "id"], kind="stable")
+        operacao = df["operacao"].str.lower().to_numpy()
+        quantidade = df["quantidade"].to_numpy(dtype=np.float64, na_value=0.0)
+        produtos = df["id_produto"].to_numpy()
+        return df[["id_produto", "nome", "data_movimentacao"]].reset_index(drop=True).assign(
+            em_estoque=OperadorDados.saldo_acumulado(
+                produtos,
+                np.where(operacao == "saída", -quantidade, quantidade),
+                operacao == "inventário"
+            )
+        )
 
+    @staticmethod
+    def volatilidade_preco(df_recente: pd.DataFrame) -> pd.DataFrame:
         variacao = (
             df_recente
-            .groupby("nome")["preco_movimentacao"]
+            .groupby("nome", observed=True)["preco_movimentacao"]
             .agg(["min", "max"])
             .reset_index()
         )
@@ -279,15 +309,334 @@ class OperadorDados:
         return df_filtrado.sort_values("data_movimentacao")
 
 
+class IndiceTemporal:
+    def __init__(
+        self,
+        datas: pd.Series,
+        metricas: Dict[str, pd.Series],
+        grupos: Optional[Dict[str, Union[pd.Series, pd.MultiIndex]]]=None
+    ) -> None:
+        tempos = self._tempos(datas)
+        self.ordem = np.argsort(tempos, kind="stable")
+        self.tempos = tempos[self.ordem]
+        self.valores = {
+            nome: serie.to_numpy(dtype=np.float64, na_value=0.0)[self.ordem]
+            for nome, serie in metricas.items()
+        }
+        self.acumulados = {
+            nome: np.concatenate(([0.0], np.cumsum(valores)))
+            for nome, valores in self.valores.items()
+        }
+        self.grupos = {}
+        for nome, chaves in (grupos or {}).items():
+            if not len(chaves):
+                self.grupos[nome] = np.zeros(0, dtype=np.int64), chaves[:0]
+                continue
+            codigos, rotulos = pd.factorize(chaves)
+            codigos = np.where(codigos < 0, len(rotulos), codigos)
+            self.grupos[nome] = codigos[self.ordem], rotulos
+
+    @staticmethod
+    def _tempos(datas: pd.Series) -> np.ndarray:
+        if isinstance(datas.dtype, pd.DatetimeTZDtype):
+            datas = datas.dt.tz_convert("UTC").dt.tz_localize(None)
+        return datas.to_numpy(dtype="datetime64[ns]")
+
+    @staticmethod
+    def limites(periodo: Union[int, Tuple], normalizar: bool=False) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+        if isinstance(periodo, tuple):
+            inicio, fim = periodo
+            return (
+                pd.Timestamp(inicio) if inicio is not None else None,
+                pd.Timestamp(fim) if fim is not None else None
+            )
+        if periodo <= 0:
+            return None, None
+        inicio = pd.Timestamp(datetime.now() - timedelta(days=periodo))
+        return (inicio.normalize() if normalizar else inicio), None
+
+    def janela(self, inicio: Optional[pd.Timestamp]=None, fim: Optional[pd.Timestamp]=None) -> slice:
+        i = 0 if inicio is None else int(np.searchsorted(self.tempos, self._instante(inicio), "left"))
+        j = len(self.tempos) if fim is None else int(np.searchsorted(self.tempos, self._instante(fim), "right"))
+        return slice(i, max(i, j))
+
+    @staticmethod
+    def _instante(momento: pd.Timestamp) -> np.datetime64:
+        if momento.tzinfo is not None:
+            momento = momento.tz_convert("UTC").tz_localize(None)
+        return np.datetime64(momento, "ns")
+
+    def soma(self, metrica: str, janela: slice) -> float:
+        acumulado = self.acumulados[metrica]
+        return float(acumulado[janela.stop] - acumulado[janela.start])
+
+    def somar_grupos(self, metrica: str, grupo: str, janela: slice) -> pd.Series:
+        codigos, rotulos = self.grupos[grupo]
+        somas = np.bincount(
+            codigos[janela],
+            weights=self.valores[metrica][janela],
+            minlength=len(rotulos) + 1
+        )
+        return pd.Series(somas[:len(rotulos)], index=rotulos)
+
+    def linhas(self, janela: slice) -> np.ndarray:
+        return self.ordem[janela]
+
+
+class SaldosProdutos:
+    def __init__(self, saldos: pd.DataFrame, nomes: Optional[Dict[int, str]]=None) -> None:
+        self.saldos = saldos[["data_movimentacao", "em_estoque"]].reset_index(drop=True)
+        self.tempos = IndiceTemporal._tempos(saldos["data_movimentacao"])
+        produtos = saldos["id_produto"].to_numpy()
+        inicios = np.flatnonzero(np.r_[True, produtos[1:] != produtos[:-1]]) if len(produtos) else np.zeros(0, dtype=np.int64)
+        fins = np.r_[inicios[1:], len(produtos)].astype(np.int64)
+        if nomes is None:
+            nomes = dict(zip(produtos[inicios].tolist(), saldos["nome"].to_numpy()[inicios]))
+        self.faixas = {
+            nomes[id]: (int(inicio), int(fim))
+            for id, inicio, fim in zip(produtos[inicios].tolist(), inicios, fins)
+            if id in nomes
+        }
+
+    def serie(self, produto: str, inicio: Optional[pd.Timestamp]=None, fim: Optional[pd.Timestamp]=None) -> pd.DataFrame:
+        faixa = self.faixas.get(produto)
+        if faixa is None:
+            return self.saldos.iloc[0:0]
+        tempos = self.tempos[faixa[0]:faixa[1]]
+        i = 0 if inicio is None else int(np.searchsorted(tempos, IndiceTemporal._instante(inicio), "left"))
+        j = len(tempos) if fim is None else int(np.searchsorted(tempos, IndiceTemporal._instante(fim), "right"))
+        return self.saldos.iloc[faixa[0] + i:faixa[0] + max(i, j)]
+
+
+class FonteLocal:
+    def __init__(self, produtos: pd.DataFrame, movimentacoes: pd.DataFrame, saldos: pd.DataFrame) -> None:
+        self.produtos = produtos
+        self.movimentacoes = movimentacoes
+        self.ponte = OperadorDados.ponte_categorias(produtos)
+        self.indice = None if movimentacoes.empty else self._indexar(movimentacoes)
+        self.saldos = None if saldos.empty else SaldosProdutos(saldos)
+
+    def _indexar(self, df: pd.DataFrame) -> IndiceTemporal:
+        return IndiceTemporal(
+            df["data_movimentacao"],
+            {
+                "cmv": df["total_movimentado"].where(OperadorDados.mascara_cmv(df), 0),
+                "entradas": df["total_movimentado"].where(OperadorDados.mascara_entradas(df), 0)
+            },
+            {
+                "produto_classificacao": pd.MultiIndex.from_arrays([df["id_produto"], df["classificacao"]]),
+                "classificacao": df["classificacao"]
+            }
+        )
+
+    async def estoque(self) -> pd.DataFrame:
+        if self.produtos.empty:
+            return pd.DataFrame(columns=["categorias", "valor_estoque"])
+        return OperadorDados.dados_grafico_estoque(self.produtos, self.ponte)
+
+    async def cmv(self, periodo: Union[int, Tuple]) -> Tuple[float, pd.DataFrame]:
+        janela = self._janela(periodo)
+        if janela is None:
+            return 0, pd.DataFrame(columns=["categorias", "classificacao", "total_movimentado"])
+        por_produto = self.indice.somar_grupos("cmv", "produto_classificacao", janela)
+        return self.indice.soma("cmv", janela), OperadorDados.dados_grafico_cmv(por_produto, self.ponte)
+
+    async def entradas(self, periodo: Union[int, Tuple]) -> Tuple[float, pd.DataFrame]:
+        janela = self._janela(periodo)
+        if janela is None:
+            return 0, pd.DataFrame(columns=["classificacao", "total_movimentado"])
+        por_classificacao = self.indice.somar_grupos("entradas", "classificacao", janela)
+        return self.indice.soma("entradas", janela), OperadorDados.dados_grafico_entradas(por_classificacao)
+
+    async def volatilidade(self) -> pd.DataFrame:
+        janela = self._janela(30)
+        if janela is None:
+            return pd.DataFrame(columns=["nome", "min", "max", "variacao"])
+        return OperadorDados.volatilidade_preco(self.movimentacoes.iloc[self.indice.linhas(janela)])
+
+    async def precos(self, produto: str) -> pd.DataFrame:
+        if self.movimentacoes.empty:
+            return self.movimentacoes
+        return OperadorDados.dados_grafico_volatilidade(self.movimentacoes, produto)
+
+    async def top_produtos(self) -> List[str]:
+        if self.movimentacoes.empty:
+            return []
+        return (
+            self.movimentacoes.groupby("nome", observed=True)["total_movimentado"]
+            .sum()
+            .nlargest(5)
+            .index.tolist()
+        )
+
+    async def giro(self, produto: str, periodo: Union[int, Tuple]) -> pd.DataFrame:
+        if self.saldos is None:
+            return pd.DataFrame(columns=["data_movimentacao", "em_estoque"])
+        return self.saldos.serie(produto, *IndiceTemporal.limites(periodo))
+
+    def _janela(self, periodo: Union[int, Tuple]) -> Optional[slice]:
+        if self.indice is None:
+            return None
+        janela = self.indice.janela(*IndiceTemporal.limites(periodo))
+        return janela if janela.stop > janela.start else None
+
+
+class FonteRemota:
+    def __init__(self) -> None:
+        self.produtos_volateis = {}
+
+    async def estoque(self) -> pd.DataFrame:
+        dados = await Repositorio().agregado("dados_grafico_estoque", "produtos")
+        return self._criar_df(dados, ["categorias", "valor_estoque"])
+
+    async def cmv(self, dias: int) -> Tuple[float, pd.DataFrame]:
+        repositorio = Repositorio()
+        desde = self._data_limite(dias)
+        valor, dados = await asyncio.gather(
+            repositorio.agregado("calcular_cmv_real", "movimentacao", p_desde=desde),
+            repositorio.agregado("dados_grafico_cmv", "movimentacao", p_desde=desde)
+        )
+        return float(valor or 0), self._criar_df(dados, ["categorias", "classificacao", "total_movimentado"])
+
+    async def entradas(self, dias: int) -> Tuple[float, pd.DataFrame]:
+        dados = await Repositorio().agregado(
+            "dados_grafico_entradas",
+            "movimentacao",
+            p_desde=self._data_limite(dias)
+        )
+        df = self._criar_df(dados, ["classificacao", "total_movimentado"])
+        return df["total_movimentado"].sum(), df
+
+    async def volatilidade(self) -> pd.DataFrame:
+        dados = await Repositorio().agregado(
+            "volatilidade_preco",
+            "movimentacao",
+            p_desde=self._data_limite(30)
+        )
+        df = self._criar_df(dados, ["id_produto", "nome", "min", "max", "variacao"])
+        self.produtos_volateis = dict(zip(df["nome"], df["id_produto"]))
+        return df
+
+    async def precos(self, produto: str) -> pd.DataFrame:
+        if produto not in self.produtos_volateis:
+            return pd.DataFrame()
+        df = await CacheMovimentacoes().visao("painel", OperadorDados.transformar_dados_movimentacoes)
+        if df.empty:
+            return pd.DataFrame()
+        df = df[df["id_produto"] == int(self.produtos_volateis[produto])]
+        return OperadorDados.dados_grafico_volatilidade(df.drop_duplicates("id"), produto)
+
+    def _data_limite(self, dias: int) -> Optional[str]:
+        if dias <= 0:
+            return None
+        return (datetime.now() - timedelta(days=dias)).strftime("%Y-%m-%d %H:%M")
+
+    def _criar_df(self, dados: list, colunas: List[str]) -> pd.DataFrame:
+        df = pd.DataFrame(dados, columns=colunas)
+        numericas = [coluna for coluna in colunas if coluna not in ("categorias", "classificacao", "nome")]
+        df[numericas] = df[numericas].apply(pd.to_numeric)
+        return df
+
+
+class FonteDiaria(FonteRemota):
+    COLUNAS = ["dia", "id_produto", "categoria", "operacao", "classificacao", "quantidade", "valor", "variacao_saldo"]
+    CHAVE_MOVIMENTO = ["dia", "id_produto", "operacao", "classificacao"]
+
+    def __init__(self, diario: List[dict], produtos: pd.DataFrame) -> None:
+        super().__init__()
+        self.diario = pd.DataFrame(diario, columns=self.COLUNAS)
+        self.diario["dia"] = pd.to_datetime(self.diario["dia"])
+        self.diario[["quantidade", "valor", "variacao_saldo"]] = (
+            self.diario[["quantidade", "valor", "variacao_saldo"]].apply(pd.to_numeric).fillna(0)
+        )
+        self.nomes = {} if produtos.empty else (
+            produtos.drop_duplicates("id").set_index("id")["nome"].to_dict()
+        )
+        self.indice = self._indexar_movimentos(self._sem_repeticao(self.diario))
+        self.indice_categorias = self._indexar_categorias(self.diario[self.diario["categoria"] != ""])
+        self.saldos = SaldosProdutos(self._saldos_diarios(self._sem_repeticao(self.diario)), self.nomes)
+
+    def _indexar_movimentos(self, df: pd.DataFrame) -> IndiceTemporal:
+        return IndiceTemporal(
+            df["dia"],
+            {
+                "cmv": df["valor"].where(OperadorDados.mascara_cmv(df), 0),
+                "entradas": df["valor"].where(OperadorDados.mascara_entradas(df), 0)
+            },
+            {"classificacao": df["classificacao"]}
+        )
+
+    def _indexar_categorias(self, df: pd.DataFrame) -> IndiceTemporal:
+        return IndiceTemporal(
+            df["dia"],
+            {"cmv": df["valor"].where(OperadorDados.mascara_cmv(df), 0)},
+            {"categoria_classificacao": pd.MultiIndex.from_arrays([df["categoria"], df["classificacao"]])}
+        )
+
+    async def cmv(self, periodo: Union[int, Tuple]) -> Tuple[float, pd.DataFrame]:
+        inicio, fim = IndiceTemporal.limites(periodo, normalizar=True)
+        por_categoria = self.indice_categorias.somar_grupos(
+            "cmv",
+            "categoria_classificacao",
+            self.indice_categorias.janela(inicio, fim)
+        )
+        por_categoria = por_categoria[por_categoria != 0]
+        dados = pd.DataFrame({
+            "categorias": por_categoria.index.get_level_values(0).astype(str),
+            "classificacao": por_categoria.index.get_level_values(1).astype(str),
+            "total_movimentado": por_categoria.to_numpy()
+        }).sort_values("total_movimentado", ascending=False)
+        return self.indice.soma("cmv", self.indice.janela(inicio, fim)), dados
+
+    async def entradas(self, periodo: Union[int, Tuple]) -> Tuple[float, pd.DataFrame]:
+        janela = self.indice.janela(*IndiceTemporal.limites(periodo, normalizar=True))
+        por_classificacao = self.indice.somar_grupos("entradas", "classificacao", janela)
+        return self.indice.soma("entradas", janela), OperadorDados.dados_grafico_entradas(por_classificacao)
+
+    async def top_produtos(self) -> List[str]:
+        top_ids = (
+            self._sem_repeticao(self.diario)
+            .groupby("id_produto")["valor"]
+            .sum()
+            .nlargest(5)
+            .index
+        )
+        return [self.nomes[id] for id in top_ids if id in self.nomes]
+
+    async def giro(self, produto: str, periodo: Union[int, Tuple]) -> pd.DataFrame:
+        return self.saldos.serie(produto, *IndiceTemporal.limites(periodo, normalizar=True))
+
+    def _saldos_diarios(self, df: pd.DataFrame) -> pd.DataFrame:
+        chaves = [df["id_produto"], df["dia"]]
+        dias = pd.DataFrame({
+            "variacao": df["variacao_saldo"].groupby(chaves).sum(),
+            "inventario": (df["operacao"].str.lower() == "inventário").groupby(chaves).any()
+        }).reset_index().sort_values(["id_produto", "dia"], kind="stable")
+        produtos = dias["id_produto"].to_numpy()
+        return pd.DataFrame({
+            "id_produto": produtos,
+            "data_movimentacao": dias["dia"].to_numpy(),
+            "em_estoque": OperadorDados.saldo_acumulado(
+                produtos,
+                dias["variacao"].to_numpy(dtype=np.float64),
+                dias["inventario"].to_numpy(dtype=bool)
+            )
+        })
+
+    def _sem_repeticao(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df.drop_duplicates(self.CHAVE_MOVIMENTO)
+
+
 class CartaoEstoque(ft.Card):
-    def __init__(self, produtos: pd.DataFrame) -> None:
+    def __init__(self, produtos: pd.DataFrame, dados_grafico: pd.DataFrame) -> None:
         super().__init__(col=12, elevation=10)
         self.produtos = produtos
+        self.dados_grafico = dados_grafico
         self._criar_conteudo()
 
     def _criar_conteudo(self) -> None:
         valor_estoque, qtd_produtos = self._calcular_estatisticas()
-        grafico = self._criar_grafico()
+        grafico = AreaGrafico()
 
         self.content = ft.Container(
             content=ft.Column([
@@ -303,11 +652,12 @@ class CartaoEstoque(ft.Card):
     def _montar_cabecalho(self) -> None:
         return CabecalhoCartao("Produtos em estoque", "Visão Geral", "./icons_clone/boxes.png")
 
-    def _montar_corpo(self, valor_estoque: float, qtd_produtos: int, grafico: PlotlyChart) -> ft.Column:
+    def _montar_corpo(self, valor_estoque: float, qtd_produtos: int, grafico: AreaGrafico) -> ft.Column:
+        self.grafico = grafico
         return ft.Column([
             self._montar_metricas(valor_estoque, qtd_produtos),
             self._montar_legenda(),
-            ft.Row([grafico])
+            grafico
         ], spacing=10)
 
     def _montar_metricas(self, valor_estoque: float, qtd_produtos: int) -> ft.ResponsiveRow:
@@ -347,25 +697,26 @@ class CartaoEstoque(ft.Card):
         qtd_produtos = len(self.produtos)
         return valor_estoque, qtd_produtos
 
-    def _criar_grafico(self) -> Union[ft.Container, PlotlyChart]:
-        if self.produtos.empty:
-            return ft.Container()
+    def did_mount(self) -> None:
+        self.page.run_task(self.grafico.exibir, self._criar_grafico())
 
-        fig = Graficos().grafico_estoque(self.produtos.copy())
-        return PlotlyChart(fig, expand=True)
+    def _criar_grafico(self) -> Optional[go.Figure]:
+        if self.dados_grafico.empty:
+            return None
+        return Graficos().grafico_estoque(self.dados_grafico.copy())
 
 
 class CartaoGiro(ft.Card):
-    def __init__(self, movimentacoes: pd.DataFrame) -> None:
+    def __init__(self, fonte, top_produtos: List[str]) -> None:
         super().__init__(col=12, elevation=10)
-        self.movimentacoes = movimentacoes
+        self.fonte = fonte
+        self.opcoes_produtos = top_produtos
         self._criar_conteudo()
 
     def _criar_conteudo(self) -> None:
-        if self.movimentacoes.empty:
+        if not self.opcoes_produtos:
             conteudo = self._sem_conteudo()
         else:
-            self.opcoes_produtos = self._obter_top_produtos()
             conteudo = self._conteudo_completo()
 
         self.content = ft.Container(
@@ -381,7 +732,7 @@ class CartaoGiro(ft.Card):
 
     def _conteudo_completo(self) -> ft.Column:
         produto_inicial = self.opcoes_produtos[0]
-        self.grafico = ft.Container(ft.Row([self._criar_grafico(produto_inicial, 30)]))
+        self.grafico = AreaGrafico()
 
         self.seletor_produto = ft.Dropdown(
             options=[ft.dropdown.Option(produto) for produto in self.opcoes_produtos],
@@ -400,11 +751,14 @@ class CartaoGiro(ft.Card):
             ft.ResponsiveRow([self.seletor_produto]),
             self.grafico
         ], spacing=10)
-    
-    def _ao_mudar_produto(self, e: ft.ControlEvent) -> None:
+
+    def did_mount(self) -> None:
+        if self.opcoes_produtos:
+            self.page.run_task(self._carregar_grafico, self.opcoes_produtos[0], 30)
+
+    async def _ao_mudar_produto(self, e: ft.ControlEvent) -> None:
         tempo = list(self.seletor_temporal.valor)
-        self.grafico.content = ft.Row([self._criar_grafico(e.data, int(tempo[0]))])
-        self.grafico.update()
+        await self._carregar_grafico(e.data, int(tempo[0]))
 
     def _sem_conteudo(self) -> ft.Column:
         return ft.Column([
@@ -419,51 +773,25 @@ class CartaoGiro(ft.Card):
             ])
         ])
 
-    def _obter_top_produtos(self) -> List:
-        top_produtos = (
-            self.movimentacoes.groupby("nome")["total_movimentado"]
-            .sum()
-            .nlargest(5)
-            .index.tolist()
-        )
-        return top_produtos if top_produtos else []
-
-    def _criar_grafico(self, produto: str, tempo: int) -> Union[ft.Container, PlotlyChart]:
-        dados = OperadorDados.dados_grafico_giro_estoque(self.movimentacoes, produto)
-        dados_filtrados = self._filtrar_por_tempo(tempo, dados)
-
-        if dados_filtrados.empty:
-            return ft.Container()
+    async def _carregar_grafico(self, produto: str, tempo: int) -> None:
+        try:
+            dados = await self.fonte.giro(produto, tempo)
+        except Exception as e:
+            print(e)
+            dados = pd.DataFrame()
+        await self.grafico.exibir(self._criar_grafico(dados))
 
-        fig = Graficos().grafico_giro_estoque(dados_filtrados)
-        return PlotlyChart(fig, expand=True)
+    def _criar_grafico(self, dados: pd.DataFrame) -> Optional[go.Figure]:
+        if dados.empty:
+            return None
+        return Graficos().grafico_giro_estoque(dados)
 
-    def _ao_alterar_tempo(self, e: ft.ControlEvent) -> None:
+    async def _ao_alterar_tempo(self, e: ft.ControlEvent) -> None:
         try:
             tempo = int(e.data.strip("[]\""))
         except ValueError:
             tempo = 0
-        self._atualizar_infos(tempo)
-
-    def _atualizar_infos(self, tempo: int) -> None:
-        self.opcoes_produtos = self._obter_top_produtos()
-
-        self.seletor_produto.options = [
-            ft.dropdown.Option(produto) for produto in self.opcoes_produtos
-        ]
-        self.seletor_produto.value = self.opcoes_produtos[0] if self.opcoes_produtos else None
-
-        novo_grafico = self._criar_grafico(self.seletor_produto.value, tempo)
-        self.grafico.content = ft.Row([novo_grafico])
-
-        self.seletor_produto.update()
-        self.grafico.update()
-
-    def _filtrar_por_tempo(self, tempo: int, df: pd.DataFrame) -> pd.DataFrame:
-        if tempo <= 0:
-            return df
-        data_limite = datetime.now() - timedelta(days=tempo)
-        return df[df["data_movimentacao"] > data_limite.strftime("%Y-%m-%d %H:%M:%S")]
+        await self._carregar_grafico(self.seletor_produto.value, tempo)
 
 
 class CartaoFichaTecnica(ft.Card):
@@ -499,17 +827,13 @@ class CartaoFichaTecnica(ft.Card):
 
 
 class CartaoCMV(ft.Card):
-    def __init__(self, movimentacoes: pd.DataFrame) -> None:
+    def __init__(self, fonte, cmv: Tuple[float, pd.DataFrame]) -> None:
         super().__init__(col=12, elevation=10)
-        self.movimentacoes = movimentacoes
-        self._criar_conteudo()
-
-    def _criar_conteudo(self) -> None:
-        df_filtrado = self._filtrar_por_tempo(30) if len(self.movimentacoes) > 0 else pd.DataFrame([])
-        self._montar_conteudo(df_filtrado)
+        self.fonte = fonte
+        self.dados = cmv[1]
+        self._montar_conteudo(*cmv)
 
-    def _montar_conteudo(self, movimentacoes: pd.DataFrame) -> None:
-        cmv_valor = self._calcular_cmv(movimentacoes)
+    def _montar_conteudo(self, cmv_valor: float, dados: pd.DataFrame) -> None:
         self.cmv_real = TextoMonetario(
             locale.currency(cmv_valor, grouping=True, symbol=False),
             40,
@@ -517,9 +841,7 @@ class CartaoCMV(ft.Card):
             10.5
         )
 
-        self.grafico = ft.Container(
-            ft.Row([self._criar_grafico(movimentacoes)]) if len(movimentacoes) else None
-        )
+        self.grafico = AreaGrafico()
 
         self.content = ft.Container(
             ft.Column([
@@ -571,49 +893,41 @@ class CartaoCMV(ft.Card):
             )
         ], vertical_alignment=ft.CrossAxisAlignment.CENTER)
 
-    def _ao_alterar_tempo(self, e: ft.ControlEvent) -> None:
+    async def _ao_alterar_tempo(self, e: ft.ControlEvent) -> None:
         try:
             tempo = int(e.data.strip("[]\""))
         except ValueError:
             tempo = 0
 
-        df_filtrado = self._filtrar_por_tempo(tempo) if tempo > 0 else self.movimentacoes
-        self._atualizar_infos(df_filtrado)
-
-    def _atualizar_infos(self, movimentacoes: pd.DataFrame)-> None:
-        novo_valor = locale.currency(self._calcular_cmv(movimentacoes), grouping=True, symbol=False)
-        self.cmv_real.atualizar_valor(novo_valor)
-        self.grafico.content = ft.Row([self._criar_grafico(movimentacoes)])
-        self.grafico.update()
+        try:
+            cmv_valor, dados = await self.fonte.cmv(tempo)
+        except Exception as e:
+            print(e)
+        else:
+            await self._atualizar_infos(cmv_valor, dados)
 
-    def _filtrar_por_tempo(self, dias: int) -> pd.DataFrame:
-        if dias <= 0:
-            return self.movimentacoes
-        data_limite = (datetime.now() - timedelta(days=dias)).strftime("%Y-%m-%d %H:%M:%S")
-        return self.movimentacoes[self.movimentacoes["data_movimentacao"] > data_limite]
+    def did_mount(self) -> None:
+        self.page.run_task(self.grafico.exibir, self._criar_grafico(self.dados))
 
-    def _calcular_cmv(self, movimentacoes: pd.DataFrame) -> float:
-        return OperadorDados.calcular_cmv_real(movimentacoes) if len(movimentacoes) else 0
+    async def _atualizar_infos(self, cmv_valor: float, dados: pd.DataFrame)-> None:
+        novo_valor = locale.currency(cmv_valor, grouping=True, symbol=False)
+        self.cmv_real.atualizar_valor(novo_valor)
+        await self.grafico.exibir(self._criar_grafico(dados))
 
-    def _criar_grafico(self, movimentacoes: pd.DataFrame) -> ft.Control:
-        if len(movimentacoes) and "saída" in movimentacoes["operacao"].values:
-            fig = Graficos().grafico_cmv(movimentacoes)
-            return PlotlyChart(fig, expand=True)
-        return ft.Container()
+    def _criar_grafico(self, dados: pd.DataFrame) -> Optional[go.Figure]:
+        if len(dados):
+            return Graficos().grafico_cmv(dados)
+        return None
 
 
 class CartaoEntradas(ft.Card):
-    def __init__(self, movimentacoes: pd.DataFrame) -> None:
+    def __init__(self, fonte, entradas: Tuple[float, pd.DataFrame]) -> None:
         super().__init__(col=12, elevation=10)
-        self.movimentacoes = movimentacoes
-        self._criar_conteudo()
+        self.fonte = fonte
+        self.dados = entradas[1]
+        self._montar_conteudo(*entradas)
 
-    def _criar_conteudo(self) -> None:
-        df_filtrado = self._filtrar_por_tempo(30) if len(self.movimentacoes) > 0 else pd.DataFrame([])
-        self._montar_conteudo(df_filtrado)
-
-    def _montar_conteudo(self, movimentacoes: pd.DataFrame) -> None:
-        valor_entradas = self._calcular_total_entradas(movimentacoes)
+    def _montar_conteudo(self, valor_entradas: float, dados: pd.DataFrame) -> None:
         self.total_entradas = TextoMonetario(
             locale.currency(valor_entradas, grouping=True, symbol=False),
             40,
@@ -621,9 +935,7 @@ class CartaoEntradas(ft.Card):
             10.5
         )
 
-        self.grafico = ft.Container(
-            ft.Row([self._criar_grafico(movimentacoes)]) if len(movimentacoes) else None
-        )
+        self.grafico = AreaGrafico()
 
         self.content = ft.Container(
             content=ft.Column([
@@ -671,45 +983,43 @@ class CartaoEntradas(ft.Card):
             ft.Row([ft.CircleAvatar(bgcolor=ft.Colors.RED_300, radius=5), ft.Text("Transferência")])
         ], alignment=ft.MainAxisAlignment.CENTER)
 
-    def _ao_alterar_tempo(self, e: ft.ControlEvent) -> None:
+    async def _ao_alterar_tempo(self, e: ft.ControlEvent) -> None:
         try:
             tempo = int(e.data.strip("[]\""))
         except ValueError:
             tempo = 0
 
-        df_filtrado = self._filtrar_por_tempo(tempo) if tempo > 0 else self.movimentacoes
-        self._atualizar_infos(df_filtrado)
-
-    def _atualizar_infos(self, movimentacoes: pd.DataFrame) -> None:
-        novo_valor = locale.currency(self._calcular_total_entradas(movimentacoes), grouping=True, symbol=False)
-        self.total_entradas.atualizar_valor(novo_valor)
-        self.grafico.content = ft.Row([self._criar_grafico(movimentacoes)])
-        self.grafico.update()
+        try:
+            valor_entradas, dados = await self.fonte.entradas(tempo)
+        except Exception as e:
+            print(e)
+        else:
+            await self._atualizar_infos(valor_entradas, dados)
 
-    def _filtrar_por_tempo(self, dias: int) -> pd.DataFrame:
-        if dias <= 0:
-            return self.movimentacoes
-        data_limite = (datetime.now() - timedelta(days=dias)).strftime("%Y-%m-%d %H:%M:%S")
-        return self.movimentacoes[self.movimentacoes["data_movimentacao"] > data_limite]
+    def did_mount(self) -> None:
+        self.page.run_task(self._exibir_grafico, self.dados.copy())
 
-    def _calcular_total_entradas(self, movimentacoes: pd.DataFrame) -> pd.DataFrame:
-        return OperadorDados.valor_total_entradas(movimentacoes) if len(movimentacoes) else 0
+    async def _atualizar_infos(self, valor_entradas: float, dados: pd.DataFrame) -> None:
+        novo_valor = locale.currency(valor_entradas, grouping=True, symbol=False)
+        self.total_entradas.atualizar_valor(novo_valor)
+        await self._exibir_grafico(dados)
 
-    def _criar_grafico(self, movimentacoes: pd.DataFrame) -> Union[ft.Container, PlotlyChart]:
-        if len(movimentacoes) > 0:
-            fig, tooltip = Graficos().grafico_entradas(movimentacoes)
-            return PlotlyChart(fig, expand=True, tooltip=tooltip)
-        return ft.Container()
+    async def _exibir_grafico(self, dados: pd.DataFrame) -> None:
+        if len(dados) > 0:
+            fig, tooltip = Graficos().grafico_entradas(dados)
+            await self.grafico.exibir(fig, tooltip)
+        else:
+            await self.grafico.exibir(None)
 
 
 class CartaoVolatilidade(ft.Card):
-    def __init__(self, movimentacoes: pd.DataFrame) -> None:
+    def __init__(self, fonte, volatilidade: pd.DataFrame) -> None:
         super().__init__(col=12, elevation=10)
-        self.movimentacoes = movimentacoes
-        self._criar_conteudo()
+        self.fonte = fonte
+        self._criar_conteudo(volatilidade)
 
-    def _criar_conteudo(self) -> None:
-        self.opcoes_produtos = self._obter_produtos_com_volatilidade()
+    def _criar_conteudo(self, volatilidade: pd.DataFrame) -> None:
+        self.opcoes_produtos = volatilidade["nome"].tolist()
 
         if self.opcoes_produtos:
             conteudo = self._conteudo_completo()
@@ -744,7 +1054,7 @@ class CartaoVolatilidade(ft.Card):
 
     def _conteudo_completo(self) -> ft.Column:
         produto_inicial = self.opcoes_produtos[0]
-        self.grafico = ft.Container(ft.Row([self._criar_grafico(produto_inicial)]))
+        self.grafico = AreaGrafico()
 
         self.seletor_produto = ft.Dropdown(
             options=[ft.dropdown.Option(produto) for produto in self.opcoes_produtos],
@@ -774,38 +1084,39 @@ class CartaoVolatilidade(ft.Card):
             ])
         ])
 
-    def _obter_produtos_com_volatilidade(self) -> List:
-        if self.movimentacoes.empty:
-            return []
-
-        df_variacao = OperadorDados.volatilidade_preco(self.movimentacoes)
-        return df_variacao["nome"].tolist() if not df_variacao.empty else []
+    def did_mount(self) -> None:
+        if self.opcoes_produtos:
+            self.page.run_task(self._carregar_grafico, self.opcoes_produtos[0])
 
-    def _criar_grafico(self, produto: str) -> Union[ft.Container, PlotlyChart]:
-        if self.movimentacoes.empty:
-            return ft.Container()
+    async def _carregar_grafico(self, produto: str) -> None:
+        try:
+            dados = await self.fonte.precos(produto)
+        except Exception as e:
+            print(e)
+            dados = pd.DataFrame()
+        await self.grafico.exibir(self._criar_grafico(dados))
 
-        fig = Graficos().grafico_volatilidade(self.movimentacoes, produto)
-        return PlotlyChart(fig, expand=True)
+    def _criar_grafico(self, dados: pd.DataFrame) -> Optional[go.Figure]:
+        if dados.empty:
+            return None
+        return Graficos().grafico_volatilidade(dados)
 
-    def _ao_mudar_produto(self, e: ft.ControlState) -> None:
-        novo_produto = e.control.value
-        self.grafico.content = ft.Row([self._criar_grafico(novo_produto)])
-        self.grafico.update()
+    async def _ao_mudar_produto(self, e: ft.ControlState) -> None:
+        await self._carregar_grafico(e.control.value)
 
 
 class AreaCompras(ft.Column):
-    def __init__(self, movimentacoes: pd.DataFrame, produtos: pd.DataFrame) -> None:
+    def __init__(self, fonte, produtos: pd.DataFrame, entradas: tuple, volatilidade: pd.DataFrame) -> None:
         super().__init__()
-        self._criar_conteudo(movimentacoes, produtos)
+        self._criar_conteudo(fonte, produtos, entradas, volatilidade)
 
-    def _criar_conteudo(self, movimentacoes: pd.DataFrame, produtos: pd.DataFrame):
+    def _criar_conteudo(self, fonte, produtos: pd.DataFrame, entradas: tuple, volatilidade: pd.DataFrame):
         self.controls = [
             RotuloColuna("Compras", "./icons_clone/shopping-basket.png"),
             GradeNotificacao(self._cartoes_notificacoes(produtos)),
             ft.ResponsiveRow([
-                CartaoEntradas(movimentacoes),
-                CartaoVolatilidade(movimentacoes)
+                CartaoEntradas(fonte, entradas),
+                CartaoVolatilidade(fonte, volatilidade)
             ])
         ]
 
@@ -860,13 +1171,13 @@ class AreaCompras(ft.Column):
 
 
 class AreaEstoque(ft.Column):
-    def __init__(self, produtos: pd.DataFrame) -> None:
+    def __init__(self, produtos: pd.DataFrame, dados_grafico: pd.DataFrame) -> None:
         super().__init__()
-        self._criar_conteudos(produtos)
+        self._criar_conteudos(produtos, dados_grafico)
 
-    def _criar_conteudos(self, produtos: pd.DataFrame) -> None:
+    def _criar_conteudos(self, produtos: pd.DataFrame, dados_grafico: pd.DataFrame) -> None:
         self.controls = [
-            CartaoEstoque(produtos),
+            CartaoEstoque(produtos, dados_grafico),
             GradeNotificacao(self._cartoes_notificacoes(produtos))
         ]
 
@@ -892,12 +1203,11 @@ class AreaEstoque(ft.Column):
 
 
 class AreaFichasTecnicas(ft.Column):
-    def __init__(self) -> None:
+    def __init__(self, fichas: List) -> None:
         super().__init__()
-        self._criar_conteudo()
+        self._criar_conteudo(fichas)
 
-    def _criar_conteudo(self) -> None:
-        dados = self.ler_dados()     
+    def _criar_conteudo(self, dados: List) -> None:
         self.controls = [
             GradeNotificacao(self._cartoes_notificacoes(dados)),
             CartaoFichaTecnica()
@@ -926,78 +1236,106 @@ class AreaFichasTecnicas(ft.Column):
             ]
             return cartoes
         return []
-    
-    def ler_dados(self) -> List:
-        cliente = SupabaseSingleton().get_client()
-        resposta = (
-            cliente.table("fichas_tecnicas")
-            .select("*")
-            .eq("empresa_id", InfosGlobal().empresa_id)
-            .execute()
-        ).data
-        return resposta
 
 
 class Painel(ft.Column):
     def __init__(self) -> None:
         super().__init__()
+        self._produtos = None
+        self._fonte = None
+        self._fonte_local = None
 
     def did_mount(self) -> None:
-        self._mostrar_placeholder()
-        self._carregar_dados()
+        self._criar_conteudo()
 
-    def _mostrar_placeholder(self) -> None:
-        self.expand = True
-        self.controls = [
-            ft.Container(
-                content=ft.ProgressRing(),
-                expand=True,
-                alignment=ft.alignment.center
-            )
-        ]
-        self.update()
+    async def _obter_produtos(self) -> pd.DataFrame:
+        if self._produtos is None:
+            self._produtos = asyncio.ensure_future(Repositorio().produtos())
+        return self._preparar_produtos(await asyncio.shield(self._produtos))
+
+    async def _obter_fonte(self) -> tuple:
+        if self._fonte is None:
+            self._fonte = asyncio.ensure_future(self._carregar_fonte())
+        return await asyncio.shield(self._fonte)
+
+    async def _obter_fonte_local(self) -> tuple:
+        if self._fonte_local is None:
+            self._fonte_local = asyncio.ensure_future(self._carregar_fonte_local())
+        return await asyncio.shield(self._fonte_local)
 
-    def _carregar_dados(self) -> None:
-        client = SupabaseSingleton().get_client()
+    async def _carregar_fonte(self) -> tuple:
         try:
-            produtos_raw = (
-                client.table("produtos")
-                .select("quantidade, preco_unidade, categorias, estoque_minimo")
-                .eq("empresa_id", InfosGlobal().empresa_id)
-                .execute()
-            ).data
-
-            movimentacoes_raw = (
-                client.table("movimentacao")
-                .select(
-                    "operacao, data_movimentacao, data_validade, quantidade, classificacao,"
-                    "preco_movimentacao, produtos(nome, preco_unidade, categorias)"
-                )
-                .eq("empresa_id", InfosGlobal().empresa_id)
-                .execute()
-            ).data
+            produtos_df, diario_raw = await asyncio.gather(
+                self._obter_produtos(),
+                Repositorio().movimentacao_diaria()
+            )
+            fonte = FonteDiaria(diario_raw, produtos_df)
+        except Exception as e:
+            print("Erro ao carregar agregados do Supabase:", e)
+            return await self._obter_fonte_local()
+        return produtos_df, fonte
 
+    async def _carregar_fonte_local(self) -> tuple:
+        try:
+            produtos_df, movimentacoes_df, saldos_df = await asyncio.gather(
+                self._obter_produtos(),
+                CacheMovimentacoes().visao("painel", OperadorDados.transformar_dados_movimentacoes),
+                CacheMovimentacoes().visao("saldos", OperadorDados.saldos_produtos)
+            )
         except Exception as e:
             print("Erro ao carregar dados do Supabase:", e)
-            produtos_df, movimentacoes_df = pd.DataFrame(), pd.DataFrame()
-        else:
-            produtos_df, movimentacoes_df = self._preparar_dataframes(produtos_raw, movimentacoes_raw)
+            produtos_df, movimentacoes_df, saldos_df = pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
 
-        self._criar_conteudo(produtos_df, movimentacoes_df)
+        return produtos_df, FonteLocal(produtos_df, movimentacoes_df, saldos_df)
 
-    def _preparar_dataframes(self, produtos: List, movimentacoes: List) -> tuple:
+    async def _com_fallback(self, ler: Callable) -> tuple:
+        produtos_df, fonte = await self._obter_fonte()
+        try:
+            return produtos_df, fonte, await ler(fonte)
+        except Exception as e:
+            if isinstance(fonte, FonteLocal):
+                raise
+            print("Erro ao carregar agregados do Supabase:", e)
+            produtos_df, fonte = await self._obter_fonte_local()
+            return produtos_df, fonte, await ler(fonte)
+
+    def _preparar_produtos(self, produtos: List) -> pd.DataFrame:
         df_produtos = pd.DataFrame(produtos)
-        df_movimentacoes = pd.DataFrame(movimentacoes)
 
-        if not df_produtos.empty:
-            df_produtos = OperadorDados.transformar_dados_produtos(df_produtos)
+        return df_produtos
 
-        if not df_movimentacoes.empty:
-            df_movimentacoes = OperadorDados.transformar_dados_movimentacoes(df_movimentacoes)
+    async def _area_estoque(self) -> ft.Control:
+        try:
+            produtos_df, estoque = await asyncio.gather(self._obter_produtos(), FonteRemota().estoque())
+        except Exception as e:
+            print("Erro ao carregar agregados do Supabase:", e)
+            produtos_df, fonte = await self._obter_fonte_local()
+            estoque = await fonte.estoque()
+        return AreaEstoque(produtos_df, estoque)
 
-        return df_produtos, df_movimentacoes
+    async def _cartao_giro(self) -> ft.Control:
+        _, fonte, top_produtos = await self._com_fallback(lambda fonte: fonte.top_produtos())
+        return CartaoGiro(fonte, top_produtos)
 
-    def _criar_conteudo(self, df_produtos: pd.DataFrame, df_movimentacoes: pd.DataFrame) -> None:
+    async def _area_fichas(self) -> ft.Control:
+        try:
+            fichas = await Repositorio().fichas_tecnicas()
+        except Exception as e:
+            print("Erro ao carregar dados do Supabase:", e)
+            fichas = []
+        return AreaFichasTecnicas(fichas)
+
+    async def _cartao_cmv(self) -> ft.Control:
+        _, fonte, cmv = await self._com_fallback(lambda fonte: fonte.cmv(30))
+        return CartaoCMV(fonte, cmv)
+
+    async def _area_compras(self) -> ft.Control:
+        produtos_df, fonte, (entradas, volatilidade) = await self._com_fallback(
+            lambda fonte: asyncio.gather(fonte.entradas(30), fonte.volatilidade())
+        )
+        return AreaCompras(fonte, produtos_df, entradas, volatilidade)
+
+    def _criar_conteudo(self) -> None:
         self.expand = False
         self.scroll = ft.ScrollMode.ALWAYS
         self.controls = [
@@ -1006,20 +1344,35 @@ class Painel(ft.Column):
                 content=ft.ResponsiveRow([
                     ft.Column([
                         RotuloColuna("Estoque", "./icons_clone/boxes.png"),
-                        ft.ResponsiveRow([AreaEstoque(df_produtos)]),
+                        ft.ResponsiveRow([
+                            CarregamentoProgressivo(self._area_estoque, EsqueletoCartao(300))
+                        ]),
 
                         RotuloColuna("Giro de estoque", "./icons_clone/exchange.png"),
-                        ft.ResponsiveRow([CartaoGiro(df_movimentacoes)]),
+                        ft.ResponsiveRow([
+                            CarregamentoProgressivo(self._cartao_giro, EsqueletoCartao(300, 1))
+                        ]),
 
                         RotuloColuna("Fichas técnicas", "./icons_clone/utensils.png"),
-                        ft.ResponsiveRow([AreaFichasTecnicas()])
+                        ft.ResponsiveRow([
+                            CarregamentoProgressivo(self._area_fichas, EsqueletoCartao(0, 1))
+                        ])
                     ], col=6),
 
                     ft.Column([
                         RotuloColuna("CMV", "./icons_clone/usd-circle.png"),
-                        ft.ResponsiveRow([CartaoCMV(df_movimentacoes)]),
+                        ft.ResponsiveRow([
+                            CarregamentoProgressivo(self._cartao_cmv, EsqueletoCartao(300))
+                        ]),
 
-                        AreaCompras(df_movimentacoes, df_produtos)
+                        CarregamentoProgressivo(
+                            self._area_compras,
+                            ft.Column([
+                                RotuloColuna("Compras", "./icons_clone/shopping-basket.png"),
+                                EsqueletoCartao(150),
+                                EsqueletoCartao(300, 1)
+                            ])
+                        )
                     ], col=6)
                 ])
             )
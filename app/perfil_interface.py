@@ -0,0 +1,174 @@
+import json
+import logging
+import threading
+import time
+import flet as ft
+from flet.core.protocol import CommandEncoder
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PerfilInterface:
+    _instance = None
+
+    LIMITE_CLASSES = 15
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.ativo = False
+            cls._instance.pagina = None
+            cls._instance.raiz = None
+            cls._instance.inicio = None
+            cls._instance.componentes = {}
+            cls._instance._trava = threading.Lock()
+            cls._instance._local = threading.local()
+        return cls._instance
+
+    def instalar(self) -> None:
+        if self.ativo:
+            return
+        self.ativo = True
+        for classe in self._subclasses(ft.Control):
+            if "__init__" in classe.__dict__ and not classe.__module__.startswith("flet"):
+                classe.__init__ = self._medir_construcao(classe.__init__)
+        ft.Control.build_update_commands = self._medir_atualizacao(ft.Control.build_update_commands)
+
+    @classmethod
+    def _subclasses(cls, classe: type) -> list:
+        encontradas = []
+        for subclasse in classe.__subclasses__():
+            encontradas.append(subclasse)
+            encontradas += cls._subclasses(subclasse)
+        return list(dict.fromkeys(encontradas))
+
+    def navegar(self, pagina: str, raiz: Optional[ft.Control]=None) -> None:
+        if not self.ativo:
+            return
+        self.relatar()
+        with self._trava:
+            self.pagina = pagina
+            self.raiz = raiz
+            self.inicio = time.perf_counter()
+            self.componentes = {}
+
+    def relatar(self) -> Optional[dict]:
+        if not self.ativo or self.pagina is None:
+            return None
+        with self._trava:
+            componentes = {classe: dict(medidas) for classe, medidas in self.componentes.items()}
+        relatorio = {
+            "pagina": self.pagina,
+            "duracao": time.perf_counter() - self.inicio,
+            "controles": self.contar(self.raiz),
+            "construcao": sum(medidas["construcao"] for medidas in componentes.values()),
+            "atualizacoes": sum(medidas["atualizacoes"] for medidas in componentes.values()),
+            "tempo_atualizacao": sum(medidas["tempo_atualizacao"] for medidas in componentes.values()),
+            "carga": sum(medidas["carga"] for medidas in componentes.values()),
+            "enviados": sum(medidas["enviados"] for medidas in componentes.values()),
+            "componentes": componentes
+        }
+
+        logger.info(
+            f"Página {relatorio['pagina']} ({relatorio['duracao']:.1f} s): "
+            f"{relatorio['controles']} controles na árvore, "
+            f"construção {relatorio['construcao']:.3f} s, "
+            f"{relatorio['atualizacoes']} update() em {relatorio['tempo_atualizacao']:.3f} s, "
+            f"{relatorio['enviados']} controles e {relatorio['carga'] / 1024:.1f} KB enviados"
+        )
+        ordenados = sorted(
+            componentes.items(),
+            key=lambda item: (-item[1]["carga"], -item[1]["construcao"])
+        )
+        for classe, medidas in ordenados[:self.LIMITE_CLASSES]:
+            logger.info(
+                f"  {classe}: {medidas['instancias']} instâncias, "
+                f"construção {medidas['construcao']:.3f} s, "
+                f"{medidas['atualizacoes']} update() em {medidas['tempo_atualizacao']:.3f} s, "
+                f"{medidas['enviados']} controles e {medidas['carga'] / 1024:.1f} KB enviados"
+            )
+        return relatorio
+
+    @staticmethod
+    def contar(raiz: Optional[ft.Control]) -> int:
+        if raiz is None:
+            return 0
+        total, pendentes = 0, [raiz]
+        while pendentes:
+            controle = pendentes.pop()
+            total += 1
+            pendentes += [filho for filho in controle._get_children() if filho is not None]
+        return total
+
+    def _registrar(self, classe: str, **medidas) -> None:
+        with self._trava:
+            atual = self.componentes.setdefault(classe, {
+                "instancias": 0,
+                "construcao": 0.0,
+                "atualizacoes": 0,
+                "tempo_atualizacao": 0.0,
+                "carga": 0,
+                "enviados": 0
+            })
+            for chave, valor in medidas.items():
+                atual[chave] += valor
+
+    @staticmethod
+    def _componente(controle: ft.Control) -> str:
+        atual = controle
+        while atual is not None:
+            if not type(atual).__module__.startswith("flet"):
+                return type(atual).__name__
+            atual = atual.parent
+        return type(controle).__name__
+
+    def _medir_construcao(self, construtor: Callable) -> Callable:
+        perfil = self
+
+        def __init__(controle, *args, **kwargs):
+            pilha = perfil._local.__dict__.setdefault("pilha", [])
+            if pilha and pilha[-1][0] is controle:
+                return construtor(controle, *args, **kwargs)
+            pilha.append([controle, time.perf_counter(), 0.0])
+            try:
+                construtor(controle, *args, **kwargs)
+            finally:
+                _, inicio, filhos = pilha.pop()
+                total = time.perf_counter() - inicio
+                if pilha:
+                    pilha[-1][2] += total
+                perfil._registrar(type(controle).__name__, instancias=1, construcao=total - filhos)
+
+        __init__.__wrapped__ = construtor
+        return __init__
+
+    def _medir_atualizacao(self, construir: Callable) -> Callable:
+        perfil = self
+
+        def build_update_commands(controle, index, commands, added_controls, removed_controls, isolated=False):
+            if getattr(perfil._local, "atualizando", False):
+                return construir(controle, index, commands, added_controls, removed_controls, isolated)
+            perfil._local.atualizando = True
+            comandos, adicionados = len(commands), len(added_controls)
+            inicio = time.perf_counter()
+            try:
+                construir(controle, index, commands, added_controls, removed_controls, isolated)
+            finally:
+                perfil._local.atualizando = False
+            duracao = time.perf_counter() - inicio
+            carga = len(json.dumps(commands[comandos:], cls=CommandEncoder, separators=(",", ":")))
+            perfil._registrar(
+                perfil._componente(controle),
+                atualizacoes=1,
+                tempo_atualizacao=duracao,
+                carga=carga,
+                enviados=len(added_controls) - adicionados
+            )
+
+        build_update_commands.__wrapped__ = construir
+        return build_update_commands
+
+    def medidas(self) -> Dict[str, dict]:
+        with self._trava:
+            return {classe: dict(medidas) for classe, medidas in self.componentes.items()}
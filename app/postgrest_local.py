@@ -0,0 +1,754 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import unquote
+from zoneinfo import ZoneInfo
+
+import httpx
+
+from banco_de_dados import SupabaseAsync, SupabaseSingleton
+
+
+class ErroPostgrest(Exception):
+    def __init__(self, status: int, codigo: str, mensagem: str) -> None:
+        super().__init__(mensagem)
+        self.status = status
+        self.codigo = codigo
+        self.mensagem = mensagem
+
+
+class Medicao:
+    def __init__(self) -> None:
+        self.chamadas = []
+
+    @property
+    def requisicoes(self) -> int:
+        return len(self.chamadas)
+
+    @property
+    def bytes_enviados(self) -> int:
+        return sum(chamada["bytes_enviados"] for chamada in self.chamadas)
+
+    @property
+    def bytes_recebidos(self) -> int:
+        return sum(chamada["bytes_recebidos"] for chamada in self.chamadas)
+
+    @property
+    def linhas(self) -> int:
+        return sum(chamada["linhas"] for chamada in self.chamadas)
+
+    def por_recurso(self) -> Dict[str, int]:
+        contagem = {}
+        for chamada in self.chamadas:
+            contagem[chamada["recurso"]] = contagem.get(chamada["recurso"], 0) + 1
+        return contagem
+
+
+class PostgrestLocal(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    URL = "http://localhost:54321"
+    CHAVE = "local.postgrest.chave"
+    FUSO = ZoneInfo("America/Sao_Paulo")
+
+    OPERADORES = {
+        "eq": "=",
+        "neq": "<>",
+        "gt": ">",
+        "gte": ">=",
+        "lt": "<",
+        "lte": "<=",
+        "like": "like",
+        "ilike": "like"
+    }
+
+    VALORADAS = """
+        with valoradas as (
+            select
+                json_extract(p.dados, '$.nome') as nome,
+                json_extract(p.dados, '$.id') as id_produto,
+                coalesce(json_extract(p.dados, '$.categorias'), '{}') as categorias,
+                lower(json_extract(m.dados, '$.operacao')) as operacao,
+                coalesce(lower(json_extract(m.dados, '$.classificacao')), 'sem class.') as classificacao,
+                coalesce(
+                    json_extract(m.dados, '$.preco_movimentacao'),
+                    json_extract(p.dados, '$.preco_unidade')
+                ) as preco_movimentacao,
+                json_extract(m.dados, '$.quantidade') * coalesce(
+                    json_extract(m.dados, '$.preco_movimentacao'),
+                    json_extract(p.dados, '$.preco_unidade')
+                ) as total_movimentado
+            from linhas m
+            join linhas p on p.tabela = 'produtos' and p.id = json_extract(m.dados, '$.id_produto')
+            where m.tabela = 'movimentacao'
+              and json_extract(m.dados, '$.empresa_id') = :empresa_id
+              and (:desde is null or julianday(json_extract(m.dados, '$.data_movimentacao')) > julianday(:desde))
+        )
+    """
+    CMV = "operacao = 'saída' and classificacao in ('vendas', 'desperdício', 'sem class.')"
+    ENTRADAS = "operacao = 'entrada' and classificacao in ('compras', 'transferência', 'sem class.')"
+
+    def __init__(self, caminho: str=":memory:") -> None:
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.conexao.row_factory = sqlite3.Row
+        self._trava = threading.RLock()
+        self.chamadas = []
+        self._medicoes = []
+        self.funcoes = {
+            "registrar_movimentacao": self._registrar_movimentacao,
+            "registrar_movimentacoes": self._registrar_movimentacoes,
+            "criar_produto": self._criar_produto,
+            "atualizar_produto": self._atualizar_produto,
+            "editar_movimentacao": self._editar_movimentacao,
+            "receber_lista_compras": self._receber_lista_compras,
+            "atualizar_movimentacao_diaria": self._atualizar_movimentacao_diaria,
+            "calcular_cmv_real": self._calcular_cmv_real,
+            "dados_grafico_cmv": self._dados_grafico_cmv,
+            "dados_grafico_entradas": self._dados_grafico_entradas,
+            "dados_grafico_estoque": self._dados_grafico_estoque,
+            "volatilidade_preco": self._volatilidade_preco
+        }
+        self.conexao.create_function(
+            "lower", 1, lambda texto: None if texto is None else str(texto).lower(), deterministic=True
+        )
+        with self.conexao:
+            self.conexao.execute(
+                """
+                create table if not exists linhas (
+                    tabela text not null,
+                    id integer not null,
+                    dados text not null,
+                    primary key (tabela, id)
+                )
+                """
+            )
+
+    def instalar(self) -> SupabaseSingleton:
+        SupabaseSingleton._instance = None
+        SupabaseAsync._instance = None
+        return SupabaseSingleton(self.URL, self.CHAVE, transporte=self)
+
+    def carregar(self, tabela: str, registros: List[dict]) -> None:
+        with self._trava, self.conexao:
+            self._inserir(tabela, registros)
+
+    def ler(self, tabela: str) -> List[dict]:
+        with self._trava:
+            return self._selecionar(tabela, [], [], None, 0)
+
+    @contextmanager
+    def medir(self) -> Iterator[Medicao]:
+        medicao = Medicao()
+        self._medicoes.append(medicao)
+        try:
+            yield medicao
+        finally:
+            self._medicoes.remove(medicao)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self._responder(request, request.read())
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return self._responder(request, await request.aread())
+
+    def _responder(self, request: httpx.Request, corpo: bytes) -> httpx.Response:
+        inicio = time.perf_counter()
+        caminho = request.url.path.split("/rest/v1/", 1)[-1].strip("/")
+        try:
+            with self._trava, self.conexao:
+                status, dados, cabecalhos = self._executar(request, caminho, json.loads(corpo) if corpo else None)
+        except ErroPostgrest as e:
+            status, dados, cabecalhos = e.status, {"code": e.codigo, "message": e.mensagem, "details": None, "hint": None}, {}
+        except (sqlite3.Error, ValueError, KeyError, TypeError) as e:
+            status, dados, cabecalhos = 400, {"code": "PGRST100", "message": str(e), "details": None, "hint": None}, {}
+
+        conteudo = b"" if dados is None else json.dumps(dados).encode("utf-8")
+        chamada = {
+            "metodo": request.method,
+            "recurso": caminho,
+            "consulta": unquote(request.url.query.decode("ascii")),
+            "status": status,
+            "linhas": len(dados) if isinstance(dados, list) else int(dados is not None),
+            "bytes_enviados": len(str(request.url)) + len(corpo),
+            "bytes_recebidos": len(conteudo),
+            "duracao": time.perf_counter() - inicio
+        }
+        self.chamadas.append(chamada)
+        for medicao in self._medicoes:
+            medicao.chamadas.append(chamada)
+
+        cabecalhos["Content-Type"] = "application/json"
+        return httpx.Response(status, headers=cabecalhos, content=conteudo, request=request)
+
+    def _executar(self, request: httpx.Request, caminho: str, corpo: Any) -> Tuple[int, Any, dict]:
+        if caminho.startswith("rpc/"):
+            return self._rpc(caminho[4:], corpo or {})
+
+        parametros = list(request.url.params.multi_items())
+        preferencias = request.headers.get("Prefer", "")
+        filtros = self._filtros(parametros)
+
+        if request.method == "GET":
+            ordem = next((valor for chave, valor in parametros if chave == "order"), None)
+            limite = next((int(valor) for chave, valor in parametros if chave == "limit"), None)
+            deslocamento = next((int(valor) for chave, valor in parametros if chave == "offset"), 0)
+            linhas = self._selecionar(caminho, filtros, self._ordem(ordem), limite, deslocamento)
+            dados = self._projetar(caminho, linhas, self._selecao(parametros))
+            cabecalhos = {"Content-Range": f"{deslocamento}-{deslocamento + max(len(dados) - 1, 0)}/*"}
+            if "count=exact" in preferencias:
+                total = len(self._selecionar(caminho, filtros, [], None, 0))
+                cabecalhos["Content-Range"] = f"{deslocamento}-{deslocamento + max(len(dados) - 1, 0)}/{total}"
+            if "vnd.pgrst.object" in request.headers.get("Accept", ""):
+                if len(dados) != 1:
+                    raise ErroPostgrest(406, "PGRST116", "JSON object requested, multiple (or no) rows returned")
+                return 200, dados[0], cabecalhos
+            return 200, dados, cabecalhos
+
+        if request.method == "POST":
+            registros = corpo if isinstance(corpo, list) else [corpo]
+            dados = self._inserir(caminho, registros)
+        elif request.method == "PATCH":
+            dados = self._atualizar(caminho, filtros, corpo or {})
+        elif request.method == "DELETE":
+            dados = self._excluir(caminho, filtros)
+        else:
+            raise ErroPostgrest(405, "PGRST117", f"Método {request.method} não suportado")
+
+        if "return=representation" in preferencias:
+            return 201 if request.method == "POST" else 200, dados, {}
+        return 204, None, {}
+
+    def _rpc(self, nome: str, parametros: dict) -> Tuple[int, Any, dict]:
+        funcao = self.funcoes.get(nome)
+        if funcao is None:
+            raise ErroPostgrest(404, "PGRST202", f"Could not find the function public.{nome}")
+        return 200, funcao(**parametros), {}
+
+    def _selecao(self, parametros: List[Tuple[str, str]]) -> List[Any]:
+        texto = next((valor for chave, valor in parametros if chave == "select"), "*")
+        return self._analisar_selecao(texto)
+
+    def _analisar_selecao(self, texto: str) -> List[Any]:
+        itens = []
+        for parte in self._dividir(texto):
+            parte = parte.strip()
+            if "(" in parte and parte.endswith(")"):
+                nome, interno = parte.split("(", 1)
+                alias, _, tabela = nome.rpartition(":")
+                tabela = tabela.split("!")[0]
+                itens.append((alias or tabela, tabela, self._analisar_selecao(interno[:-1])))
+            elif parte:
+                itens.append(parte.split("::")[0])
+        return itens
+
+    def _dividir(self, texto: str) -> List[str]:
+        partes, profundidade, atual, aspas = [], 0, "", False
+        for caractere in texto:
+            if caractere == '"':
+                aspas = not aspas
+            elif not aspas and caractere == "(":
+                profundidade += 1
+            elif not aspas and caractere == ")":
+                profundidade -= 1
+            elif not aspas and caractere == "," and profundidade == 0:
+                partes.append(atual)
+                atual = ""
+                continue
+            atual += caractere
+        if atual:
+            partes.append(atual)
+        return partes
+
+    def _filtros(self, parametros: List[Tuple[str, str]]) -> List[Tuple[str, list]]:
+        reservados = {"select", "order", "limit", "offset", "columns", "on_conflict"}
+        filtros = []
+        for chave, valor in parametros:
+            if chave in reservados:
+                continue
+            if chave in ("or", "and"):
+                filtros.append(self._grupo(chave, valor.strip()[1:-1]))
+            elif chave in ("not.or", "not.and"):
+                sql, valores = self._grupo(chave[4:], valor.strip()[1:-1])
+                filtros.append((f"not ({sql})", valores))
+            else:
+                filtros.append(self._condicao(chave, valor))
+        return filtros
+
+    def _grupo(self, juncao: str, texto: str) -> Tuple[str, list]:
+        partes, valores = [], []
+        for item in self._dividir(texto):
+            item = item.strip()
+            correspondencia = re.match(r"^(not\.)?(and|or)\((.*)\)$", item)
+            if correspondencia:
+                sql, parametros = self._grupo(correspondencia.group(2), correspondencia.group(3))
+                sql = f"not ({sql})" if correspondencia.group(1) else sql
+            else:
+                coluna, expressao = item.split(".", 1)
+                sql, parametros = self._condicao(coluna, expressao)
+            partes.append(f"({sql})")
+            valores += parametros
+        return f" {juncao} ".join(partes), valores
+
+    def _condicao(self, coluna: str, expressao: str) -> Tuple[str, list]:
+        negar = expressao.startswith("not.")
+        if negar:
+            expressao = expressao[4:]
+        operador, _, valor = expressao.partition(".")
+        campo = "json_extract(dados, ?)"
+        caminho = f'$."{coluna}"'
+
+        if operador == "is":
+            literal = {"null": "null", "true": "1", "false": "0"}[valor.lower()]
+            sql = f"{campo} is {literal}"
+            parametros = [caminho]
+        elif operador == "in":
+            itens = [self._valor(item) for item in self._dividir(valor.strip()[1:-1])]
+            sql = f"{campo} in ({', '.join('?' * len(itens))})" if itens else "0"
+            parametros = [caminho, *itens] if itens else []
+        elif operador in self.OPERADORES:
+            literal = self._valor(valor)
+            if operador in ("like", "ilike"):
+                literal = str(literal).replace("*", "%")
+            if operador == "ilike":
+                sql = f"lower({campo}) like lower(?)"
+            else:
+                sql = f"{campo} {self.OPERADORES[operador]} ?"
+            parametros = [caminho, literal]
+        else:
+            raise ErroPostgrest(400, "PGRST100", f"Operador {operador} não suportado")
+
+        return (f"not ({sql})" if negar else sql), parametros
+
+    def _valor(self, texto: str) -> Any:
+        texto = texto.strip()
+        if len(texto) > 1 and texto[0] == texto[-1] == '"':
+            return texto[1:-1]
+        if texto in ("true", "false"):
+            return int(texto == "true")
+        for conversao in (int, float):
+            try:
+                return conversao(texto)
+            except ValueError:
+                pass
+        return texto
+
+    def _ordem(self, texto: Optional[str]) -> List[Tuple[str, str]]:
+        ordem = []
+        for item in (texto or "").split(","):
+            if not item:
+                continue
+            partes = item.split(".")
+            coluna = partes[0]
+            direcao = "desc" if "desc" in partes[1:] else "asc"
+            nulos = " nulls first" if "nullsfirst" in partes[1:] else (" nulls last" if "nullslast" in partes[1:] else "")
+            ordem.append((coluna, direcao + nulos))
+        return ordem
+
+    def _selecionar(
+        self,
+        tabela: str,
+        filtros: List[Tuple[str, list]],
+        ordem: List[Tuple[str, str]],
+        limite: Optional[int],
+        deslocamento: int
+    ) -> List[dict]:
+        sql = "select dados from linhas where tabela = ?"
+        parametros = [tabela]
+        for condicao, valores in filtros:
+            sql += f" and ({condicao})"
+            parametros += valores
+        ordenacao = [f"json_extract(dados, ?) {direcao}" for _, direcao in ordem] + ["id"]
+        parametros += [f'$."{coluna}"' for coluna, _ in ordem]
+        sql += " order by " + ", ".join(ordenacao)
+        if limite is not None or deslocamento:
+            sql += " limit ? offset ?"
+            parametros += [-1 if limite is None else limite, deslocamento]
+        return [json.loads(linha["dados"]) for linha in self.conexao.execute(sql, parametros)]
+
+    def _projetar(self, tabela: str, linhas: List[dict], selecao: List[Any]) -> List[dict]:
+        colunas = [item for item in selecao if isinstance(item, str)]
+        embutidos = [item for item in selecao if isinstance(item, tuple)]
+        resultado = [
+            dict(linha) if "*" in colunas else {coluna: linha.get(coluna) for coluna in colunas}
+            for linha in linhas
+        ]
+        for alias, alvo, selecao_alvo in embutidos:
+            chave = self._chave_estrangeira(linhas, alvo)
+            if chave is not None:
+                ids = sorted({linha[chave] for linha in linhas if linha.get(chave) is not None})
+                relacionados = self._por_coluna(alvo, "id", ids)
+                projetados = dict(zip(relacionados, self._projetar(alvo, list(relacionados.values()), selecao_alvo)))
+                for linha, saida in zip(linhas, resultado):
+                    saida[alias] = projetados.get(linha.get(chave))
+            else:
+                referencia = self._referencia(tabela)
+                ids = sorted({linha["id"] for linha in linhas})
+                filhos = self._selecionar(alvo, [self._condicao(referencia, f"in.({','.join(map(str, ids))})")], [], None, 0)
+                projetados = self._projetar(alvo, filhos, selecao_alvo)
+                agrupados = {}
+                for filho, saida_filho in zip(filhos, projetados):
+                    agrupados.setdefault(filho.get(referencia), []).append(saida_filho)
+                for linha, saida in zip(linhas, resultado):
+                    saida[alias] = agrupados.get(linha["id"], [])
+        return resultado
+
+    def _chave_estrangeira(self, linhas: List[dict], alvo: str) -> Optional[str]:
+        singular = alvo[:-1] if alvo.endswith("s") else alvo
+        candidatos = [f"id_{singular}", f"{singular}_id", f"id_{alvo}", f"{alvo}_id"]
+        for candidato in candidatos:
+            if any(candidato in linha for linha in linhas):
+                return candidato
+        return None if linhas else candidatos[0]
+
+    def _referencia(self, tabela: str) -> str:
+        singular = tabela[:-1] if tabela.endswith("s") else tabela
+        return f"{singular}_id"
+
+    def _por_coluna(self, tabela: str, coluna: str, valores: list) -> Dict[Any, dict]:
+        if not valores:
+            return {}
+        linhas = self._selecionar(tabela, [self._condicao(coluna, f"in.({','.join(map(str, valores))})")], [], None, 0)
+        return {linha[coluna]: linha for linha in linhas}
+
+    def _inserir(self, tabela: str, registros: List[dict]) -> List[dict]:
+        proximo = self.conexao.execute(
+            "select coalesce(max(id), 0) + 1 from linhas where tabela = ?", (tabela,)
+        ).fetchone()[0]
+        agora = self._agora()
+        inseridos = []
+        for registro in registros:
+            registro = dict(registro)
+            if registro.get("id") is None:
+                registro["id"] = proximo
+            proximo = max(proximo, int(registro["id"]) + 1)
+            registro.setdefault("updated_at", agora)
+            inseridos.append(registro)
+        self.conexao.executemany(
+            "insert or replace into linhas values (?, ?, ?)",
+            [(tabela, registro["id"], json.dumps(registro)) for registro in inseridos]
+        )
+        return inseridos
+
+    def _atualizar(self, tabela: str, filtros: List[Tuple[str, list]], alteracoes: dict) -> List[dict]:
+        linhas = self._selecionar(tabela, filtros, [], None, 0)
+        agora = self._agora()
+        for linha in linhas:
+            linha.update(alteracoes)
+            linha["updated_at"] = agora
+        self.conexao.executemany(
+            "update linhas set dados = ? where tabela = ? and id = ?",
+            [(json.dumps(linha), tabela, linha["id"]) for linha in linhas]
+        )
+        return linhas
+
+    def _excluir(self, tabela: str, filtros: List[Tuple[str, list]]) -> List[dict]:
+        linhas = self._selecionar(tabela, filtros, [], None, 0)
+        self.conexao.executemany(
+            "delete from linhas where tabela = ? and id = ?",
+            [(tabela, linha["id"]) for linha in linhas]
+        )
+        if linhas and tabela != "exclusoes":
+            agora = self._agora()
+            self._inserir("exclusoes", [
+                {
+                    "empresa_id": linha.get("empresa_id"),
+                    "tabela": tabela,
+                    "registro_id": linha["id"],
+                    "updated_at": agora
+                }
+                for linha in linhas
+            ])
+        return linhas
+
+    def _agora(self) -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f+00:00")
+
+    def _registrar_movimentacao(self, p_empresa_id: int, p_movimentacao: dict) -> List[dict]:
+        return self._registrar_movimentacoes(p_empresa_id, [p_movimentacao])
+
+    def _registrar_movimentacoes(self, p_empresa_id: int, p_movimentacoes: List[dict]) -> List[dict]:
+        movimentacoes = self._inserir("movimentacao", [
+            {**movimentacao, "empresa_id": p_empresa_id} for movimentacao in p_movimentacoes
+        ])
+        for movimentacao in movimentacoes:
+            self._aplicar_estoque(p_empresa_id, movimentacao)
+            self._atualizar_movimentacao_diaria(
+                p_empresa_id, movimentacao["id_produto"], movimentacao["data_movimentacao"]
+            )
+        return movimentacoes
+
+    def _criar_produto(self, p_empresa_id: int, p_produto: dict, p_movimentacao: dict) -> List[dict]:
+        produto = self._inserir("produtos", [{**p_produto, "empresa_id": p_empresa_id}])[0]
+        movimentacao = self._inserir("movimentacao", [
+            {**p_movimentacao, "empresa_id": p_empresa_id, "id_produto": produto["id"]}
+        ])[0]
+        self._atualizar_movimentacao_diaria(p_empresa_id, produto["id"], movimentacao["data_movimentacao"])
+        return [produto]
+
+    def _atualizar_produto(self, p_empresa_id: int, p_id: int, p_produto: dict) -> List[dict]:
+        filtros = [self._condicao("id", f"eq.{p_id}"), self._condicao("empresa_id", f"eq.{p_empresa_id}")]
+        if not self._selecionar("produtos", filtros, [], None, 0):
+            raise ErroPostgrest(400, "P0001", f"Produto {p_id} não encontrado")
+        alteracoes = {
+            coluna: p_produto[coluna]
+            for coluna in (
+                "nome", "unidade", "quantidade", "estoque_minimo", "preco_unidade", "cmv", "categorias", "fornecedores"
+            )
+            if coluna in p_produto
+        }
+        produto = self._atualizar("produtos", filtros, alteracoes)[0]
+        self._atualizar_movimentacao_diaria(p_empresa_id, p_id)
+        return [produto]
+
+    def _editar_movimentacao(self, p_empresa_id: int, p_id: int, p_alteracoes: dict) -> List[dict]:
+        filtros = [self._condicao("id", f"eq.{p_id}"), self._condicao("empresa_id", f"eq.{p_empresa_id}")]
+        antigas = self._selecionar("movimentacao", filtros, [], None, 0)
+        if not antigas:
+            raise ErroPostgrest(400, "P0001", f"Movimentação {p_id} não encontrada")
+        antiga = antigas[0]
+
+        alteracoes = {
+            coluna: p_alteracoes[coluna]
+            for coluna in ("classificacao", "quantidade", "preco_movimentacao")
+            if coluna in p_alteracoes
+        }
+        nova = self._atualizar("movimentacao", filtros, alteracoes)[0]
+
+        if nova.get("quantidade") != antiga.get("quantidade"):
+            diferenca = float(nova.get("quantidade") or 0) - float(antiga.get("quantidade") or 0)
+            if str(nova.get("operacao", "")).lower() == "saída":
+                diferenca = -diferenca
+            filtros_produto = [
+                self._condicao("id", f"eq.{nova['id_produto']}"),
+                self._condicao("empresa_id", f"eq.{p_empresa_id}")
+            ]
+            for produto in self._selecionar("produtos", filtros_produto, [], None, 0):
+                self._atualizar(
+                    "produtos",
+                    [self._condicao("id", f"eq.{produto['id']}")],
+                    {"quantidade": float(produto.get("quantidade") or 0) + diferenca}
+                )
+
+        self._atualizar_movimentacao_diaria(p_empresa_id, nova["id_produto"], nova["data_movimentacao"])
+        return [nova]
+
+    def _receber_lista_compras(
+        self,
+        p_empresa_id: int,
+        p_lista_id: int,
+        p_alteracoes: dict,
+        p_entrada_estoque: bool=True
+    ) -> List[dict]:
+        filtros = [self._condicao("id", f"eq.{p_lista_id}"), self._condicao("empresa_id", f"eq.{p_empresa_id}")]
+        listas = self._selecionar("lista_compras", filtros, [], None, 0)
+        if not listas:
+            raise ErroPostgrest(400, "P0001", f"Lista de compras {p_lista_id} não encontrada")
+        if listas[0].get("finalizada"):
+            raise ErroPostgrest(400, "P0001", f"Lista de compras {p_lista_id} já foi recebida")
+
+        alteracoes = {
+            coluna: p_alteracoes[coluna]
+            for coluna in ("valor_total", "produtos", "recebimento")
+            if coluna in p_alteracoes
+        }
+        lista = self._atualizar("lista_compras", filtros, {**alteracoes, "finalizada": True})[0]
+
+        if p_entrada_estoque:
+            itens = sorted((lista.get("produtos") or {}).items())
+            produtos = {
+                id: produto
+                for id, produto in self._por_coluna("produtos", "id", sorted({item["id"] for _, item in itens})).items()
+                if produto.get("empresa_id") == p_empresa_id
+            }
+            agora = self._agora()
+            self._registrar_movimentacoes(p_empresa_id, [
+                {
+                    "id_produto": item["id"],
+                    "unidade": produtos[item["id"]].get("unidade"),
+                    "operacao": "entrada",
+                    "classificacao": "Compras",
+                    "quantidade": float(item["qtd_comprar"]),
+                    "preco_movimentacao": None if item.get("preco") is None else float(item["preco"]),
+                    "data_movimentacao": agora,
+                    "informacoes": f"Lista de compras: {lista['nome']}"
+                }
+                for _, item in itens
+                if item["id"] in produtos and float(item.get("qtd_comprar") or 0) > 0
+            ])
+
+        return [lista]
+
+    def _aplicar_estoque(self, empresa_id: int, movimentacao: dict) -> None:
+        filtros = [self._condicao("id", f"eq.{movimentacao['id_produto']}"), self._condicao("empresa_id", f"eq.{empresa_id}")]
+        for produto in self._selecionar("produtos", filtros, [], None, 0):
+            quantidade = float(movimentacao.get("quantidade") or 0)
+            atual = float(produto.get("quantidade") or 0)
+            operacao = str(movimentacao.get("operacao", "")).lower()
+            if operacao == "inventário":
+                novo = quantidade
+            elif operacao == "saída":
+                novo = atual - quantidade
+            else:
+                novo = atual + quantidade
+            self._atualizar("produtos", [self._condicao("id", f"eq.{produto['id']}")], {"quantidade": novo})
+
+    def _atualizar_movimentacao_diaria(
+        self,
+        p_empresa_id: int,
+        p_id_produto: Optional[int]=None,
+        p_data: Optional[str]=None
+    ) -> None:
+        dia = self._dia(p_data) if p_data else None
+        filtros = [self._condicao("empresa_id", f"eq.{p_empresa_id}")]
+        if p_id_produto is not None:
+            filtros.append(self._condicao("id_produto", f"eq.{p_id_produto}"))
+        if dia is not None:
+            filtros.append(self._condicao("dia", f'eq."{dia}"'))
+        for linha in self._selecionar("movimentacao_diaria", filtros, [], None, 0):
+            self.conexao.execute("delete from linhas where tabela = 'movimentacao_diaria' and id = ?", (linha["id"],))
+
+        filtros = filtros[:2] if p_id_produto is not None else filtros[:1]
+        movimentacoes = [
+            movimentacao for movimentacao in self._selecionar("movimentacao", filtros, [], None, 0)
+            if dia is None or self._dia(movimentacao["data_movimentacao"]) == dia
+        ]
+        produtos = self._por_coluna("produtos", "id", sorted({mov["id_produto"] for mov in movimentacoes}))
+        inventarios = {}
+        for movimentacao in movimentacoes:
+            if str(movimentacao["operacao"]).lower() == "inventário":
+                chave = movimentacao["id_produto"], self._dia(movimentacao["data_movimentacao"])
+                ordem = self._momento(movimentacao["data_movimentacao"]), movimentacao["id"]
+                inventarios[chave] = max(inventarios.get(chave, ordem), ordem)
+
+        agregados = {}
+        for movimentacao in movimentacoes:
+            produto = produtos.get(movimentacao["id_produto"], {})
+            preco = movimentacao.get("preco_movimentacao")
+            preco = produto.get("preco_unidade") if preco is None else preco
+            operacao = str(movimentacao["operacao"]).lower()
+            quantidade_mov = float(movimentacao.get("quantidade") or 0)
+            sinal = -quantidade_mov if operacao == "saída" else quantidade_mov
+            ultimo = inventarios.get((movimentacao["id_produto"], self._dia(movimentacao["data_movimentacao"])))
+            ordem = self._momento(movimentacao["data_movimentacao"]), movimentacao["id"]
+            if ultimo is None or ordem > ultimo:
+                variacao_mov = sinal
+            elif ordem == ultimo:
+                variacao_mov = quantidade_mov
+            else:
+                variacao_mov = 0.0
+            for categoria in list(produto.get("categorias") or {}) or [""]:
+                chave = (
+                    self._dia(movimentacao["data_movimentacao"]),
+                    movimentacao["id_produto"],
+                    categoria,
+                    operacao,
+                    str(movimentacao.get("classificacao") or "sem class.").lower()
+                )
+                quantidade, valor, variacao = agregados.get(chave, (0.0, 0.0, 0.0))
+                agregados[chave] = (
+                    quantidade + quantidade_mov,
+                    valor + quantidade_mov * float(preco or 0),
+                    variacao + variacao_mov
+                )
+
+        self._inserir("movimentacao_diaria", [
+            {
+                "empresa_id": p_empresa_id,
+                "dia": dia,
+                "id_produto": id_produto,
+                "categoria": categoria,
+                "operacao": operacao,
+                "classificacao": classificacao,
+                "quantidade": quantidade,
+                "valor": valor,
+                "variacao_saldo": variacao
+            }
+            for (dia, id_produto, categoria, operacao, classificacao), (quantidade, valor, variacao) in agregados.items()
+        ])
+
+    def _valoradas(self, sql: str, p_empresa_id: int, p_desde: Optional[str]) -> List[dict]:
+        linhas = self.conexao.execute(self.VALORADAS + sql, {"empresa_id": p_empresa_id, "desde": p_desde})
+        return [dict(linha) for linha in linhas]
+
+    def _calcular_cmv_real(self, p_empresa_id: int, p_desde: Optional[str]=None) -> float:
+        return self._valoradas(
+            f"select coalesce(sum(total_movimentado), 0) as total from valoradas where {self.CMV}",
+            p_empresa_id,
+            p_desde
+        )[0]["total"]
+
+    def _dados_grafico_cmv(self, p_empresa_id: int, p_desde: Optional[str]=None) -> List[dict]:
+        return self._valoradas(
+            f"""
+            select c.key as categorias, v.classificacao, coalesce(sum(v.total_movimentado), 0) as total_movimentado
+            from valoradas v, json_each(v.categorias) c
+            where {self.CMV}
+            group by c.key, v.classificacao
+            having coalesce(sum(v.total_movimentado), 0) <> 0
+            order by 3 desc
+            """,
+            p_empresa_id,
+            p_desde
+        )
+
+    def _dados_grafico_entradas(self, p_empresa_id: int, p_desde: Optional[str]=None) -> List[dict]:
+        return self._valoradas(
+            f"""
+            select classificacao, coalesce(sum(total_movimentado), 0) as total_movimentado
+            from valoradas
+            where {self.ENTRADAS}
+            group by classificacao
+            having coalesce(sum(total_movimentado), 0) <> 0
+            order by 2 desc
+            """,
+            p_empresa_id,
+            p_desde
+        )
+
+    def _dados_grafico_estoque(self, p_empresa_id: int) -> List[dict]:
+        linhas = self.conexao.execute(
+            """
+            select c.key as categorias, sum(
+                json_extract(p.dados, '$.quantidade') * json_extract(p.dados, '$.preco_unidade')
+            ) as valor_estoque
+            from linhas p, json_each(coalesce(json_extract(p.dados, '$.categorias'), '{}')) c
+            where p.tabela = 'produtos' and json_extract(p.dados, '$.empresa_id') = ?
+            group by c.key
+            having valor_estoque > 0
+            order by 2 desc
+            limit 5
+            """,
+            (p_empresa_id,)
+        )
+        return [dict(linha) for linha in linhas]
+
+    def _volatilidade_preco(self, p_empresa_id: int, p_desde: Optional[str]=None) -> List[dict]:
+        return self._valoradas(
+            """
+            select
+                id_produto,
+                nome,
+                min(preco_movimentacao) as min,
+                max(preco_movimentacao) as max,
+                max(preco_movimentacao) - min(preco_movimentacao) as variacao
+            from valoradas
+            group by id_produto, nome
+            having max(preco_movimentacao) - min(preco_movimentacao) > 0
+            order by 5 desc
+            limit 5
+            """,
+            p_empresa_id,
+            p_desde
+        )
+
+    def _dia(self, data: str) -> str:
+        return self._momento(data).astimezone(self.FUSO).strftime("%Y-%m-%d")
+
+    def _momento(self, data: str) -> datetime:
+        momento = datetime.fromisoformat(str(data).replace("Z", "+00:00"))
+        if momento.tzinfo is None:
+            momento = momento.replace(tzinfo=timezone.utc)
+        return momento
@@ -0,0 +1,37 @@
+import configparser
+import sys
+from typing import List
+
+from banco_de_dados import SupabaseSingleton
+
+
+class ReconstrucaoAgregados:
+    def __init__(self) -> None:
+        config = configparser.ConfigParser()
+        config.read("./app/credenciais.ini")
+        self.db = SupabaseSingleton(config["supabase"]["Url"], config["supabase"]["Key"])
+
+    def empresas(self) -> List[int]:
+        client = self.db.get_client()
+        resposta = client.table("empresas").select("id").execute().data
+        return [empresa["id"] for empresa in resposta]
+
+    def reconstruir(self, empresa_id: int) -> None:
+        client = self.db.get_client()
+        client.rpc("atualizar_movimentacao_diaria", {"p_empresa_id": empresa_id}).execute()
+
+
+def main(argumentos: List[str]) -> None:
+    reconstrucao = ReconstrucaoAgregados()
+    empresas = [int(argumento) for argumento in argumentos] or reconstrucao.empresas()
+    for empresa_id in empresas:
+        try:
+            reconstrucao.reconstruir(empresa_id)
+        except Exception as e:
+            print(f"Empresa {empresa_id}: {e}")
+        else:
+            print(f"Empresa {empresa_id}: movimentacao_diaria reconstruída")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
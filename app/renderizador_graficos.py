@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import re
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import flet as ft
+import plotly.graph_objects as go
+import plotly.io as pio
+from typing import Optional, Tuple
+
+
+def _aquecer() -> None:
+    go.Figure().to_image(format="svg")
+
+
+def _renderizar(figura: str) -> Tuple[str, Optional[float]]:
+    svg = pio.from_json(figura, skip_invalid=True).to_image(format="svg").decode("utf-8")
+    raiz = ET.fromstring(svg)
+    largura = re.findall(r"\d+", raiz.attrib.get("width", ""))
+    altura = re.findall(r"\d+", raiz.attrib.get("height", ""))
+    proporcao = float(largura[0]) / float(altura[0]) if largura and altura and float(altura[0]) else None
+    return svg, proporcao
+
+
+class RenderizadorGraficos:
+    _instance = None
+
+    PROCESSOS = max(1, min(4, (os.cpu_count() or 2) - 1))
+    LIMITE = 64
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._pool = None
+            cls._instance._svgs = OrderedDict()
+            cls._instance._pendentes = {}
+        return cls._instance
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.PROCESSOS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def aquecer(self) -> None:
+        try:
+            executor = self._executor()
+            for _ in range(self.PROCESSOS):
+                executor.submit(_aquecer)
+        except Exception as e:
+            print(e)
+
+    @staticmethod
+    def chave(figura: str) -> str:
+        return hashlib.sha1(figura.encode("utf-8")).hexdigest()
+
+    async def svg(self, fig: go.Figure) -> Tuple[str, Optional[float]]:
+        figura = fig.to_json()
+        chave = self.chave(figura)
+        if chave in self._svgs:
+            self._svgs.move_to_end(chave)
+            return self._svgs[chave]
+
+        pendente = self._pendentes.get(chave)
+        if pendente is None:
+            pendente = asyncio.ensure_future(self._renderizar(figura))
+            pendente.add_done_callback(lambda _: self._pendentes.pop(chave, None))
+            self._pendentes[chave] = pendente
+        resultado = await asyncio.shield(pendente)
+
+        self._svgs[chave] = resultado
+        while len(self._svgs) > self.LIMITE:
+            self._svgs.popitem(last=False)
+        return resultado
+
+    async def _renderizar(self, figura: str) -> Tuple[str, Optional[float]]:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor(), _renderizar, figura)
+        except BrokenProcessPool as e:
+            print(e)
+            self._pool = None
+            return await asyncio.to_thread(_renderizar, figura)
+
+
+class GraficoSVG(ft.Container):
+    def __init__(self, svg: str, proporcao: Optional[float]=None, **kwargs) -> None:
+        super().__init__(
+            content=ft.Image(src=svg, fit=ft.ImageFit.FILL, aspect_ratio=proporcao),
+            alignment=ft.alignment.center,
+            **kwargs
+        )
+
+
+class AreaGrafico(ft.Container):
+    def __init__(self) -> None:
+        super().__init__(ft.Row([ft.ProgressRing()], alignment=ft.MainAxisAlignment.CENTER))
+        self._pedido = 0
+
+    async def exibir(self, fig: Optional[go.Figure], tooltip: Optional[str]=None) -> None:
+        self._pedido += 1
+        pedido = self._pedido
+
+        grafico = ft.Container()
+        if fig is not None:
+            try:
+                svg, proporcao = await RenderizadorGraficos().svg(fig)
+            except Exception as e:
+                print(e)
+            else:
+                grafico = GraficoSVG(svg, proporcao, expand=True, tooltip=tooltip)
+
+        if pedido != self._pedido:
+            return
+        self.content = ft.Row([grafico])
+        self.update()
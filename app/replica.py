@@ -0,0 +1,257 @@
+import asyncio
+import json
+import sqlite3
+import time
+from datetime import timedelta, timezone
+from dateutil import parser
+from typing import Dict, List, Optional, Tuple
+
+from banco_de_dados import SupabaseAsync
+
+
+class Replica:
+    _instance = None
+
+    CAMINHO = "./app/replica.sqlite3"
+    TAMANHO_LOTE = 1000
+    INTERVALO_SINCRONIZACAO = 60
+    MARGEM_SINCRONIZACAO = 300
+
+    def __new__(cls, caminho: Optional[str]=None):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.conexao = sqlite3.connect(caminho or cls.CAMINHO, check_same_thread=False)
+            cls._instance.conexao.row_factory = sqlite3.Row
+            cls._instance._ultima_sincronizacao = {}
+            cls._instance._travas = {}
+            cls._instance._criar_tabelas()
+        return cls._instance
+
+    def _criar_tabelas(self) -> None:
+        with self.conexao:
+            self.conexao.execute("pragma journal_mode=wal")
+            self.conexao.execute(
+                """
+                create table if not exists registros (
+                    tabela text not null,
+                    empresa_id integer not null,
+                    id integer not null,
+                    ordem text,
+                    produto_id integer,
+                    dados text not null,
+                    primary key (tabela, empresa_id, id)
+                )
+                """
+            )
+            self.conexao.execute(
+                "create index if not exists registros_ordem on registros (tabela, empresa_id, ordem, id)"
+            )
+            self.conexao.execute(
+                "create index if not exists registros_produto on registros (tabela, empresa_id, produto_id, ordem, id)"
+            )
+            self.conexao.execute(
+                """
+                create table if not exists marcas (
+                    tabela text not null,
+                    empresa_id integer not null,
+                    updated_at text not null,
+                    id integer not null,
+                    primary key (tabela, empresa_id)
+                )
+                """
+            )
+
+    def marcar(self, empresa_id: int, *tabelas: str) -> None:
+        for tabela in tabelas:
+            self._ultima_sincronizacao.pop((empresa_id, tabela), None)
+
+    async def sincronizar(self, empresa_id: int, *tabelas: str) -> None:
+        await asyncio.gather(*(self._sincronizar_tabela(empresa_id, tabela) for tabela in tabelas))
+
+    async def _sincronizar_tabela(self, empresa_id: int, tabela: str) -> None:
+        chave = (empresa_id, tabela)
+        trava = self._travas.setdefault(chave, asyncio.Lock())
+        async with trava:
+            ultima = self._ultima_sincronizacao.get(chave)
+            if ultima is not None and time.monotonic() - ultima < self.INTERVALO_SINCRONIZACAO:
+                return
+            inicio = time.monotonic()
+            try:
+                await self._baixar_alteracoes(empresa_id, tabela)
+                await self._baixar_exclusoes(empresa_id, tabela)
+            except Exception as e:
+                print(f"Sem sincronização de {tabela}:", e)
+            else:
+                self._ultima_sincronizacao[chave] = inicio
+
+    async def _baixar_alteracoes(self, empresa_id: int, tabela: str) -> None:
+        cursor = self._inicio(tabela, empresa_id)
+        while True:
+            lote = await self._consultar_lote(tabela, empresa_id, cursor)
+            if lote:
+                with self.conexao:
+                    self._gravar(tabela, empresa_id, lote)
+                    self._salvar_marca(tabela, empresa_id, lote[-1])
+                cursor = lote[-1]["updated_at"], lote[-1]["id"]
+            if len(lote) < self.TAMANHO_LOTE:
+                return
+
+    async def _baixar_exclusoes(self, empresa_id: int, tabela: str) -> None:
+        marca = f"exclusoes:{tabela}"
+        cursor = self._inicio(marca, empresa_id)
+        while True:
+            lote = await self._consultar_lote("exclusoes", empresa_id, cursor, tabela=tabela)
+            if lote:
+                with self.conexao:
+                    self._excluir(tabela, empresa_id, [registro["registro_id"] for registro in lote])
+                    self._salvar_marca(marca, empresa_id, lote[-1])
+                cursor = lote[-1]["updated_at"], lote[-1]["id"]
+            if len(lote) < self.TAMANHO_LOTE:
+                return
+
+    def aplicar(self, tabela: str, empresa_id: int, tipo: str, registro: dict) -> bool:
+        with self.conexao:
+            if tipo == "DELETE":
+                return self._excluir(tabela, empresa_id, [registro["id"]]) > 0
+            if registro.get("empresa_id") != empresa_id:
+                return False
+            self._gravar(tabela, empresa_id, [registro])
+            return True
+
+    def _gravar(self, tabela: str, empresa_id: int, registros: List[dict]) -> None:
+        self.conexao.executemany(
+            "insert or replace into registros values (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    tabela,
+                    empresa_id,
+                    registro["id"],
+                    self._ordem(tabela, registro),
+                    registro.get("id_produto"),
+                    json.dumps(registro)
+                )
+                for registro in registros
+            ]
+        )
+
+    def _excluir(self, tabela: str, empresa_id: int, ids: List[int]) -> int:
+        cursor = self.conexao.executemany(
+            "delete from registros where tabela = ? and empresa_id = ? and id = ?",
+            [(tabela, empresa_id, id) for id in ids]
+        )
+        return cursor.rowcount
+
+    async def _consultar_lote(
+        self,
+        origem: str,
+        empresa_id: int,
+        cursor: Optional[Tuple[str, int]],
+        **filtros
+    ) -> List[dict]:
+        client = await SupabaseAsync().get_client()
+        consulta = client.table(origem).select("*").eq("empresa_id", empresa_id)
+        for coluna, valor in filtros.items():
+            consulta = consulta.eq(coluna, valor)
+        if cursor is not None:
+            updated_at, id = cursor
+            consulta = consulta.or_(
+                f'updated_at.gt."{updated_at}",'
+                f'and(updated_at.eq."{updated_at}",id.gt.{id})'
+            )
+        consulta = consulta.order("updated_at").order("id").limit(self.TAMANHO_LOTE)
+        return (await consulta.execute()).data
+
+    def _inicio(self, tabela: str, empresa_id: int) -> Optional[Tuple[str, int]]:
+        atual = self._marca(tabela, empresa_id)
+        if atual is None:
+            return None
+        inicio = parser.isoparse(atual[0]).astimezone(timezone.utc) - timedelta(seconds=self.MARGEM_SINCRONIZACAO)
+        return inicio.strftime("%Y-%m-%dT%H:%M:%S.%f+00:00"), 0
+
+    def _marca(self, tabela: str, empresa_id: int) -> Optional[Tuple[str, int]]:
+        linha = self.conexao.execute(
+            "select updated_at, id from marcas where tabela = ? and empresa_id = ?",
+            (tabela, empresa_id)
+        ).fetchone()
+        return (linha["updated_at"], linha["id"]) if linha else None
+
+    def _salvar_marca(self, tabela: str, empresa_id: int, registro: dict) -> None:
+        self.conexao.execute(
+            "insert or replace into marcas values (?, ?, ?, ?)",
+            (tabela, empresa_id, registro["updated_at"], registro["id"])
+        )
+
+    def _ordem(self, tabela: str, registro: dict) -> Optional[str]:
+        if tabela == "movimentacao":
+            return self._normalizar_data(registro["data_movimentacao"])
+        return None
+
+    def _normalizar_data(self, data: str) -> str:
+        return parser.isoparse(data).astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+    def ler(
+        self,
+        tabela: str,
+        empresa_id: int,
+        ordem: Optional[str]=None,
+        desc: bool=False,
+        **filtros
+    ) -> List[dict]:
+        sql = "select dados from registros where tabela = ? and empresa_id = ?"
+        parametros = [tabela, empresa_id]
+        for coluna, valor in filtros.items():
+            sql += " and json_extract(dados, ?) = ?"
+            parametros += [f"$.{coluna}", valor]
+        if ordem is not None:
+            sql += f" order by json_extract(dados, ?) {'desc' if desc else 'asc'}, id"
+            parametros.append(f"$.{ordem}")
+        return [json.loads(linha["dados"]) for linha in self.conexao.execute(sql, parametros)]
+
+    def pagina_movimentacoes(
+        self,
+        empresa_id: int,
+        produto_id: Optional[int],
+        tamanho: int,
+        cursor: Optional[Tuple[str, int]]
+    ) -> List[dict]:
+        sql = "select dados from registros where tabela = 'movimentacao' and empresa_id = ?"
+        parametros = [empresa_id]
+        if produto_id is not None:
+            sql += " and produto_id = ?"
+            parametros.append(produto_id)
+        if cursor is not None:
+            data, id = cursor
+            sql += " and (ordem < ? or (ordem = ? and id < ?))"
+            ordem = self._normalizar_data(data)
+            parametros += [ordem, ordem, id]
+        sql += " order by ordem desc, id desc limit ?"
+        parametros.append(tamanho)
+
+        movimentacoes = [json.loads(linha["dados"]) for linha in self.conexao.execute(sql, parametros)]
+        return self.anexar_produtos(empresa_id, movimentacoes)
+
+    def anexar_produtos(self, empresa_id: int, movimentacoes: List[dict]) -> List[dict]:
+        produtos = self._produtos_resumidos(empresa_id, {mov["id_produto"] for mov in movimentacoes})
+        for mov in movimentacoes:
+            mov["produtos"] = produtos.get(mov["id_produto"])
+        return movimentacoes
+
+    def _produtos_resumidos(self, empresa_id: int, ids: set) -> Dict[int, dict]:
+        if not ids:
+            return {}
+        linhas = self.conexao.execute(
+            f"""
+            select id, dados from registros
+            where tabela = 'produtos' and empresa_id = ? and id in ({", ".join("?" * len(ids))})
+            """,
+            [empresa_id, *ids]
+        )
+        resumo = {}
+        for linha in linhas:
+            produto = json.loads(linha["dados"])
+            resumo[linha["id"]] = {
+                "nome": produto.get("nome"),
+                "preco_unidade": produto.get("preco_unidade"),
+                "categorias": produto.get("categorias")
+            }
+        return resumo
@@ -0,0 +1,193 @@
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+
+from banco_de_dados import SupabaseAsync
+from replica import Replica
+
+
+class Repositorio:
+    _instance = None
+
+    TAMANHO_PAGINA = 1000
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.empresa_id = None
+            cls._instance._cache = {}
+            cls._instance.geracoes = {}
+        return cls._instance
+
+    def definir_empresa(self, empresa_id: int) -> None:
+        self.empresa_id = empresa_id
+
+    async def produtos(self) -> List[dict]:
+        return await self._ler("produtos", ordem="nome")
+
+    async def pagina_produtos(self, inicio: int=0, tamanho: int=TAMANHO_PAGINA) -> List[dict]:
+        empresa_id = self.empresa_id
+        return await self._em_cache(
+            (empresa_id, "produtos", "pagina", inicio, tamanho),
+            lambda: self._consultar_produtos(empresa_id, inicio, tamanho)
+        )
+
+    async def produto(self, produto_id: int) -> Optional[dict]:
+        dados = await self._ler("produtos", id=produto_id)
+        return dados[0] if dados else None
+
+    async def movimentacoes(self, produto_id: Optional[int]=None) -> List[dict]:
+        dados = []
+        async for pagina in self.paginar_movimentacoes(produto_id):
+            dados.extend(pagina)
+        return dados
+
+    async def paginar_movimentacoes(
+        self,
+        produto_id: Optional[int]=None,
+        tamanho: int=TAMANHO_PAGINA,
+        cursor: Optional[Tuple[str, int]]=None
+    ) -> AsyncIterator[List[dict]]:
+        while True:
+            pagina = await self.pagina_movimentacoes(produto_id, tamanho, cursor)
+            if not pagina:
+                return
+            yield pagina
+            cursor = self.cursor(pagina)
+
+    async def pagina_movimentacoes(
+        self,
+        produto_id: Optional[int]=None,
+        tamanho: int=TAMANHO_PAGINA,
+        cursor: Optional[Tuple[str, int]]=None
+    ) -> List[dict]:
+        return await self._consultar_pagina(self.empresa_id, produto_id, tamanho, cursor)
+
+    @staticmethod
+    def cursor(pagina: List[dict]) -> Optional[Tuple[str, int]]:
+        if not pagina:
+            return None
+        return pagina[-1]["data_movimentacao"], pagina[-1]["id"]
+
+    async def categorias(self) -> List[dict]:
+        return await self._ler("categoria")
+
+    async def fornecedores(self) -> List[dict]:
+        return await self._ler("fornecedores")
+
+    async def fichas_tecnicas(self) -> List[dict]:
+        return await self._ler("fichas_tecnicas")
+
+    async def listas_compras(self) -> List[dict]:
+        return await self._ler("lista_compras")
+
+    async def movimentacao_diaria(self) -> List[dict]:
+        empresa_id = self.empresa_id
+        return await self._em_cache(
+            (empresa_id, "movimentacao", "diaria"),
+            lambda: self._consultar_diario(empresa_id)
+        )
+
+    async def agregado(self, funcao: str, tabela: str, **parametros) -> Any:
+        empresa_id = self.empresa_id
+        chave = (empresa_id, tabela, "rpc", funcao, tuple(sorted(parametros.items())))
+        return await self._em_cache(
+            chave,
+            lambda: self._consultar_funcao(empresa_id, funcao, parametros)
+        )
+
+    def detalhar_movimentacoes(self, movimentacoes: List[dict]) -> List[dict]:
+        return Replica().anexar_produtos(self.empresa_id, movimentacoes)
+
+    def invalidar(self, *tabelas: str) -> None:
+        Replica().marcar(self.empresa_id, *tabelas)
+        for tabela in tabelas:
+            self.geracoes[tabela] = self.geracoes.get(tabela, 0) + 1
+        self.descartar(*tabelas)
+
+    def descartar(self, *tabelas: str) -> None:
+        for chave in list(self._cache):
+            if chave[0] == self.empresa_id and chave[1] in tabelas:
+                del self._cache[chave]
+
+    async def _ler(
+        self,
+        tabela: str,
+        ordem: Optional[str]=None,
+        desc: bool=False,
+        **filtros
+    ) -> List[dict]:
+        empresa_id = self.empresa_id
+        chave = (empresa_id, tabela, ordem, desc, tuple(sorted(filtros.items())))
+        return await self._em_cache(
+            chave,
+            lambda: self._consultar(empresa_id, tabela, ordem, desc, filtros)
+        )
+
+    async def _em_cache(self, chave: tuple, consulta: Callable[[], Awaitable[List[dict]]]) -> List[dict]:
+        if chave not in self._cache:
+            self._cache[chave] = asyncio.ensure_future(consulta())
+        try:
+            return await asyncio.shield(self._cache[chave])
+        except Exception:
+            self._cache.pop(chave, None)
+            raise
+
+    async def _consultar(
+        self,
+        empresa_id: int,
+        tabela: str,
+        ordem: Optional[str],
+        desc: bool,
+        filtros: dict
+    ) -> List[dict]:
+        replica = Replica()
+        await replica.sincronizar(empresa_id, tabela)
+        return replica.ler(tabela, empresa_id, ordem, desc, **filtros)
+
+    async def _consultar_pagina(
+        self,
+        empresa_id: int,
+        produto_id: Optional[int],
+        tamanho: int,
+        cursor: Optional[Tuple[str, int]]
+    ) -> List[dict]:
+        replica = Replica()
+        await replica.sincronizar(empresa_id, "movimentacao", "produtos")
+        return replica.pagina_movimentacoes(empresa_id, produto_id, tamanho, cursor)
+
+    async def _consultar_produtos(self, empresa_id: int, inicio: int, tamanho: int) -> List[dict]:
+        client = await SupabaseAsync().get_client()
+        return (
+            await client.table("produtos")
+            .select("*")
+            .eq("empresa_id", empresa_id)
+            .order("nome")
+            .order("id")
+            .range(inicio, inicio + tamanho - 1)
+            .execute()
+        ).data
+
+    async def _consultar_funcao(self, empresa_id: int, funcao: str, parametros: dict) -> Any:
+        client = await SupabaseAsync().get_client()
+        return (await client.rpc(funcao, {"p_empresa_id": empresa_id, **parametros}).execute()).data
+
+    async def _consultar_diario(self, empresa_id: int) -> List[dict]:
+        client = await SupabaseAsync().get_client()
+        dados = []
+        while True:
+            inicio = len(dados)
+            pagina = (
+                await client.table("movimentacao_diaria")
+                .select("dia, id_produto, categoria, operacao, classificacao, quantidade, valor, variacao_saldo")
+                .eq("empresa_id", empresa_id)
+                .order("dia")
+                .order("id_produto")
+                .order("categoria")
+                .order("operacao")
+                .order("classificacao")
+                .range(inicio, inicio + self.TAMANHO_PAGINA - 1)
+                .execute()
+            ).data
+            if not pagina:
+                return dados
+            dados.extend(pagina)
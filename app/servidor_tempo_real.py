@@ -0,0 +1,103 @@
+import asyncio
+import json
+import sys
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from websockets.asyncio.server import serve
+
+
+class ServidorTempoReal:
+    def __init__(self, host: str="localhost", porta: int=4000) -> None:
+        self.host = host
+        self.porta = porta
+        self.inscricoes = []
+        self._proximo_id = 0
+
+    async def iniciar(self):
+        return await serve(self._atender, self.host, self.porta)
+
+    async def publicar(self, tabela: str, tipo: str, registro: dict, antigo: Optional[dict]=None) -> None:
+        for conexao, topico, assinaturas in list(self.inscricoes):
+            ids = [
+                assinatura["id"] for assinatura in assinaturas
+                if assinatura["table"] in (tabela, "*")
+                and assinatura["event"] in (tipo, "*")
+                and self._atende_filtro(assinatura.get("filter"), registro)
+            ]
+            if not ids:
+                continue
+            await self._enviar(conexao, topico, "postgres_changes", {
+                "ids": ids,
+                "data": {
+                    "schema": "public",
+                    "table": tabela,
+                    "type": tipo,
+                    "commit_timestamp": datetime.now(timezone.utc).isoformat(),
+                    "record": {} if tipo == "DELETE" else registro,
+                    "old_record": antigo or ({"id": registro["id"]} if tipo != "INSERT" else {})
+                }
+            })
+
+    def _atende_filtro(self, filtro: Optional[str], registro: dict) -> bool:
+        if not filtro:
+            return True
+        coluna, operador, valor = filtro.replace("=", ".", 1).split(".", 2)
+        return operador == "eq" and str(registro.get(coluna)) == valor
+
+    async def _atender(self, conexao) -> None:
+        try:
+            async for texto in conexao:
+                mensagem = json.loads(texto)
+                evento, topico, ref = mensagem["event"], mensagem["topic"], mensagem.get("ref")
+                resposta = {}
+                if evento == "phx_join":
+                    assinaturas = self._registrar(mensagem["payload"]["config"]["postgres_changes"])
+                    self.inscricoes.append((conexao, topico, assinaturas))
+                    resposta = {"postgres_changes": assinaturas}
+                elif evento == "phx_leave":
+                    self._remover(conexao, topico)
+                await self._enviar(conexao, topico, "phx_reply", {"status": "ok", "response": resposta}, ref)
+        finally:
+            self.inscricoes = [inscricao for inscricao in self.inscricoes if inscricao[0] is not conexao]
+
+    def _registrar(self, filtros: List[dict]) -> List[dict]:
+        assinaturas = []
+        for filtro in filtros:
+            self._proximo_id += 1
+            assinaturas.append({**filtro, "id": self._proximo_id})
+        return assinaturas
+
+    def _remover(self, conexao, topico: str) -> None:
+        self.inscricoes = [
+            inscricao for inscricao in self.inscricoes
+            if not (inscricao[0] is conexao and inscricao[1] == topico)
+        ]
+
+    async def _enviar(self, conexao, topico: str, evento: str, payload: dict, ref: Optional[str]=None) -> None:
+        await conexao.send(json.dumps({"topic": topico, "event": evento, "payload": payload, "ref": ref}))
+
+
+async def main(argumentos: List[str]) -> None:
+    servidor = ServidorTempoReal(porta=int(argumentos[0]) if argumentos else 4000)
+    async with await servidor.iniciar():
+        print(f"Tempo real local em ws://{servidor.host}:{servidor.porta}")
+        leitor = asyncio.StreamReader()
+        await asyncio.get_running_loop().connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(leitor), sys.stdin
+        )
+        while linha := await leitor.readline():
+            try:
+                alteracao = json.loads(linha)
+                await servidor.publicar(
+                    alteracao["tabela"],
+                    alteracao["tipo"],
+                    alteracao["registro"],
+                    alteracao.get("antigo")
+                )
+            except Exception as e:
+                print(e)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
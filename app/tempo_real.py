@@ -0,0 +1,100 @@
+from typing import Callable, Dict, Optional, Tuple
+
+from realtime import AsyncRealtimeClient, RealtimeSubscribeStates
+
+from banco_de_dados import SupabaseSingleton
+from replica import Replica
+from repositorio import Repositorio
+from cache_movimentacoes import CacheMovimentacoes
+
+
+class TempoReal:
+    _instance = None
+
+    TABELAS = ("produtos", "movimentacao", "lista_compras")
+
+    def __new__(cls, url: Optional[str]=None, key: Optional[str]=None):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.url = url
+            cls._instance.key = key
+            cls._instance.client = None
+            cls._instance.canal = None
+            cls._instance.empresa_id = None
+            cls._instance.ativo = False
+            cls._instance._ouvintes = {tabela: [] for tabela in cls.TABELAS}
+        return cls._instance
+
+    def ouvir(self, tabela: str, ouvinte: Callable[[str, dict], None]) -> None:
+        if ouvinte not in self._ouvintes[tabela]:
+            self._ouvintes[tabela].append(ouvinte)
+
+    def parar(self, tabela: str, ouvinte: Callable[[str, dict], None]) -> None:
+        if ouvinte in self._ouvintes[tabela]:
+            self._ouvintes[tabela].remove(ouvinte)
+
+    async def conectar(self, empresa_id: int) -> None:
+        await self.desconectar()
+        self.empresa_id = empresa_id
+        try:
+            self.client = AsyncRealtimeClient(*self._endereco())
+            await self.client.connect()
+            self.canal = self.client.channel(f"empresa:{empresa_id}")
+            for tabela in self.TABELAS:
+                for evento in ("INSERT", "UPDATE"):
+                    self.canal.on_postgres_changes(
+                        evento,
+                        self._receber,
+                        table=tabela,
+                        filter=f"empresa_id=eq.{empresa_id}"
+                    )
+                self.canal.on_postgres_changes("DELETE", self._receber, table=tabela)
+            await self.canal.subscribe(self._ao_inscrever)
+        except Exception as e:
+            print("Sem tempo real:", e)
+            self.ativo = False
+
+    def _endereco(self) -> Tuple[str, str]:
+        if self.url is not None:
+            return self.url, self.key
+        db = SupabaseSingleton()
+        return f"{db.url}/realtime/v1", db.key
+
+    async def desconectar(self) -> None:
+        self.ativo = False
+        if self.client is not None:
+            try:
+                await self.client.close()
+            except Exception as e:
+                print(e)
+        self.client = None
+        self.canal = None
+
+    def _ao_inscrever(self, estado: RealtimeSubscribeStates, erro: Optional[Exception]) -> None:
+        self.ativo = estado == RealtimeSubscribeStates.SUBSCRIBED
+        if erro is not None:
+            print("Sem tempo real:", erro)
+
+    def _receber(self, mensagem: Dict) -> None:
+        dados = mensagem.get("data", {})
+        tabela = dados.get("table")
+        tipo = dados.get("type")
+        registro = dados.get("old_record") if tipo == "DELETE" else dados.get("record")
+        if tabela not in self._ouvintes or not registro:
+            return
+
+        try:
+            alterado = Replica().aplicar(tabela, self.empresa_id, tipo, registro)
+        except Exception as e:
+            print(e)
+            return
+        if not alterado:
+            return
+
+        Repositorio().descartar(tabela)
+        CacheMovimentacoes().aplicar(tabela, tipo, registro)
+        for ouvinte in list(self._ouvintes[tabela]):
+            try:
+                ouvinte(tipo, registro)
+            except Exception as e:
+                print(e)
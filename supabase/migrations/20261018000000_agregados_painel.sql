@@ -0,0 +1,148 @@
+create or replace function public.movimentacoes_valoradas(
+    p_empresa_id bigint,
+    p_desde timestamptz default null
+)
+returns table (
+    id bigint,
+    id_produto bigint,
+    nome text,
+    categorias jsonb,
+    operacao text,
+    classificacao text,
+    data_movimentacao timestamptz,
+    preco_movimentacao numeric,
+    total_movimentado numeric
+)
+language sql
+stable
+as $$
+    select
+        m.id::bigint,
+        m.id_produto::bigint,
+        p.nome::text,
+        to_jsonb(p.categorias),
+        lower(m.operacao),
+        coalesce(lower(m.classificacao), 'sem class.'),
+        m.data_movimentacao::timestamptz,
+        coalesce(m.preco_movimentacao, p.preco_unidade)::numeric,
+        (m.quantidade * coalesce(m.preco_movimentacao, p.preco_unidade))::numeric
+    from public.movimentacao m
+    join public.produtos p on p.id = m.id_produto
+    where m.empresa_id = p_empresa_id
+      and (p_desde is null or m.data_movimentacao > p_desde)
+$$;
+
+
+create or replace function public.calcular_cmv_real(
+    p_empresa_id bigint,
+    p_desde timestamptz default null
+)
+returns numeric
+language sql
+stable
+as $$
+    select coalesce(sum(m.total_movimentado), 0)
+    from public.movimentacoes_valoradas(p_empresa_id, p_desde) m
+    where m.operacao = 'saída'
+      and m.classificacao in ('vendas', 'desperdício', 'sem class.')
+$$;
+
+
+create or replace function public.dados_grafico_cmv(
+    p_empresa_id bigint,
+    p_desde timestamptz default null
+)
+returns table (
+    categorias text,
+    classificacao text,
+    total_movimentado numeric
+)
+language sql
+stable
+as $$
+    select
+        c.categoria,
+        m.classificacao,
+        coalesce(sum(m.total_movimentado), 0)
+    from public.movimentacoes_valoradas(p_empresa_id, p_desde) m
+    cross join lateral jsonb_object_keys(coalesce(m.categorias, '{}'::jsonb)) as c(categoria)
+    where m.operacao = 'saída'
+      and m.classificacao in ('vendas', 'desperdício', 'sem class.')
+    group by c.categoria, m.classificacao
+    having coalesce(sum(m.total_movimentado), 0) <> 0
+    order by 3 desc
+$$;
+
+
+create or replace function public.dados_grafico_entradas(
+    p_empresa_id bigint,
+    p_desde timestamptz default null
+)
+returns table (
+    classificacao text,
+    total_movimentado numeric
+)
+language sql
+stable
+as $$
+    select
+        m.classificacao,
+        coalesce(sum(m.total_movimentado), 0)
+    from public.movimentacoes_valoradas(p_empresa_id, p_desde) m
+    where m.operacao = 'entrada'
+      and m.classificacao in ('compras', 'transferência', 'sem class.')
+    group by m.classificacao
+    having coalesce(sum(m.total_movimentado), 0) <> 0
+    order by 2 desc
+$$;
+
+
+create or replace function public.dados_grafico_estoque(
+    p_empresa_id bigint
+)
+returns table (
+    categorias text,
+    valor_estoque numeric
+)
+language sql
+stable
+as $$
+    select
+        c.categoria,
+        sum(p.quantidade * p.preco_unidade)::numeric
+    from public.produtos p
+    cross join lateral jsonb_object_keys(coalesce(to_jsonb(p.categorias), '{}'::jsonb)) as c(categoria)
+    where p.empresa_id = p_empresa_id
+    group by c.categoria
+    having sum(p.quantidade * p.preco_unidade) > 0
+    order by 2 desc
+    limit 5
+$$;
+
+
+create or replace function public.volatilidade_preco(
+    p_empresa_id bigint,
+    p_desde timestamptz default null
+)
+returns table (
+    id_produto bigint,
+    nome text,
+    min numeric,
+    max numeric,
+    variacao numeric
+)
+language sql
+stable
+as $$
+    select
+        m.id_produto,
+        m.nome,
+        min(m.preco_movimentacao),
+        max(m.preco_movimentacao),
+        max(m.preco_movimentacao) - min(m.preco_movimentacao)
+    from public.movimentacoes_valoradas(p_empresa_id, p_desde) m
+    group by m.id_produto, m.nome
+    having max(m.preco_movimentacao) - min(m.preco_movimentacao) > 0
+    order by 5 desc
+    limit 5
+$$;
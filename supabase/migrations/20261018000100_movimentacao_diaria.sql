@@ -0,0 +1,61 @@
+create table if not exists public.movimentacao_diaria (
+    empresa_id bigint not null,
+    dia date not null,
+    id_produto bigint not null references public.produtos(id) on delete cascade,
+    categoria text not null default '',
+    operacao text not null,
+    classificacao text not null,
+    quantidade numeric not null default 0,
+    valor numeric not null default 0,
+    primary key (empresa_id, dia, id_produto, categoria, operacao, classificacao)
+);
+
+create index if not exists movimentacao_diaria_produto_idx
+    on public.movimentacao_diaria (empresa_id, id_produto, dia);
+
+
+create or replace function public.atualizar_movimentacao_diaria(
+    p_empresa_id bigint,
+    p_id_produto bigint default null,
+    p_data timestamptz default null
+)
+returns void
+language plpgsql
+as $$
+declare
+    v_dia date := (p_data at time zone 'America/Sao_Paulo')::date;
+    v_inicio timestamptz := v_dia::timestamp at time zone 'America/Sao_Paulo';
+    v_fim timestamptz := (v_dia + 1)::timestamp at time zone 'America/Sao_Paulo';
+begin
+    delete from public.movimentacao_diaria d
+    where d.empresa_id = p_empresa_id
+      and (p_id_produto is null or d.id_produto = p_id_produto)
+      and (v_dia is null or d.dia = v_dia);
+
+    insert into public.movimentacao_diaria (
+        empresa_id, dia, id_produto, categoria, operacao, classificacao, quantidade, valor
+    )
+    select
+        p_empresa_id,
+        (m.data_movimentacao at time zone 'America/Sao_Paulo')::date,
+        m.id_produto,
+        coalesce(c.categoria, ''),
+        lower(m.operacao),
+        coalesce(lower(m.classificacao), 'sem class.'),
+        coalesce(sum(m.quantidade), 0),
+        coalesce(sum(m.quantidade * coalesce(m.preco_movimentacao, p.preco_unidade)), 0)
+    from public.movimentacao m
+    join public.produtos p on p.id = m.id_produto
+    left join lateral jsonb_object_keys(
+        case when jsonb_typeof(to_jsonb(p.categorias)) = 'object' then to_jsonb(p.categorias) else '{}'::jsonb end
+    ) as c(categoria) on true
+    where m.empresa_id = p_empresa_id
+      and (p_id_produto is null or m.id_produto = p_id_produto)
+      and (v_dia is null or (m.data_movimentacao >= v_inicio and m.data_movimentacao < v_fim))
+    group by 2, 3, 4, 5, 6;
+end;
+$$;
+
+
+select public.atualizar_movimentacao_diaria(e.empresa_id)
+from (select distinct empresa_id from public.movimentacao) e;
@@ -0,0 +1,66 @@
+create or replace function public.definir_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := clock_timestamp();
+    return new;
+end;
+$$;
+
+
+create table if not exists public.exclusoes (
+    id bigint generated always as identity primary key,
+    tabela text not null,
+    registro_id bigint not null,
+    empresa_id bigint not null,
+    updated_at timestamptz not null default clock_timestamp()
+);
+
+create index if not exists exclusoes_sincronizacao_idx
+    on public.exclusoes (empresa_id, tabela, updated_at, id);
+
+
+create or replace function public.registrar_exclusao()
+returns trigger
+language plpgsql
+as $$
+begin
+    insert into public.exclusoes (tabela, registro_id, empresa_id)
+    values (tg_table_name, old.id, old.empresa_id);
+    return old;
+end;
+$$;
+
+
+do $$
+declare
+    v_tabela text;
+begin
+    foreach v_tabela in array array[
+        'produtos', 'movimentacao', 'fichas_tecnicas', 'categoria', 'fornecedores', 'lista_compras'
+    ]
+    loop
+        execute format(
+            'alter table public.%I add column if not exists updated_at timestamptz not null default clock_timestamp()',
+            v_tabela
+        );
+        execute format(
+            'create index if not exists %I on public.%I (empresa_id, updated_at, id)',
+            v_tabela || '_sincronizacao_idx', v_tabela
+        );
+        execute format('drop trigger if exists definir_updated_at on public.%I', v_tabela);
+        execute format(
+            'create trigger definir_updated_at before update on public.%I '
+            'for each row execute function public.definir_updated_at()',
+            v_tabela
+        );
+        execute format('drop trigger if exists registrar_exclusao on public.%I', v_tabela);
+        execute format(
+            'create trigger registrar_exclusao after delete on public.%I '
+            'for each row execute function public.registrar_exclusao()',
+            v_tabela
+        );
+    end loop;
+end;
+$$;
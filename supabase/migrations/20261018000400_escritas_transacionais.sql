@@ -0,0 +1,132 @@
+create or replace function public.aplicar_movimentacao_estoque(
+    p_empresa_id bigint,
+    p_id_produto bigint,
+    p_operacao text,
+    p_quantidade numeric
+)
+returns void
+language sql
+as $$
+    update public.produtos p
+    set quantidade = case lower(p_operacao)
+        when 'inventário' then p_quantidade
+        when 'saída' then coalesce(p.quantidade, 0) - p_quantidade
+        else coalesce(p.quantidade, 0) + p_quantidade
+    end
+    where p.id = p_id_produto
+      and p.empresa_id = p_empresa_id
+$$;
+
+
+create or replace function public.criar_produto(
+    p_empresa_id bigint,
+    p_produto jsonb,
+    p_movimentacao jsonb
+)
+returns setof public.produtos
+language plpgsql
+as $$
+declare
+    v_produto public.produtos;
+    v_movimentacao public.movimentacao;
+begin
+    insert into public.produtos (
+        empresa_id, nome, unidade, quantidade, estoque_minimo, preco_unidade, cmv, categorias, fornecedores
+    )
+    select
+        p_empresa_id, r.nome, r.unidade, r.quantidade, r.estoque_minimo, r.preco_unidade, r.cmv, r.categorias, r.fornecedores
+    from jsonb_populate_record(null::public.produtos, p_produto) r
+    returning * into v_produto;
+
+    insert into public.movimentacao (
+        empresa_id, id_produto, unidade, operacao, classificacao, quantidade,
+        data_movimentacao, preco_movimentacao, informacoes
+    )
+    select
+        p_empresa_id, v_produto.id, r.unidade, r.operacao, r.classificacao, r.quantidade,
+        r.data_movimentacao, r.preco_movimentacao, r.informacoes
+    from jsonb_populate_record(null::public.movimentacao, p_movimentacao) r
+    returning * into v_movimentacao;
+
+    perform public.atualizar_movimentacao_diaria(p_empresa_id, v_produto.id, v_movimentacao.data_movimentacao);
+    return next v_produto;
+end;
+$$;
+
+
+create or replace function public.registrar_movimentacao(
+    p_empresa_id bigint,
+    p_movimentacao jsonb
+)
+returns setof public.movimentacao
+language plpgsql
+as $$
+declare
+    v_movimentacao public.movimentacao;
+begin
+    insert into public.movimentacao (
+        empresa_id, id_produto, unidade, operacao, classificacao, quantidade,
+        data_movimentacao, preco_movimentacao, data_validade, informacoes
+    )
+    select
+        p_empresa_id, r.id_produto, r.unidade, r.operacao, r.classificacao, r.quantidade,
+        r.data_movimentacao, r.preco_movimentacao, r.data_validade, r.informacoes
+    from jsonb_populate_record(null::public.movimentacao, p_movimentacao) r
+    returning * into v_movimentacao;
+
+    perform public.aplicar_movimentacao_estoque(
+        p_empresa_id, v_movimentacao.id_produto, v_movimentacao.operacao, v_movimentacao.quantidade
+    );
+    perform public.atualizar_movimentacao_diaria(
+        p_empresa_id, v_movimentacao.id_produto, v_movimentacao.data_movimentacao
+    );
+    return next v_movimentacao;
+end;
+$$;
+
+
+create or replace function public.editar_movimentacao(
+    p_empresa_id bigint,
+    p_id bigint,
+    p_alteracoes jsonb
+)
+returns setof public.movimentacao
+language plpgsql
+as $$
+declare
+    v_antiga public.movimentacao;
+    v_nova public.movimentacao;
+begin
+    select * into v_antiga
+    from public.movimentacao m
+    where m.id = p_id
+      and m.empresa_id = p_empresa_id
+    for update;
+
+    if not found then
+        raise exception 'Movimentação % não encontrada', p_id;
+    end if;
+
+    v_nova := jsonb_populate_record(v_antiga, p_alteracoes);
+
+    update public.movimentacao m
+    set classificacao = v_nova.classificacao,
+        quantidade = v_nova.quantidade,
+        preco_movimentacao = v_nova.preco_movimentacao
+    where m.id = p_id
+    returning * into v_nova;
+
+    if v_nova.quantidade is distinct from v_antiga.quantidade then
+        update public.produtos p
+        set quantidade = coalesce(p.quantidade, 0) + case lower(v_nova.operacao)
+            when 'saída' then v_antiga.quantidade - v_nova.quantidade
+            else v_nova.quantidade - v_antiga.quantidade
+        end
+        where p.id = v_nova.id_produto
+          and p.empresa_id = p_empresa_id;
+    end if;
+
+    perform public.atualizar_movimentacao_diaria(p_empresa_id, v_nova.id_produto, v_nova.data_movimentacao);
+    return next v_nova;
+end;
+$$;
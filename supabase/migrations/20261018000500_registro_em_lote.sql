@@ -0,0 +1,80 @@
+create or replace function public.registrar_movimentacoes(
+    p_empresa_id bigint,
+    p_movimentacoes jsonb
+)
+returns setof public.movimentacao
+language plpgsql
+as $$
+declare
+    v_ids bigint[];
+begin
+    with lote as (
+        select e.ordem, r.*
+        from jsonb_array_elements(p_movimentacoes) with ordinality as e(item, ordem)
+        cross join lateral jsonb_populate_record(null::public.movimentacao, e.item) r
+    ),
+    inseridas as (
+        insert into public.movimentacao (
+            empresa_id, id_produto, unidade, operacao, classificacao, quantidade,
+            data_movimentacao, preco_movimentacao, data_validade, informacoes
+        )
+        select
+            p_empresa_id, l.id_produto, l.unidade, l.operacao, l.classificacao, l.quantidade,
+            l.data_movimentacao, l.preco_movimentacao, l.data_validade, l.informacoes
+        from lote l
+        order by l.ordem
+        returning id
+    )
+    select array_agg(i.id) into v_ids
+    from inseridas i;
+
+    with lote as (
+        select e.ordem, r.id_produto, lower(r.operacao) as operacao, r.quantidade
+        from jsonb_array_elements(p_movimentacoes) with ordinality as e(item, ordem)
+        cross join lateral jsonb_populate_record(null::public.movimentacao, e.item) r
+    ),
+    inventarios as (
+        select distinct on (l.id_produto) l.id_produto, l.ordem, l.quantidade
+        from lote l
+        where l.operacao = 'inventário'
+        order by l.id_produto, l.ordem desc
+    ),
+    saldos as (
+        select
+            l.id_produto,
+            max(i.quantidade) as inventario,
+            coalesce(
+                sum(
+                    case l.operacao
+                        when 'saída' then -l.quantidade
+                        when 'inventário' then 0
+                        else l.quantidade
+                    end
+                ) filter (where i.ordem is null or l.ordem > i.ordem),
+                0
+            ) as delta
+        from lote l
+        left join inventarios i on i.id_produto = l.id_produto
+        group by l.id_produto
+    )
+    update public.produtos p
+    set quantidade = coalesce(s.inventario, coalesce(p.quantidade, 0)) + s.delta
+    from saldos s
+    where p.id = s.id_produto
+      and p.empresa_id = p_empresa_id;
+
+    perform public.atualizar_movimentacao_diaria(p_empresa_id, d.id_produto, d.data_movimentacao)
+    from (
+        select distinct on (m.id_produto, (m.data_movimentacao at time zone 'America/Sao_Paulo')::date)
+            m.id_produto, m.data_movimentacao
+        from public.movimentacao m
+        where m.id = any(v_ids)
+    ) d;
+
+    return query
+    select m.*
+    from public.movimentacao m
+    where m.id = any(v_ids)
+    order by m.id;
+end;
+$$;
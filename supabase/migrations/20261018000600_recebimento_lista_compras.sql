@@ -0,0 +1,66 @@
+create or replace function public.receber_lista_compras(
+    p_empresa_id bigint,
+    p_lista_id bigint,
+    p_alteracoes jsonb,
+    p_entrada_estoque boolean default true
+)
+returns setof public.lista_compras
+language plpgsql
+as $$
+declare
+    v_lista public.lista_compras;
+    v_movimentacoes jsonb;
+begin
+    select * into v_lista
+    from public.lista_compras l
+    where l.id = p_lista_id
+      and l.empresa_id = p_empresa_id
+    for update;
+
+    if not found then
+        raise exception 'Lista de compras % não encontrada', p_lista_id;
+    end if;
+    if v_lista.finalizada then
+        raise exception 'Lista de compras % já foi recebida', p_lista_id;
+    end if;
+
+    v_lista := jsonb_populate_record(v_lista, p_alteracoes);
+
+    update public.lista_compras l
+    set valor_total = v_lista.valor_total,
+        produtos = v_lista.produtos,
+        recebimento = v_lista.recebimento,
+        finalizada = true
+    where l.id = p_lista_id
+    returning * into v_lista;
+
+    if p_entrada_estoque then
+        select coalesce(
+            jsonb_agg(
+                jsonb_build_object(
+                    'id_produto', p.id,
+                    'unidade', p.unidade,
+                    'operacao', 'entrada',
+                    'classificacao', 'Compras',
+                    'quantidade', (i.value->>'qtd_comprar')::numeric,
+                    'preco_movimentacao', (i.value->>'preco')::numeric,
+                    'data_movimentacao', clock_timestamp(),
+                    'informacoes', 'Lista de compras: ' || v_lista.nome
+                )
+                order by i.key
+            ),
+            '[]'::jsonb
+        )
+        into v_movimentacoes
+        from jsonb_each(to_jsonb(v_lista.produtos)) i
+        join public.produtos p
+          on p.id = (i.value->>'id')::bigint
+         and p.empresa_id = p_empresa_id
+        where (i.value->>'qtd_comprar')::numeric > 0;
+
+        perform public.registrar_movimentacoes(p_empresa_id, v_movimentacoes);
+    end if;
+
+    return next v_lista;
+end;
+$$;
@@ -0,0 +1,71 @@
+alter table public.movimentacao_diaria
+    add column if not exists variacao_saldo numeric not null default 0;
+
+
+create or replace function public.atualizar_movimentacao_diaria(
+    p_empresa_id bigint,
+    p_id_produto bigint default null,
+    p_data timestamptz default null
+)
+returns void
+language plpgsql
+as $$
+declare
+    v_dia date := (p_data at time zone 'America/Sao_Paulo')::date;
+    v_inicio timestamptz := v_dia::timestamp at time zone 'America/Sao_Paulo';
+    v_fim timestamptz := (v_dia + 1)::timestamp at time zone 'America/Sao_Paulo';
+begin
+    delete from public.movimentacao_diaria d
+    where d.empresa_id = p_empresa_id
+      and (p_id_produto is null or d.id_produto = p_id_produto)
+      and (v_dia is null or d.dia = v_dia);
+
+    with movimentos as (
+        select
+            m.*,
+            (m.data_movimentacao at time zone 'America/Sao_Paulo')::date as dia,
+            case when lower(m.operacao) = 'saída' then -coalesce(m.quantidade, 0) else coalesce(m.quantidade, 0) end as sinal
+        from public.movimentacao m
+        where m.empresa_id = p_empresa_id
+          and (p_id_produto is null or m.id_produto = p_id_produto)
+          and (v_dia is null or (m.data_movimentacao >= v_inicio and m.data_movimentacao < v_fim))
+    ),
+    inventarios as (
+        select distinct on (mv.id_produto, mv.dia) mv.id_produto, mv.dia, mv.data_movimentacao, mv.id
+        from movimentos mv
+        where lower(mv.operacao) = 'inventário'
+        order by mv.id_produto, mv.dia, mv.data_movimentacao desc, mv.id desc
+    )
+    insert into public.movimentacao_diaria (
+        empresa_id, dia, id_produto, categoria, operacao, classificacao, quantidade, valor, variacao_saldo
+    )
+    select
+        p_empresa_id,
+        mv.dia,
+        mv.id_produto,
+        coalesce(c.categoria, ''),
+        lower(mv.operacao),
+        coalesce(lower(mv.classificacao), 'sem class.'),
+        coalesce(sum(mv.quantidade), 0),
+        coalesce(sum(mv.quantidade * coalesce(mv.preco_movimentacao, p.preco_unidade)), 0),
+        coalesce(sum(
+            case
+                when i.id is null then mv.sinal
+                when mv.id = i.id then coalesce(mv.quantidade, 0)
+                when (mv.data_movimentacao, mv.id) > (i.data_movimentacao, i.id) then mv.sinal
+                else 0
+            end
+        ), 0)
+    from movimentos mv
+    join public.produtos p on p.id = mv.id_produto
+    left join inventarios i on i.id_produto = mv.id_produto and i.dia = mv.dia
+    left join lateral jsonb_object_keys(
+        case when jsonb_typeof(to_jsonb(p.categorias)) = 'object' then to_jsonb(p.categorias) else '{}'::jsonb end
+    ) as c(categoria) on true
+    group by 2, 3, 4, 5, 6;
+end;
+$$;
+
+
+select public.atualizar_movimentacao_diaria(e.empresa_id)
+from (select distinct empresa_id from public.movimentacao) e;
@@ -0,0 +1,39 @@
+create or replace function public.atualizar_produto(
+    p_empresa_id bigint,
+    p_id bigint,
+    p_produto jsonb
+)
+returns setof public.produtos
+language plpgsql
+as $$
+declare
+    v_produto public.produtos;
+begin
+    select * into v_produto
+    from public.produtos p
+    where p.id = p_id
+      and p.empresa_id = p_empresa_id
+    for update;
+
+    if not found then
+        raise exception 'Produto % não encontrado', p_id;
+    end if;
+
+    v_produto := jsonb_populate_record(v_produto, p_produto);
+
+    update public.produtos p
+    set nome = v_produto.nome,
+        unidade = v_produto.unidade,
+        quantidade = v_produto.quantidade,
+        estoque_minimo = v_produto.estoque_minimo,
+        preco_unidade = v_produto.preco_unidade,
+        cmv = v_produto.cmv,
+        categorias = v_produto.categorias,
+        fornecedores = v_produto.fornecedores
+    where p.id = p_id
+    returning * into v_produto;
+
+    perform public.atualizar_movimentacao_diaria(p_empresa_id, p_id);
+    return next v_produto;
+end;
+$$;
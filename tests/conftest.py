@@ -0,0 +1,76 @@
+import os
+import sys
+
+import pytest
+from supabase import create_client
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from cache_movimentacoes import CacheMovimentacoes
+from dados_sinteticos import GeradorDados
+from postgrest_local import PostgrestLocal
+from replica import Replica
+from repositorio import Repositorio
+
+
+@pytest.fixture
+def gerador() -> GeradorDados:
+    return GeradorDados(40, 600)
+
+
+@pytest.fixture
+def backend(tmp_path, gerador):
+    Replica._instance = None
+    Replica(str(tmp_path / "replica.sqlite3"))
+    Repositorio._instance = None
+    Repositorio().definir_empresa(1)
+    CacheMovimentacoes._instance = None
+
+    local = PostgrestLocal()
+    local.carregar("produtos", gerador.produtos())
+    local.carregar("movimentacao", [
+        {**{chave: valor for chave, valor in movimentacao.items() if chave != "produtos"}, "empresa_id": 1}
+        for movimentacao in gerador.movimentacoes()
+    ])
+    local.instalar()
+    yield local
+    Replica().conexao.close()
+    Replica._instance = None
+    Repositorio._instance = None
+    CacheMovimentacoes._instance = None
+
+
+def _limpar(client, empresa_id: int) -> None:
+    for tabela in ("lista_compras", "movimentacao_diaria", "movimentacao", "produtos"):
+        client.table(tabela).delete().eq("empresa_id", empresa_id).execute()
+
+
+@pytest.fixture
+def postgres(gerador):
+    url = os.environ.get("SUPABASE_TESTE_URL")
+    chave = os.environ.get("SUPABASE_TESTE_CHAVE")
+    if not url or not chave:
+        pytest.skip("SUPABASE_TESTE_URL/SUPABASE_TESTE_CHAVE não definidos (supabase start && supabase db reset)")
+    empresa_id = int(os.environ.get("SUPABASE_TESTE_EMPRESA", "1"))
+    client = create_client(url, chave)
+    _limpar(client, empresa_id)
+
+    criados = client.table("produtos").insert([
+        {**{chave: valor for chave, valor in produto.items() if chave != "id"}, "empresa_id": empresa_id}
+        for produto in gerador.produtos()
+    ]).execute().data
+    nomes = {produto["nome"]: produto["id"] for produto in criados}
+    ids = {produto["id"]: nomes[produto["nome"]] for produto in gerador.produtos()}
+    movimentacoes = [
+        {
+            **{chave: valor for chave, valor in movimentacao.items() if chave not in ("id", "produtos")},
+            "id_produto": ids[movimentacao["id_produto"]],
+            "empresa_id": empresa_id
+        }
+        for movimentacao in gerador.movimentacoes()
+    ]
+    for inicio in range(0, len(movimentacoes), 500):
+        client.table("movimentacao").insert(movimentacoes[inicio:inicio + 500]).execute()
+
+    yield client, empresa_id, ids
+    _limpar(client, empresa_id)
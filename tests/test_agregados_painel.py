@@ -0,0 +1,92 @@
+"""Cobre apenas o substituto em app/postgrest_local.py; o SQL de supabase/migrations roda em
+tests/test_migracoes_postgres.py, que exige SUPABASE_TESTE_URL e SUPABASE_TESTE_CHAVE.
+"""
+
+import asyncio
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import pagina_painel
+from pagina_painel import FonteLocal, FonteRemota, OperadorDados
+
+
+class Congelado(datetime):
+    instante = None
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.instante
+
+
+@pytest.fixture
+def fontes(backend, gerador, monkeypatch):
+    monkeypatch.setattr(Congelado, "instante", gerador.agora.floor("min").tz_localize(None).to_pydatetime())
+    monkeypatch.setattr(pagina_painel, "datetime", Congelado)
+    base = gerador.movimentacoes_df()
+    local = FonteLocal(
+        pd.DataFrame(gerador.produtos()),
+        OperadorDados.transformar_dados_movimentacoes(base),
+        OperadorDados.saldos_produtos(base)
+    )
+    return local, FonteRemota()
+
+
+def _por_chave(df: pd.DataFrame, chaves: list, valor: str) -> dict:
+    return {tuple(linha[chaves]): pytest.approx(linha[valor]) for _, linha in df.iterrows()}
+
+
+@pytest.mark.parametrize("dias", [0, 30, 365])
+def test_cmv_igual_ao_pandas(fontes, dias):
+    local, remota = fontes
+    total_local, dados_local = asyncio.run(local.cmv(dias))
+    total_remoto, dados_remotos = asyncio.run(remota.cmv(dias))
+
+    assert total_remoto == pytest.approx(total_local)
+    assert not dados_remotos.empty
+    assert _por_chave(dados_remotos, ["categorias", "classificacao"], "total_movimentado") == (
+        _por_chave(dados_local, ["categorias", "classificacao"], "total_movimentado")
+    )
+
+
+@pytest.mark.parametrize("dias", [0, 30, 365])
+def test_entradas_igual_ao_pandas(fontes, dias):
+    local, remota = fontes
+    total_local, dados_local = asyncio.run(local.entradas(dias))
+    total_remoto, dados_remotos = asyncio.run(remota.entradas(dias))
+
+    assert total_remoto == pytest.approx(total_local)
+    assert _por_chave(dados_remotos, ["classificacao"], "total_movimentado") == (
+        _por_chave(dados_local, ["classificacao"], "total_movimentado")
+    )
+
+
+def test_estoque_por_categoria_igual_ao_pandas(fontes):
+    local, remota = fontes
+    dados_local = asyncio.run(local.estoque())
+    dados_remotos = asyncio.run(remota.estoque())
+
+    assert len(dados_remotos) == 5
+    assert _por_chave(dados_remotos, ["categorias"], "valor_estoque") == (
+        _por_chave(dados_local, ["categorias"], "valor_estoque")
+    )
+
+
+def test_volatilidade_igual_ao_pandas(fontes):
+    local, remota = fontes
+    dados_local = asyncio.run(local.volatilidade())
+    dados_remotos = asyncio.run(remota.volatilidade())
+
+    assert _por_chave(dados_remotos, ["nome"], "variacao") == _por_chave(dados_local, ["nome"], "variacao")
+
+
+def test_total_conta_cada_movimentacao_uma_vez(fontes, gerador):
+    local, remota = fontes
+    base = OperadorDados.transformar_dados_movimentacoes(gerador.movimentacoes_df())
+    esperado = base.loc[OperadorDados.mascara_cmv(base), "total_movimentado"].sum()
+    multiplas = {produto["id"] for produto in gerador.produtos() if len(produto["categorias"]) > 1}
+
+    assert multiplas & set(base["id_produto"])
+    assert asyncio.run(remota.cmv(0))[0] == pytest.approx(esperado)
+    assert asyncio.run(local.cmv(0))[0] == pytest.approx(esperado)
@@ -0,0 +1,20 @@
+import os
+
+import pytest
+
+from benchmark import Benchmark
+
+
+@pytest.fixture(scope="module")
+def benchmark():
+    benchmark = Benchmark(os.environ.get("BENCHMARK_ESCALA", "1k"), int(os.environ.get("BENCHMARK_REPETICOES", "1")))
+    yield benchmark
+    benchmark.loop.close()
+
+
+@pytest.mark.parametrize("caso", Benchmark.CASOS)
+def test_caso(benchmark, caso):
+    antes = set(benchmark.resultados)
+    getattr(benchmark, caso)()
+
+    assert set(benchmark.resultados) - antes
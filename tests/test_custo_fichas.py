@@ -0,0 +1,109 @@
+import pytest
+
+from custo_fichas import MotorCustoFichas
+
+
+@pytest.fixture
+def motor(monkeypatch):
+    monkeypatch.setattr(MotorCustoFichas, "_instance", None)
+    return MotorCustoFichas()
+
+
+@pytest.fixture
+def dados(gerador):
+    produtos = gerador.produtos()
+    fichas = gerador.fichas()
+    sem_preco = next(produto for produto in produtos if produto["preco_unidade"] is None)
+    fichas[0]["ingredientes"]["produto removido"] = {"id": 9999, "quantidade": "0,500", "unidade": "kg"}
+    fichas[1]["ingredientes"][sem_preco["nome"]] = {"id": sem_preco["id"], "quantidade": "1,250", "unidade": "kg"}
+    return fichas, produtos
+
+
+def _loop_antigo(fichas: list, produtos: list) -> dict:
+    produtos_dict = {produto["id"]: produto for produto in produtos}
+    valores = {}
+    for ficha in fichas:
+        for produto_ficha in ficha["ingredientes"].values():
+            produto_id = produto_ficha["id"]
+            valor = 0.0
+            if produto_id in produtos_dict:
+                preco = produtos_dict[produto_id]["preco_unidade"] or 0.0
+                valor = round(preco * float(produto_ficha["quantidade"].replace(",", ".")), 2)
+            valores[(ficha["id"], produto_id)] = valor
+    return valores
+
+
+def _custos(fichas: list, valores: dict) -> dict:
+    return {
+        ficha["id"]: pytest.approx(
+            sum(valores[(ficha["id"], ingrediente["id"])] for ingrediente in ficha["ingredientes"].values())
+        )
+        for ficha in fichas
+    }
+
+
+def _usa(ficha: dict, produto_id: int) -> bool:
+    return any(ingrediente["id"] == produto_id for ingrediente in ficha["ingredientes"].values())
+
+
+def test_carregar_igual_ao_loop_antigo(motor, dados):
+    fichas, produtos = dados
+    motor.carregar(fichas, produtos)
+    valores = _loop_antigo(fichas, produtos)
+
+    assert any(
+        produto["preco_unidade"] is None and _usa(fichas[1], produto["id"]) for produto in produtos
+    )
+    assert {chave: motor.valor(*chave) for chave in valores} == pytest.approx(valores)
+    assert {ficha["id"]: motor.custo(ficha["id"]) for ficha in fichas} == _custos(fichas, valores)
+    assert motor.valor(fichas[0]["id"], 9999) == 0.0
+    assert motor.custo(-1) == 0.0
+
+
+def test_atualizar_preco_muda_so_as_fichas_afetadas(motor, dados):
+    fichas, produtos = dados
+    motor.carregar(fichas, produtos)
+    produto = next(produto for produto in produtos if any(_usa(ficha, produto["id"]) for ficha in fichas))
+    antes = {ficha["id"]: motor.custo(ficha["id"]) for ficha in fichas}
+
+    afetadas = motor.atualizar_preco(produto["id"], 123.45)
+
+    produto["preco_unidade"] = 123.45
+    depois = _custos(fichas, _loop_antigo(fichas, produtos))
+    assert sorted(afetadas) == sorted(ficha["id"] for ficha in fichas if _usa(ficha, produto["id"]))
+    assert {ficha["id"]: motor.custo(ficha["id"]) for ficha in fichas} == depois
+    assert all(motor.custo(id) == antes[id] for id in antes if id not in afetadas)
+
+
+def test_atualizar_preco_de_produto_sem_preco_e_para_sem_preco(motor, dados):
+    fichas, produtos = dados
+    motor.carregar(fichas, produtos)
+    sem_preco = next(
+        produto for produto in produtos
+        if produto["preco_unidade"] is None and any(_usa(ficha, produto["id"]) for ficha in fichas)
+    )
+    com_preco = next(
+        produto for produto in produtos
+        if produto["preco_unidade"] is not None and any(_usa(ficha, produto["id"]) for ficha in fichas)
+    )
+
+    motor.atualizar_preco(sem_preco["id"], 8.0)
+    motor.atualizar_preco(com_preco["id"], None)
+
+    sem_preco["preco_unidade"] = 8.0
+    com_preco["preco_unidade"] = None
+    valores = _loop_antigo(fichas, produtos)
+    assert {ficha["id"]: motor.custo(ficha["id"]) for ficha in fichas} == _custos(fichas, valores)
+    assert {chave: motor.valor(*chave) for chave in valores} == pytest.approx(valores)
+
+
+def test_atualizar_preco_de_produto_ausente_nao_muda_nada(motor, dados):
+    fichas, produtos = dados
+    motor.carregar(fichas, produtos)
+    antes = {ficha["id"]: motor.custo(ficha["id"]) for ficha in fichas}
+    sem_fichas = next(produto for produto in produtos if not any(_usa(ficha, produto["id"]) for ficha in fichas))
+
+    assert motor.atualizar_preco(9999, 50.0) == []
+    assert motor.atualizar_preco(sem_fichas["id"], 50.0) == []
+    assert {ficha["id"]: motor.custo(ficha["id"]) for ficha in fichas} == antes
+    assert motor.valor(fichas[0]["id"], 9999) == 0.0
@@ -0,0 +1,186 @@
+"""Cobre apenas o substituto em app/postgrest_local.py; o SQL de supabase/migrations roda em
+tests/test_migracoes_postgres.py, que exige SUPABASE_TESTE_URL e SUPABASE_TESTE_CHAVE.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from postgrest import APIError
+
+from banco_de_dados import SupabaseSingleton
+from controles import ControleCompras, ControleMovimentacao, ControleProduto, InfosGlobal
+from modelos import ItemLista
+from postgrest_local import ErroPostgrest
+
+
+@pytest.fixture
+def visualizacao(backend, gerador, monkeypatch):
+    backend.carregar("lista_compras", gerador.listas_compras())
+    monkeypatch.setattr(InfosGlobal, "_instance", None)
+    InfosGlobal().atualizar(1, "teste", 1, "teste")
+    return SimpleNamespace(
+        atualizar_conteudo=lambda *args, **kwargs: None,
+        atualizar_dados=lambda: None,
+        pagina_inicial_e_atualizar=lambda: None
+    )
+
+
+def _produto(backend, id: int) -> dict:
+    return next(produto for produto in backend.ler("produtos") if produto["id"] == id)
+
+
+def _movimentacoes(backend) -> list:
+    return backend.ler("movimentacao")
+
+
+def test_registrar_movimentacao_custa_uma_requisicao(backend, visualizacao):
+    antes = _produto(backend, 1)["quantidade"]
+    with backend.medir() as medicao:
+        ControleMovimentacao(visualizacao).registrar(1, "entrada", "Compras", "kg", "2,5", "18/10/2026", "10,00", None)
+
+    assert medicao.por_recurso() == {"rpc/registrar_movimentacao": 1}
+    assert medicao.bytes_enviados <= 512
+    assert medicao.bytes_recebidos <= 512
+    assert _produto(backend, 1)["quantidade"] == pytest.approx(antes + 2.5)
+
+
+def test_criar_produto_custa_uma_requisicao(backend, visualizacao):
+    with backend.medir() as medicao:
+        ControleProduto(visualizacao=visualizacao).criar_produto(
+            "farinha", "kg", "10", "2", "4,50", {"secos": "#fff"}, None, True
+        )
+
+    assert medicao.por_recurso() == {"rpc/criar_produto": 1}
+    assert medicao.bytes_enviados <= 512
+    assert medicao.bytes_recebidos <= 512
+    produto = next(produto for produto in backend.ler("produtos") if produto["nome"] == "farinha")
+    assert [mov["id_produto"] for mov in _movimentacoes(backend)].count(produto["id"]) == 1
+
+
+def test_editar_movimentacao_custa_uma_requisicao(backend, visualizacao):
+    movimentacao = next(mov for mov in _movimentacoes(backend) if mov["operacao"].lower() == "saída")
+    antes = _produto(backend, movimentacao["id_produto"])["quantidade"]
+    with backend.medir() as medicao:
+        ControleMovimentacao(visualizacao).atualizar(
+            movimentacao["id"], "vendas", str(movimentacao["quantidade"] + 3), "7,00"
+        )
+
+    assert medicao.por_recurso() == {"rpc/editar_movimentacao": 1}
+    assert medicao.bytes_enviados <= 512
+    assert medicao.bytes_recebidos <= 512
+    editada = next(mov for mov in _movimentacoes(backend) if mov["id"] == movimentacao["id"])
+    assert (editada["classificacao"], editada["preco_movimentacao"]) == ("vendas", 7.0)
+    assert _produto(backend, movimentacao["id_produto"])["quantidade"] == pytest.approx(antes - 3)
+
+
+def test_receber_lista_compras_custa_uma_requisicao(backend, gerador, visualizacao):
+    lista = next(lista for lista in gerador.listas_compras() if not lista["finalizada"])
+    itens = ItemLista.from_lista(lista["produtos"])
+    quantidades = {item.id: _produto(backend, item.id)["quantidade"] for item in itens}
+    total = len(_movimentacoes(backend))
+    with backend.medir() as medicao:
+        ControleCompras(visualizacao).atualizar_status(lista["id"], itens, 0)
+
+    assert medicao.por_recurso() == {"rpc/receber_lista_compras": 1}
+    assert medicao.bytes_enviados <= 256 * len(itens) + 1024
+    assert medicao.bytes_recebidos <= 256 * len(itens) + 1024
+    assert len(_movimentacoes(backend)) == total + len(itens)
+    for item in itens:
+        assert _produto(backend, item.id)["quantidade"] == pytest.approx(quantidades[item.id] + item.qtd_comprar_num)
+
+    recebida = next(registro for registro in backend.ler("lista_compras") if registro["id"] == lista["id"])
+    assert recebida["finalizada"]
+    with pytest.raises(APIError):
+        SupabaseSingleton().get_client().rpc(
+            "receber_lista_compras",
+            {"p_empresa_id": 1, "p_lista_id": lista["id"], "p_alteracoes": {}}
+        ).execute()
+
+
+def test_atualizar_produto_refaz_agregado_na_mesma_requisicao(backend, visualizacao):
+    produto = _produto(backend, 1)
+    with backend.medir() as medicao:
+        ControleProduto(visualizacao=visualizacao).atualizar_produto(
+            1, produto["nome"], produto["unidade"], "7", "1", "3,00", {"nova": "#000"}, None, True
+        )
+
+    assert medicao.por_recurso() == {"rpc/atualizar_produto": 1}
+    assert medicao.bytes_enviados <= 512
+    assert _produto(backend, 1)["categorias"] == {"nova": "#000"}
+    diario = [linha for linha in backend.ler("movimentacao_diaria") if linha["id_produto"] == 1]
+    assert diario and {linha["categoria"] for linha in diario} == {"nova"}
+
+
+def test_falha_ao_atualizar_produto_nao_escapa(backend, visualizacao, monkeypatch):
+    produto = _produto(backend, 1)
+    chamadas = []
+    visualizacao.atualizar_conteudo = lambda **kwargs: chamadas.append(kwargs)
+
+    def falhar(*args):
+        raise ErroPostgrest(500, "XX000", "falha no agregado")
+
+    monkeypatch.setattr(backend, "_atualizar_movimentacao_diaria", falhar)
+
+    ControleProduto(visualizacao=visualizacao).atualizar_produto(
+        1, "outro nome", produto["unidade"], "7", "1", "3,00", {"nova": "#000"}, None, True
+    )
+
+    assert _produto(backend, 1) == produto
+    assert chamadas == []
+
+
+def _lote(*itens) -> list:
+    return [
+        {
+            "id_produto": id_produto,
+            "acao": acao,
+            "classificacao": "Compras" if acao == "entrada" else "Vendas",
+            "unidade": "kg",
+            "qtd": qtd,
+            "data_movimentacao": "18/10/2026",
+            "preco": "4,50"
+        }
+        for id_produto, acao, qtd in itens
+    ]
+
+
+def test_registrar_lote_custa_uma_requisicao(backend, visualizacao):
+    lote = _lote(
+        (1, "entrada", "2"), (2, "saída", "1,5"), (1, "saída", "0,5"), (3, "entrada", "4"), (2, "entrada", "1")
+    )
+    antes = {id: _produto(backend, id)["quantidade"] for id in (1, 2, 3)}
+    total = len(_movimentacoes(backend))
+    with backend.medir() as medicao:
+        ControleMovimentacao(visualizacao).registrar_lote(lote)
+
+    assert medicao.por_recurso() == {"rpc/registrar_movimentacoes": 1}
+    assert medicao.bytes_enviados <= 256 * len(lote) + 512
+    assert len(_movimentacoes(backend)) == total + len(lote)
+    assert _produto(backend, 1)["quantidade"] == pytest.approx(antes[1] + 1.5)
+    assert _produto(backend, 2)["quantidade"] == pytest.approx(antes[2] - 0.5)
+    assert _produto(backend, 3)["quantidade"] == pytest.approx(antes[3] + 4)
+
+
+def test_registrar_lote_com_inventario_no_meio(backend, visualizacao):
+    lote = _lote(
+        (1, "entrada", "5"),
+        (2, "saída", "1"),
+        (1, "inventário", "20"),
+        (1, "saída", "2"),
+        (2, "inventário", "7"),
+        (1, "entrada", "1"),
+        (2, "inventário", "3"),
+        (2, "entrada", "0,5")
+    )
+    antes = _produto(backend, 3)["quantidade"]
+    with backend.medir() as medicao:
+        ControleMovimentacao(visualizacao).registrar_lote(lote)
+
+    assert medicao.requisicoes == 1
+    assert _produto(backend, 1)["quantidade"] == pytest.approx(19)
+    assert _produto(backend, 2)["quantidade"] == pytest.approx(3.5)
+    assert _produto(backend, 3)["quantidade"] == pytest.approx(antes)
+    registradas = [mov for mov in _movimentacoes(backend) if mov["data_movimentacao"].startswith("2026-10-18")]
+    assert [(mov["id_produto"], mov["operacao"], mov["quantidade"]) for mov in registradas[-len(lote):]] == [
+        (mov["id_produto"], mov["acao"], float(mov["qtd"].replace(",", "."))) for mov in lote
+    ]
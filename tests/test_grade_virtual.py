@@ -0,0 +1,80 @@
+import math
+from types import SimpleNamespace
+
+import flet as ft
+import pytest
+
+from componentes import GradeVirtual
+
+
+class Bloco(ft.Container):
+    criados = 0
+
+    def __init__(self) -> None:
+        super().__init__()
+        Bloco.criados += 1
+        self.valor = None
+
+    def exibir(self, valor) -> None:
+        self.valor = valor
+
+
+@pytest.fixture
+def grade(monkeypatch):
+    Bloco.criados = 0
+    grade = GradeVirtual(Bloco, lambda id: id)
+    grade.posicao = 0.0
+    monkeypatch.setattr(GradeVirtual, "update", lambda self: None)
+    monkeypatch.setattr(GradeVirtual, "scroll_to", lambda self, offset=None, **kwargs: setattr(self, "posicao", offset))
+    return grade
+
+
+ALTURA_LINHA = 200
+
+
+def _rolar(grade: GradeVirtual, posicao: float) -> None:
+    conteudo = math.ceil(len(grade.controls) / grade.runs_count) * ALTURA_LINHA - grade.run_spacing
+    maximo = max(0.0, conteudo - grade.height)
+    grade.posicao = min(max(posicao, 0.0), maximo)
+    grade._rolar(SimpleNamespace(pixels=grade.posicao, max_scroll_extent=maximo, viewport_dimension=grade.height))
+
+
+def _visiveis(grade: GradeVirtual) -> list:
+    primeira = int(grade.posicao // ALTURA_LINHA) * grade.runs_count
+    return [bloco.valor for bloco in grade.controls[primeira:primeira + grade.runs_count]]
+
+
+def test_rolagem_mantem_janela_limitada(grade):
+    ids = list(range(5000))
+    grade.exibir(ids)
+    for _ in range(10000):
+        _rolar(grade, grade.posicao + ALTURA_LINHA)
+
+    assert len(grade.controls) <= GradeVirtual.JANELA
+    assert Bloco.criados <= GradeVirtual.JANELA
+    assert grade.controls[-1].valor == ids[-1]
+    assert [bloco.valor for bloco in grade.controls] == ids[grade.inicio:grade.inicio + len(grade.controls)]
+
+
+def test_deslocamento_preserva_posicao_visivel(grade):
+    grade.exibir(list(range(5000)))
+    for _ in range(400):
+        antes = _visiveis(grade)
+        inicio = grade.inicio
+        _rolar(grade, grade.posicao + ALTURA_LINHA / 4)
+        if grade.inicio != inicio:
+            assert _visiveis(grade) == antes
+
+    assert grade.inicio >= 3 * GradeVirtual.TAMANHO_PAGINA
+    while grade.inicio > 0 or grade.posicao > 0:
+        _rolar(grade, grade.posicao - ALTURA_LINHA)
+    assert _visiveis(grade) == [0, 1, 2]
+
+
+def test_filtro_sem_reiniciar_ajusta_janela(grade):
+    grade.exibir(list(range(5000)))
+    for _ in range(200):
+        _rolar(grade, grade.posicao + ALTURA_LINHA)
+    grade.exibir(list(range(40)), reiniciar=False)
+
+    assert [bloco.valor for bloco in grade.controls] == list(range(grade.inicio, 40))
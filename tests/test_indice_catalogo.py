@@ -0,0 +1,78 @@
+import pytest
+
+from indice_catalogo import IndiceCatalogo, normalizar
+
+
+PRODUTOS = [
+    {"id": 1, "nome": "Açúcar cristal", "categorias": {"Secos": "#fff"}, "fornecedores": {"nomes": ["Ceasa"]},
+     "preco_unidade": 4.5, "quantidade": 10},
+    {"id": 2, "nome": "Maçã gala", "categorias": {"Frutas": "#f00"}, "fornecedores": {"nomes": ["Hortifruti"]},
+     "preco_unidade": 9.0, "quantidade": 2},
+    {"id": 3, "nome": "tomate", "categorias": {"Legumes": "#0f0"}, "fornecedores": {"nomes": ["Ceasa"]},
+     "preco_unidade": None, "quantidade": 5},
+    {"id": 5, "nome": "Carne moída", "categorias": {"Carnes": "#a00"}, "fornecedores": None,
+     "preco_unidade": 32.0, "quantidade": None}
+]
+
+
+@pytest.fixture
+def indice() -> IndiceCatalogo:
+    return IndiceCatalogo(PRODUTOS)
+
+
+def _consistente(indice: IndiceCatalogo) -> None:
+    assert indice.palavras == sorted(indice.palavras)
+    assert len(indice.palavras) == len(set(indice.palavras))
+    assert {id for _, id in indice.palavras} == set(indice.registros)
+
+
+def test_construcao(indice):
+    _consistente(indice)
+    assert len(indice) == 4 and 3 in indice
+    assert indice.opcoes_categorias() == ["Carnes", "Frutas", "Legumes", "Secos"]
+    assert indice.opcoes_fornecedores() == ["Ceasa", "Hortifruti"]
+
+
+def test_adicionar_remover_e_readicionar(indice):
+    indice.adicionar({"id": 4, "nome": "abacate"})
+    _consistente(indice)
+    assert indice.buscar("to") == [3]
+    assert indice.buscar("aba") == [4]
+
+    indice.remover(4)
+    _consistente(indice)
+    assert indice.buscar("aba") == []
+
+    indice.adicionar({"id": 3, "nome": "batata", "categorias": {"Legumes": "#0f0"}})
+    indice.adicionar({"id": 4, "nome": "abacate"})
+    _consistente(indice)
+    assert indice.buscar("tom") == []
+    assert indice.buscar("bat") == [3]
+    assert indice.buscar("", categorias=["Legumes"]) == [3]
+    assert indice.buscar("", fornecedores=["Ceasa"]) == [1]
+
+
+def test_prefixo_ignora_acentos(indice):
+    assert normalizar("  Maçã  GALA ") == "maca gala"
+    assert indice.buscar("acu") == [1]
+    assert indice.buscar("MAÇ") == [2]
+    assert indice.buscar("car moi") == [5]
+    assert indice.buscar("ceasa") == [1, 3]
+
+
+def test_trigramas(indice):
+    assert indice.buscar("istal") == [1]
+    assert indice.buscar("omat") == [3]
+    assert indice.buscar("tomaet") == [3]
+    assert indice.buscar("xyzw") == []
+
+
+def test_chaves_de_ordenacao(indice):
+    assert indice.ordenar("nome") == [1, 5, 2, 3]
+    assert indice.ordenar("nome", True) == [3, 2, 5, 1]
+    assert indice.ordenar("preco") == [1, 2, 5, 3]
+    assert indice.ordenar("preco", True) == [5, 2, 1, 3]
+    assert indice.ordenar("valor_estoque", True) == [1, 2, 5, 3]
+    assert indice.buscar("", ordem=("preco", True), limite=2) == [5, 2]
+    assert indice.buscar("c") == [5, 1, 3]
+    assert indice.buscar("c", ordem=("nome", False)) == [1, 5, 3]
@@ -0,0 +1,123 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+import pagina_painel
+from pagina_painel import FonteLocal, IndiceTemporal, OperadorDados
+
+
+class Congelado(datetime):
+    instante = None
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.instante
+
+
+@pytest.fixture
+def agora(gerador, monkeypatch):
+    instante = gerador.agora.floor("min").tz_localize(None).to_pydatetime()
+    monkeypatch.setattr(Congelado, "instante", instante)
+    monkeypatch.setattr(pagina_painel, "datetime", Congelado)
+    return instante
+
+
+@pytest.fixture
+def movimentacoes(gerador):
+    return OperadorDados.transformar_dados_movimentacoes(gerador.movimentacoes_df())
+
+
+@pytest.fixture
+def fonte(gerador, movimentacoes):
+    base = gerador.movimentacoes_df()
+    return FonteLocal(pd.DataFrame(gerador.produtos()), movimentacoes, OperadorDados.saldos_produtos(base))
+
+
+def _filtrar(df: pd.DataFrame, inicio=None, fim=None) -> pd.DataFrame:
+    datas = df["data_movimentacao"]
+    mascara = pd.Series(True, index=df.index)
+    if inicio is not None:
+        mascara &= datas >= _utc(inicio)
+    if fim is not None:
+        mascara &= datas <= _utc(fim)
+    return df[mascara]
+
+
+def _utc(momento) -> pd.Timestamp:
+    momento = pd.Timestamp(momento)
+    return momento.tz_localize("UTC") if momento.tzinfo is None else momento.tz_convert("UTC")
+
+
+def _ids(fonte: FonteLocal, janela: slice) -> list:
+    return sorted(fonte.movimentacoes.iloc[fonte.indice.linhas(janela)]["id"].tolist())
+
+
+@pytest.mark.parametrize("dias", [7, 30, 90, 0])
+def test_periodos_iguais_ao_filtro_pandas(agora, fonte, movimentacoes, dias):
+    esperado = _filtrar(movimentacoes, agora - timedelta(days=dias) if dias else None)
+    janela = fonte._janela(dias)
+
+    assert not esperado.empty
+    assert _ids(fonte, janela) == sorted(esperado["id"].tolist())
+    total_cmv, _ = asyncio.run(fonte.cmv(dias))
+    total_entradas, _ = asyncio.run(fonte.entradas(dias))
+    assert total_cmv == pytest.approx(esperado["total_movimentado"].where(OperadorDados.mascara_cmv(esperado), 0).sum())
+    assert total_entradas == pytest.approx(
+        esperado["total_movimentado"].where(OperadorDados.mascara_entradas(esperado), 0).sum()
+    )
+    por_classificacao = fonte.indice.somar_grupos("entradas", "classificacao", janela)
+    esperado_grupos = (
+        esperado["total_movimentado"].where(OperadorDados.mascara_entradas(esperado), 0)
+        .groupby(esperado["classificacao"], observed=True).sum()
+    )
+    assert por_classificacao[por_classificacao != 0].to_dict() == pytest.approx(
+        esperado_grupos[esperado_grupos != 0].to_dict()
+    )
+
+
+def test_limites_com_e_sem_fuso_sao_o_mesmo_instante(movimentacoes):
+    datas = movimentacoes["data_movimentacao"]
+    valores = {"total": movimentacoes["total_movimentado"]}
+    consciente = IndiceTemporal(datas, valores)
+    ingenuo = IndiceTemporal(datas.dt.tz_localize(None), valores)
+    local = IndiceTemporal(datas.dt.tz_convert("America/Sao_Paulo"), valores)
+    inicio = datas.iloc[len(datas) // 3]
+    fim = datas.iloc[2 * len(datas) // 3]
+    esperado = _filtrar(movimentacoes, inicio, fim)["total_movimentado"].sum()
+
+    for indice in (consciente, ingenuo, local):
+        for limites in (
+            (inicio, fim),
+            (inicio.tz_localize(None), fim.tz_localize(None)),
+            (inicio.tz_convert("America/Sao_Paulo"), fim.tz_convert("America/Sao_Paulo"))
+        ):
+            janela = indice.janela(*limites)
+            assert indice.soma("total", janela) == pytest.approx(esperado)
+            assert indice.tempos[janela.start] == IndiceTemporal._instante(inicio)
+            assert indice.tempos[janela.stop - 1] == IndiceTemporal._instante(fim)
+
+
+def test_intervalo_personalizado_igual_ao_filtro_pandas(agora, fonte, movimentacoes):
+    inicio = pd.Timestamp(agora - timedelta(days=60))
+    fim = pd.Timestamp(agora - timedelta(days=20))
+
+    for periodo in ((inicio, fim), (inicio, None), (None, fim), (str(inicio), str(fim))):
+        esperado = _filtrar(movimentacoes, *periodo)
+        assert _ids(fonte, fonte._janela(periodo)) == sorted(esperado["id"].tolist())
+
+
+def test_janelas_vazias(agora, fonte, movimentacoes):
+    futuro = pd.Timestamp(agora + timedelta(days=1))
+    ultima = movimentacoes["data_movimentacao"].max()
+
+    assert fonte._janela((futuro, None)) is None
+    assert fonte._janela((futuro, futuro - timedelta(days=2))) is None
+    assert fonte._janela((ultima + timedelta(seconds=1), futuro)) is None
+    assert asyncio.run(fonte.cmv((futuro, None)))[0] == 0
+    assert asyncio.run(fonte.entradas((futuro, None)))[1].empty
+
+    vazia = FonteLocal(fonte.produtos, movimentacoes.iloc[:0], pd.DataFrame())
+    assert vazia._janela(30) is None
+    assert vazia._janela(0) is None
@@ -0,0 +1,146 @@
+import pandas as pd
+import pytest
+
+from banco_de_dados import SupabaseSingleton
+
+
+AGREGADOS = ["calcular_cmv_real", "dados_grafico_cmv", "dados_grafico_entradas", "volatilidade_preco"]
+COLUNAS_DIARIO = ["dia", "id_produto", "categoria", "operacao", "classificacao", "quantidade", "valor", "variacao_saldo"]
+
+
+def _normalizar(valor):
+    if isinstance(valor, float):
+        return round(valor, 4)
+    if isinstance(valor, dict):
+        return tuple(sorted((chave, _normalizar(item)) for chave, item in valor.items()))
+    if isinstance(valor, list):
+        return tuple(sorted(_normalizar(item) for item in valor))
+    return valor
+
+
+def _rpc(client, empresa_id: int, funcao: str, **parametros):
+    return client.rpc(funcao, {"p_empresa_id": empresa_id, **parametros}).execute().data
+
+
+def _sem_ids(dados):
+    if isinstance(dados, list):
+        return [{chave: valor for chave, valor in linha.items() if chave != "id_produto"} for linha in dados]
+    return dados
+
+
+def _desde(gerador, dias: int):
+    return None if dias == 0 else (gerador.agora - pd.Timedelta(days=dias)).isoformat()
+
+
+@pytest.mark.parametrize("dias", [0, 30, 365])
+@pytest.mark.parametrize("funcao", AGREGADOS)
+def test_agregados_do_painel_iguais_ao_substituto(backend, postgres, gerador, funcao, dias):
+    client, empresa_id, _ = postgres
+    local = _sem_ids(_rpc(SupabaseSingleton().get_client(), 1, funcao, p_desde=_desde(gerador, dias)))
+    remoto = _sem_ids(_rpc(client, empresa_id, funcao, p_desde=_desde(gerador, dias)))
+
+    assert remoto
+    assert _normalizar(remoto) == _normalizar(local)
+
+
+def test_estoque_por_categoria_igual_ao_substituto(backend, postgres):
+    client, empresa_id, _ = postgres
+    local = _rpc(SupabaseSingleton().get_client(), 1, "dados_grafico_estoque")
+    remoto = _rpc(client, empresa_id, "dados_grafico_estoque")
+
+    assert _normalizar(remoto) == _normalizar(local)
+
+
+def test_rollup_diario_igual_ao_substituto(backend, postgres):
+    client, empresa_id, ids = postgres
+    originais = {id: original for original, id in ids.items()}
+    _rpc(SupabaseSingleton().get_client(), 1, "atualizar_movimentacao_diaria")
+    _rpc(client, empresa_id, "atualizar_movimentacao_diaria")
+
+    local = [{coluna: linha[coluna] for coluna in COLUNAS_DIARIO} for linha in backend.ler("movimentacao_diaria")]
+    remoto = [
+        {**{coluna: linha[coluna] for coluna in COLUNAS_DIARIO}, "id_produto": originais[linha["id_produto"]]}
+        for linha in client.table("movimentacao_diaria").select(",".join(COLUNAS_DIARIO))
+        .eq("empresa_id", empresa_id).execute().data
+    ]
+
+    assert remoto
+    assert _normalizar(remoto) == _normalizar(local)
+
+
+def _movimentacao(id_produto: int, operacao: str, quantidade: float, data: str) -> dict:
+    return {
+        "id_produto": id_produto,
+        "unidade": "kg",
+        "operacao": operacao,
+        "classificacao": "Compras" if operacao == "entrada" else "Uso",
+        "quantidade": quantidade,
+        "preco_movimentacao": 4.5,
+        "data_movimentacao": data,
+        "data_validade": None,
+        "informacoes": "Web"
+    }
+
+
+def _escritas(client, empresa_id: int, ids: dict) -> dict:
+    produto = _rpc(
+        client, empresa_id, "criar_produto",
+        p_produto={
+            "nome": "farinha de teste",
+            "unidade": "kg",
+            "quantidade": 10,
+            "estoque_minimo": 2,
+            "preco_unidade": 4.5,
+            "categorias": {"secos": "#fff"},
+            "fornecedores": None
+        },
+        p_movimentacao=_movimentacao(None, "entrada", 10, "2026-10-01T12:00:00+00:00")
+    )[0]
+    saida = _rpc(
+        client, empresa_id, "registrar_movimentacao",
+        p_movimentacao=_movimentacao(produto["id"], "saída", 3, "2026-10-02T12:00:00+00:00")
+    )[0]
+    _rpc(client, empresa_id, "editar_movimentacao", p_id=saida["id"], p_alteracoes={"quantidade": 4})
+    _rpc(client, empresa_id, "registrar_movimentacoes", p_movimentacoes=[
+        _movimentacao(produto["id"], "entrada", 5, "2026-10-03T12:00:00+00:00"),
+        _movimentacao(produto["id"], "inventário", 20, "2026-10-03T13:00:00+00:00"),
+        _movimentacao(produto["id"], "saída", 2, "2026-10-03T14:00:00+00:00"),
+        _movimentacao(ids[1], "entrada", 1, "2026-10-03T15:00:00+00:00")
+    ])
+    lista = client.table("lista_compras").insert({
+        "empresa_id": empresa_id,
+        "nome": "lista de teste",
+        "valor_total": 0,
+        "produtos": {"farinha de teste": {"id": produto["id"], "qtd_comprar": 6, "preco": 4.5}},
+        "recebimento": None,
+        "finalizada": False
+    }).execute().data[0]
+    _rpc(
+        client, empresa_id, "receber_lista_compras",
+        p_lista_id=lista["id"], p_alteracoes={"valor_total": 27, "recebimento": "2026-10-04 12:00:00"}
+    )
+    _rpc(client, empresa_id, "atualizar_produto", p_id=produto["id"], p_produto={"estoque_minimo": 3})
+
+    def ler(tabela: str, colunas: str, id_produto: int) -> list:
+        coluna = "id" if tabela == "produtos" else "id_produto"
+        return client.table(tabela).select(colunas).eq(coluna, id_produto).execute().data
+
+    return {
+        "produto": ler("produtos", "quantidade,estoque_minimo,categorias", produto["id"]),
+        "outro": ler("produtos", "quantidade", ids[1]),
+        "movimentacoes": ler("movimentacao", "operacao,classificacao,quantidade", produto["id"]),
+        "diario": [
+            {**linha, "id_produto": None}
+            for linha in ler("movimentacao_diaria", ",".join(COLUNAS_DIARIO), produto["id"])
+        ],
+        "lista": client.table("lista_compras").select("valor_total,finalizada").eq("id", lista["id"]).execute().data
+    }
+
+
+def test_escritas_transacionais_iguais_ao_substituto(backend, postgres, gerador):
+    client, empresa_id, ids = postgres
+    local = _escritas(SupabaseSingleton().get_client(), 1, {id: id for id in ids})
+    remoto = _escritas(client, empresa_id, ids)
+
+    assert remoto["produto"][0]["quantidade"] == pytest.approx(24)
+    assert _normalizar(remoto) == _normalizar(local)
@@ -0,0 +1,56 @@
+import asyncio
+
+import flet as ft
+import pytest
+
+from banco_de_dados import SupabaseAsync, SupabaseSingleton
+from monitor_consultas import MonitorConsultas, TransporteInstrumentado
+from postgrest_local import PostgrestLocal
+from repositorio import Repositorio
+
+
+class CartaoTeste(ft.Container):
+    def __init__(self, antes=None) -> None:
+        super().__init__()
+        self.antes = antes
+
+    async def ler(self) -> None:
+        if self.antes is not None:
+            await asyncio.sleep(0)
+            self.antes()
+        await SupabaseAsync().consultar(
+            lambda client: client.table("produtos").select("id").eq("empresa_id", 1),
+            lambda client: client.table("categoria").select("id").eq("empresa_id", 1)
+        )
+        await Repositorio().agregado("calcular_cmv_real", "movimentacao")
+
+
+@pytest.fixture
+def monitor(backend, monkeypatch):
+    SupabaseSingleton._instance = None
+    SupabaseAsync._instance = None
+    SupabaseSingleton(PostgrestLocal.URL, PostgrestLocal.CHAVE, transporte=TransporteInstrumentado(backend))
+    monkeypatch.setattr(MonitorConsultas, "_instance", None)
+    MonitorConsultas().definir_pagina("Painel")
+    return MonitorConsultas()
+
+
+def _executar(monitor: MonitorConsultas, cartao: CartaoTeste) -> None:
+    async def principal():
+        monitor.instalar(asyncio.get_running_loop())
+        await asyncio.get_running_loop().create_task(cartao.ler())
+    asyncio.run(principal())
+
+
+def test_consultas_paralelas_registram_componente(monitor):
+    _executar(monitor, CartaoTeste())
+
+    consultas = monitor.ultimas(10)
+    assert {consulta["tabela"] for consulta in consultas} == {"produtos", "categoria", "rpc/calcular_cmv_real"}
+    assert {(consulta["pagina"], consulta["componente"]) for consulta in consultas} == {("Painel", "CartaoTeste")}
+
+
+def test_consultas_em_andamento_ficam_com_a_pagina_de_origem(monitor):
+    _executar(monitor, CartaoTeste(antes=lambda: monitor.definir_pagina("Estoque")))
+
+    assert set(monitor.resumo()) == {"Painel"}
@@ -0,0 +1,30 @@
+"""Cobre apenas o substituto em app/postgrest_local.py; o SQL de supabase/migrations roda em
+tests/test_migracoes_postgres.py, que exige SUPABASE_TESTE_URL e SUPABASE_TESTE_CHAVE.
+"""
+
+import asyncio
+
+import pytest
+
+from banco_de_dados import SupabaseSingleton
+from repositorio import Repositorio
+
+
+CHAVES = ["dia", "id_produto", "categoria", "operacao", "classificacao"]
+
+
+def _por_chave(linhas: list) -> dict:
+    return {
+        tuple(linha[chave] for chave in CHAVES): (pytest.approx(linha["quantidade"]), pytest.approx(linha["valor"]))
+        for linha in linhas
+    }
+
+
+def test_rollup_expande_categorias_do_produto(backend, gerador):
+    SupabaseSingleton().get_client().rpc("atualizar_movimentacao_diaria", {"p_empresa_id": 1}).execute()
+    diario = asyncio.run(Repositorio().movimentacao_diaria())
+
+    categorias = {produto["id"]: set(produto["categorias"]) or {""} for produto in gerador.produtos()}
+    assert {linha["categoria"] for linha in diario} - {""}
+    assert all(linha["categoria"] in categorias[linha["id_produto"]] for linha in diario)
+    assert _por_chave(diario) == _por_chave(gerador.diario())
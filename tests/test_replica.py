@@ -0,0 +1,44 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from replica import Replica
+
+
+def _produto(gerador, id: int, atraso: int) -> dict:
+    updated_at = datetime.now(timezone.utc) - timedelta(seconds=atraso)
+    return {
+        **gerador.produtos()[0],
+        "id": id,
+        "nome": f"produto {id}",
+        "updated_at": updated_at.strftime("%Y-%m-%dT%H:%M:%S.%f+00:00")
+    }
+
+
+def test_commit_atrasado_dentro_da_margem_e_replicado(backend, gerador):
+    replica = Replica()
+    asyncio.run(replica.sincronizar(1, "produtos"))
+    assert len(replica.ler("produtos", 1)) == len(gerador.produtos())
+
+    backend.carregar("produtos", [_produto(gerador, 9001, 60)])
+    replica.marcar(1, "produtos")
+    asyncio.run(replica.sincronizar(1, "produtos"))
+
+    ids = [produto["id"] for produto in replica.ler("produtos", 1)]
+    assert 9001 in ids
+    assert len(ids) == len(set(ids)) == len(gerador.produtos()) + 1
+
+
+def test_sincronizacao_com_falha_e_repetida(backend, gerador, monkeypatch):
+    replica = Replica()
+    consultar_lote = replica._consultar_lote
+
+    async def falhar(*args, **kwargs):
+        raise ConnectionError("sem rede")
+
+    monkeypatch.setattr(replica, "_consultar_lote", falhar)
+    asyncio.run(replica.sincronizar(1, "produtos"))
+    assert replica.ler("produtos", 1) == []
+
+    monkeypatch.setattr(replica, "_consultar_lote", consultar_lote)
+    asyncio.run(replica.sincronizar(1, "produtos"))
+    assert len(replica.ler("produtos", 1)) == len(gerador.produtos())
@@ -0,0 +1,89 @@
+import asyncio
+
+from dateutil import parser
+
+from repositorio import Repositorio
+
+
+EMPATADAS = range(10001, 10010)
+
+
+def _empatadas(gerador) -> list:
+    movimentacao = {chave: valor for chave, valor in gerador.movimentacoes()[0].items() if chave != "produtos"}
+    return [
+        {
+            **movimentacao,
+            "id": id,
+            "id_produto": 1,
+            "empresa_id": 1,
+            "data_movimentacao": "2026-10-10T12:00:00+00:00" if id % 2 else "2026-10-10T09:00:00-03:00"
+        }
+        for id in EMPATADAS
+    ]
+
+
+def _paginas(produto_id=None, tamanho=4, cursor=None) -> list:
+    async def coletar():
+        paginas = []
+        async for pagina in Repositorio().paginar_movimentacoes(produto_id, tamanho, cursor):
+            paginas.append(pagina)
+            assert len(paginas) <= 1000
+        return paginas
+    return asyncio.run(coletar())
+
+
+def _esperado(backend, produto_id=None) -> list:
+    movimentacoes = [
+        mov for mov in backend.ler("movimentacao")
+        if produto_id is None or mov["id_produto"] == produto_id
+    ]
+    movimentacoes.sort(key=lambda mov: (parser.isoparse(mov["data_movimentacao"]), mov["id"]), reverse=True)
+    return [mov["id"] for mov in movimentacoes]
+
+
+def test_empates_na_fronteira_da_pagina_nao_duplicam_nem_pulam(backend, gerador):
+    backend.carregar("movimentacao", _empatadas(gerador))
+
+    for produto_id in (None, 1):
+        paginas = _paginas(produto_id)
+        ids = [mov["id"] for pagina in paginas for mov in pagina]
+        assert all(len(pagina) == 4 for pagina in paginas[:-1])
+        assert ids == _esperado(backend, produto_id)
+        assert len(ids) == len(set(ids))
+
+    ids = [mov["id"] for pagina in _paginas(1) for mov in pagina]
+    inicio = ids.index(max(EMPATADAS))
+    assert ids[inicio:inicio + len(EMPATADAS)] == sorted(EMPATADAS, reverse=True)
+
+
+def test_retoma_do_cursor_no_meio_de_um_empate(backend, gerador):
+    backend.carregar("movimentacao", _empatadas(gerador))
+    ids = _esperado(backend, 1)
+    corte = ids.index(max(EMPATADAS)) + 3
+
+    primeira = _paginas(1, tamanho=corte)[0]
+    resto = [mov["id"] for pagina in _paginas(1, cursor=Repositorio.cursor(primeira)) for mov in pagina]
+
+    assert [mov["id"] for mov in primeira] == ids[:corte]
+    assert resto == ids[corte:]
+
+
+def test_para_na_primeira_pagina_vazia(backend, monkeypatch):
+    repositorio = Repositorio()
+    pagina_movimentacoes = repositorio.pagina_movimentacoes
+    tamanhos = []
+
+    async def contar(*args, **kwargs):
+        pagina = await pagina_movimentacoes(*args, **kwargs)
+        tamanhos.append(len(pagina))
+        return pagina
+
+    monkeypatch.setattr(repositorio, "pagina_movimentacoes", contar)
+    total = len(backend.ler("movimentacao"))
+    paginas = _paginas(tamanho=total // 3)
+
+    assert sum(len(pagina) for pagina in paginas) == total
+    assert tamanhos[-1] == 0 and all(tamanhos[:-1])
+    assert len(tamanhos) == len(paginas) + 1
+    assert _paginas(cursor=Repositorio.cursor(paginas[-1])) == []
+    assert Repositorio.cursor([]) is None
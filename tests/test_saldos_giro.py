@@ -0,0 +1,77 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from banco_de_dados import SupabaseSingleton
+from dados_sinteticos import GeradorDados
+from pagina_painel import FonteDiaria, FonteLocal, OperadorDados
+from repositorio import Repositorio
+
+
+@pytest.fixture
+def gerador() -> GeradorDados:
+    return GeradorDados(15, 4000)
+
+
+def _saldos_ingenuos(df: pd.DataFrame) -> pd.DataFrame:
+    linhas = []
+    saldos = {}
+    for movimentacao in df.sort_values(["data_movimentacao", "id"]).itertuples():
+        operacao = movimentacao.operacao.lower()
+        saldo = saldos.get(movimentacao.id_produto, 0.0)
+        if operacao == "inventário":
+            saldo = movimentacao.quantidade
+        elif operacao == "saída":
+            saldo -= movimentacao.quantidade
+        else:
+            saldo += movimentacao.quantidade
+        saldos[movimentacao.id_produto] = saldo
+        linhas.append((movimentacao.nome, movimentacao.data_movimentacao, saldo))
+    saldos = pd.DataFrame(linhas, columns=["nome", "data_movimentacao", "em_estoque"])
+    saldos["dia"] = saldos["data_movimentacao"].dt.tz_convert("America/Sao_Paulo").dt.tz_localize(None).dt.normalize()
+    return saldos
+
+
+def _produtos_com_inventario_misto(df: pd.DataFrame) -> list:
+    dias = df["data_movimentacao"].dt.tz_convert("America/Sao_Paulo").dt.date
+    por_dia = df.assign(dia=dias, inventario=df["operacao"].str.lower() == "inventário").groupby(["nome", "dia"])
+    mistos = por_dia["inventario"].agg(["any", "size"])
+    mistos = mistos[mistos["any"] & (mistos["size"] > 1)]
+    return mistos.reset_index()["nome"].value_counts().index[:5].tolist()
+
+
+def test_giro_local_igual_ao_saldo_linha_a_linha(gerador):
+    base = gerador.movimentacoes_df()
+    fonte = FonteLocal(
+        pd.DataFrame(gerador.produtos()),
+        OperadorDados.transformar_dados_movimentacoes(base),
+        OperadorDados.saldos_produtos(base)
+    )
+    esperados = _saldos_ingenuos(base)
+    produtos = _produtos_com_inventario_misto(base)
+    assert produtos
+
+    for produto in produtos:
+        serie = fonte.saldos.serie(produto)
+        assert serie["em_estoque"].tolist() == pytest.approx(esperados[esperados["nome"] == produto]["em_estoque"].tolist())
+
+
+@pytest.mark.parametrize("origem", ["rollup", "gerador"])
+def test_giro_diario_igual_ao_saldo_linha_a_linha(backend, gerador, origem):
+    if origem == "rollup":
+        SupabaseSingleton().get_client().rpc("atualizar_movimentacao_diaria", {"p_empresa_id": 1}).execute()
+        diario = asyncio.run(Repositorio().movimentacao_diaria())
+    else:
+        diario = gerador.diario()
+    base = gerador.movimentacoes_df()
+    fonte = FonteDiaria(diario, pd.DataFrame(gerador.produtos()))
+    esperados = _saldos_ingenuos(base).groupby(["nome", "dia"], as_index=False).last()
+    produtos = _produtos_com_inventario_misto(base)
+    assert produtos
+
+    for produto in produtos:
+        serie = fonte.saldos.serie(produto)
+        esperado = esperados[esperados["nome"] == produto]
+        assert pd.to_datetime(serie["data_movimentacao"]).tolist() == esperado["dia"].tolist()
+        assert serie["em_estoque"].tolist() == pytest.approx(esperado["em_estoque"].tolist())
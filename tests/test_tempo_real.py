@@ -0,0 +1,90 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from banco_de_dados import SupabaseSingleton
+from pagina_estoque import PainelInfos
+from replica import Replica
+from servidor_tempo_real import ServidorTempoReal
+from tempo_real import TempoReal
+
+
+async def _aguardar(condicao, limite: float=5) -> None:
+    inicio = asyncio.get_running_loop().time()
+    while not condicao():
+        assert asyncio.get_running_loop().time() - inicio < limite
+        await asyncio.sleep(0.01)
+
+
+async def _com_tempo_real(teste) -> None:
+    servidor = ServidorTempoReal(porta=0)
+    async with await servidor.iniciar() as websocket:
+        TempoReal._instance = None
+        tempo_real = TempoReal(f"ws://localhost:{websocket.sockets[0].getsockname()[1]}", "chave")
+        await tempo_real.conectar(1)
+        try:
+            await _aguardar(lambda: tempo_real.ativo)
+            await teste(servidor, tempo_real)
+        finally:
+            await tempo_real.desconectar()
+            TempoReal._instance = None
+
+
+def _registrar(produto_id: int) -> dict:
+    return SupabaseSingleton().get_client().rpc("registrar_movimentacao", {
+        "p_empresa_id": 1,
+        "p_movimentacao": {
+            "id_produto": produto_id,
+            "unidade": "kg",
+            "operacao": "entrada",
+            "classificacao": "Compras",
+            "quantidade": 2.0,
+            "preco_movimentacao": 5.0,
+            "data_movimentacao": "2026-10-18T10:00:00.000-03:00"
+        }
+    }).execute().data[0]
+
+
+def test_insercao_chega_ao_ouvinte(backend):
+    async def teste(servidor, tempo_real):
+        recebidos = []
+        tempo_real.ouvir("movimentacao", lambda tipo, registro: recebidos.append((tipo, registro)))
+        movimentacao = _registrar(1)
+        await servidor.publicar("movimentacao", "INSERT", movimentacao)
+        await _aguardar(lambda: recebidos)
+
+        assert recebidos == [("INSERT", movimentacao)]
+        assert Replica().ler("movimentacao", 1, id=movimentacao["id"]) == [movimentacao]
+
+    asyncio.run(_com_tempo_real(teste))
+
+
+def test_painel_reconstroi_uma_vez_por_movimentacao(backend, monkeypatch):
+    async def teste(servidor, tempo_real):
+        reconstrucoes = []
+        monkeypatch.setattr(PainelInfos, "page", property(lambda self: SimpleNamespace(
+            run_task=lambda funcao, *args: asyncio.ensure_future(funcao(*args))
+        )))
+        monkeypatch.setattr(PainelInfos, "criar_conteudo", lambda self: _contar(reconstrucoes, "conteudo"))
+        monkeypatch.setattr(PainelInfos, "_recarregar", lambda self: _contar(reconstrucoes, "recarregar"))
+        painel = PainelInfos(None)
+        painel.produto = SimpleNamespace(id=1)
+        painel.did_mount()
+
+        movimentacao = _registrar(1)
+        produto = next(produto for produto in backend.ler("produtos") if produto["id"] == 1)
+        await servidor.publicar("produtos", "UPDATE", produto)
+        await servidor.publicar("movimentacao", "INSERT", movimentacao)
+        await _aguardar(lambda: reconstrucoes)
+        await asyncio.sleep(PainelInfos.AGRUPAMENTO * 3)
+
+        assert reconstrucoes == ["recarregar"]
+        assert painel.produto.qtd_estoque == produto["quantidade"]
+        painel.will_unmount()
+
+    asyncio.run(_com_tempo_real(teste))
+
+
+async def _contar(reconstrucoes: list, tipo: str) -> None:
+    reconstrucoes.append(tipo)